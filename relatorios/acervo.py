@@ -0,0 +1,297 @@
+"""
+Acervo dos registros normalizados, particionado por mês produtivo e centro.
+
+Cada upload grava os seus registros normalizados (saída de normalizar_registros, antes
+das regras de roteiro) num arquivo Arrow IPC sem compressão por partição:
+
+    <pasta>/2025-09/CA01.arrow
+
+O Arrow IPC é lido por mapeamento de memória: abrir uma partição não copia nada, e só
+as páginas das colunas pedidas chegam a ser lidas do disco. Um período ou um conjunto
+de centros abre só as partições que o cobrem, então meses de histórico voltam em
+milissegundos, sem abrir o Excel de novo, e podem passar pela pipeline com outras
+velocidades ou regras (ver Selecao).
+
+Algumas regras de roteiro dependem da ordem das linhas do arquivo (a faixa de
+quantidade de um item vem do seu primeiro registro). Por isso cada linha guarda o upload
+de origem e a sua posição nele, e a leitura devolve as linhas nessa ordem: um período
+de um único upload volta na ordem exata do arquivo.
+
+Datas e horas são gravadas já convertidas (datetime e timedelta), que parse_dt usa
+direto; colunas de texto com células de tipos misturados são gravadas como texto.
+Registros sem data/hora de início não pertencem a nenhum dia produtivo e ficam de fora.
+
+Um upload substitui, em cada centro, os dias produtivos que ele traz; os demais dias
+da partição continuam como estavam. A pasta vem de RELATORIO_ACERVO (padrão:
+relatorios/acervo).
+
+Ao lado das partições ficam as tabelas agregadas de cada dia já calculado (resumo por
+turno, sumário, paradas, itens), gravadas pelo lote agendado, um arquivo por tabela e dia:
+
+    <pasta>/agregados/resumo_turno/2025-09-14.arrow
+
+A página e o lote agendado gravam no mesmo acervo em processos diferentes. A leitura,
+a junção e a troca de uma partição acontecem com a trava de arquivo dela
+(<pasta>/2025-09/CA01.arrow.lock), e cada tabela agregada é trocada com a sua, então
+dois uploads que tocam a mesma partição ao mesmo tempo não perdem os dias um do outro.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from processamento import t, _converter_datas, _converter_horas
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PASTA_ACERVO = os.environ.get("RELATORIO_ACERVO") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "acervo")
+EXTENSAO = ".arrow"
+COLUNAS_DATA = ("Data Início", "Data Término")
+COLUNAS_HORA = ("Hora Início", "Hora Fim")
+# Upload de origem (instante da gravação) e posição da linha nele
+COLUNAS_ORDEM = ["_upload", "_linha"]
+PASTA_AGREGADOS = "agregados"
+_MES = re.compile(r"\d{4}-\d{2}$")
+
+
+def dias_produtivos(inicio):
+    """Data produtiva (06→06) de cada data/hora de início, como meia-noite do dia."""
+    return (inicio - pd.Timedelta(hours=6)).dt.normalize()
+
+
+def _tabela(df):
+    """Frame normalizado como tabela Arrow, com datas/horas tipadas e textos uniformes."""
+    df = df.reset_index(drop=True)
+    colunas = {}
+    for nome in df.columns:
+        col = df[nome]
+        if nome in COLUNAS_DATA:
+            col = _converter_datas(col)
+        elif nome in COLUNAS_HORA:
+            col = _converter_horas(col)
+        try:
+            colunas[nome] = pa.array(col, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Texto e número na mesma coluna (códigos do Excel): tudo como texto
+            colunas[nome] = pa.array(col.map(str).where(col.notna(), None), type=pa.string())
+    return pa.table(colunas)
+
+
+def _frame(tabela):
+    df = tabela.to_pandas()
+    # Células vazias de texto voltam como NaN, como na leitura do Excel
+    for nome in df.columns[df.dtypes == object]:
+        df[nome] = df[nome].where(df[nome].notna(), np.nan)
+    return df
+
+
+def _gravar_arquivo(tabela, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Gravada à parte e renomeada: quem estiver lendo a antiga por mmap continua com ela
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(tabela, temporario, compression="uncompressed")
+    os.replace(temporario, caminho)
+
+
+@contextmanager
+def trava_arquivo(caminho, esperar=True):
+    """
+    Trava exclusiva do arquivo entre processos (em <caminho>.lock), esperando quem a tiver;
+    com esperar=False, BlockingIOError se outro a tiver. O sistema solta a trava de um
+    processo que morre.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(f"{caminho}.lock", "a+b") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava.fileno(), fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            trava.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(trava.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError as erro:
+                    # LK_LOCK desiste depois de 10 segundos
+                    if not esperar:
+                        raise BlockingIOError(*erro.args) from erro
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+            else:
+                trava.seek(0)
+                msvcrt.locking(trava.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class Acervo:
+    def __init__(self, pasta=None):
+        self.pasta = pasta or PASTA_ACERVO
+        self._lock = threading.Lock()
+
+    def _caminho(self, mes, centro):
+        return os.path.join(self.pasta, mes, f"{centro}{EXTENSAO}")
+
+    def particoes(self, inicio=None, fim=None, centros=None):
+        """(mês "AAAA-MM", centro) das partições gravadas que cobrem o período e os centros."""
+        if not os.path.isdir(self.pasta):
+            return []
+        mes_ini = None if inicio is None else f"{inicio:%Y-%m}"
+        mes_fim = None if fim is None else f"{fim:%Y-%m}"
+        particoes = []
+        for mes in sorted(os.listdir(self.pasta)):
+            if not _MES.match(mes) or (mes_ini and mes < mes_ini) or (mes_fim and mes > mes_fim) \
+                    or not os.path.isdir(os.path.join(self.pasta, mes)):
+                continue
+            for arquivo in sorted(os.listdir(os.path.join(self.pasta, mes))):
+                centro = arquivo[:-len(EXTENSAO)]
+                if arquivo.endswith(EXTENSAO) and (centros is None or centro in centros):
+                    particoes.append((mes, centro))
+        return particoes
+
+    def centros(self):
+        return sorted({centro for _, centro in self.particoes()})
+
+    def dias(self, centros=None):
+        """Dias produtivos com registros no acervo (lê só a coluna de início)."""
+        tabelas = [self._ler_particao(mes, centro, ["DataHoraInicio"]) for mes, centro in self.particoes(centros=centros)]
+        if not tabelas:
+            return []
+        inicio = pa.concat_tables(tabelas).column("DataHoraInicio").to_pandas()
+        return sorted(dias_produtivos(inicio).dt.date.unique())
+
+    def impressao(self, inicio=None, fim=None, centros=None):
+        """Impressão das partições que cobrem a seleção: muda quando alguma delas é regravada."""
+        partes = [str(inicio), str(fim), sorted(centros) if centros is not None else None]
+        for mes, centro in self.particoes(inicio, fim, centros):
+            estado = os.stat(self._caminho(mes, centro))
+            partes.append((mes, centro, estado.st_size, estado.st_mtime_ns))
+        return hashlib.md5(repr(partes).encode()).hexdigest()
+
+    def _ler_particao(self, mes, centro, colunas=None, filtro=None):
+        tabela = feather.read_table(self._caminho(mes, centro), columns=colunas, memory_map=True)
+        return tabela if filtro is None else tabela.filter(filtro)
+
+    def ler(self, inicio=None, fim=None, centros=None, colunas=None):
+        """
+        Registros normalizados dos dias produtivos de inicio a fim (inclusive) dos centros
+        informados (None: todos), só com as colunas pedidas (None: todas). As linhas vêm
+        na ordem dos uploads e, em cada upload, na ordem do arquivo.
+        """
+        lidas = None if colunas is None else list(dict.fromkeys([*colunas, "DataHoraInicio", *COLUNAS_ORDEM]))
+        filtro = None
+        if inicio is not None:
+            filtro = pc.field("DataHoraInicio") >= datetime.combine(inicio, t("06:00"))
+        if fim is not None:
+            ate = pc.field("DataHoraInicio") < datetime.combine(fim, t("06:00")) + timedelta(days=1)
+            filtro = ate if filtro is None else filtro & ate
+        tabelas = [self._ler_particao(mes, centro, lidas, filtro) for mes, centro in self.particoes(inicio, fim, centros)]
+        if not tabelas:
+            return pd.DataFrame(columns=colunas or [])
+        tabela = pa.concat_tables(tabelas, promote_options="permissive")
+        tabela = tabela.take(pc.sort_indices(tabela, [(c, "ascending") for c in COLUNAS_ORDEM]))
+        df = _frame(tabela.drop_columns(COLUNAS_ORDEM))
+        return df if colunas is None else df[colunas]
+
+    def gravar(self, normalizados):
+        """
+        Grava os registros normalizados de um upload. Os dias produtivos do upload
+        substituem os gravados antes em todas as partições dos meses dele, inclusive as
+        de centros que não aparecem mais nesses dias. Retorna as partições regravadas.
+        """
+        df = normalizados.assign(_upload=time.time_ns(), _linha=np.arange(len(normalizados)))
+        df = df[df["DataHoraInicio"].notna()].reset_index(drop=True)
+        dias = dias_produtivos(df["DataHoraInicio"])
+        dias_upload = dias.unique()
+        tabela = _tabela(df)
+        linhas_por_particao = df.groupby([dias.dt.strftime("%Y-%m"), df["Centro Trabalho"]], sort=True).indices
+        meses = sorted({mes for mes, _ in linhas_por_particao})
+        gravadas = []
+        with self._lock:
+            particoes = sorted(set(linhas_por_particao) | {p for p in self.particoes() if p[0] in meses})
+            for mes, centro in particoes:
+                caminho = self._caminho(mes, centro)
+                linhas = linhas_por_particao.get((mes, centro))
+                partes = [] if linhas is None else [tabela.take(linhas)]
+                # Outro processo (página ou lote) pode estar regravando a mesma partição
+                with trava_arquivo(caminho):
+                    if os.path.exists(caminho):
+                        antigos = self._ler_particao(mes, centro)
+                        substituidos = dias_produtivos(antigos.column("DataHoraInicio").to_pandas()).isin(dias_upload)
+                        if linhas is None and not substituidos.any():
+                            continue
+                        partes.insert(0, antigos.filter(pa.array(~substituidos.to_numpy())))
+                    partes = [parte for parte in partes if parte.num_rows]
+                    if partes:
+                        _gravar_arquivo(pa.concat_tables(partes, promote_options="permissive"), caminho)
+                    else:
+                        # Centro sem nenhum dia restante no mês
+                        os.remove(caminho)
+                gravadas.append((mes, centro))
+        return gravadas
+
+    def _caminho_agregado(self, tabela, dia):
+        return os.path.join(self.pasta, PASTA_AGREGADOS, tabela, f"{dia:%Y-%m-%d}{EXTENSAO}")
+
+    def gravar_agregados(self, dia, tabelas):
+        """Tabelas agregadas do dia (nome -> frame); substituem as gravadas antes para o mesmo dia."""
+        for nome, df in tabelas.items():
+            caminho = self._caminho_agregado(nome, dia)
+            with trava_arquivo(caminho):
+                _gravar_arquivo(_tabela(df), caminho)
+
+    def ler_agregados(self, nome, inicio=None, fim=None):
+        """Tabela agregada dos dias gravados de inicio a fim (inclusive), na ordem dos dias."""
+        pasta = os.path.join(self.pasta, PASTA_AGREGADOS, nome)
+        arquivos = sorted(os.listdir(pasta)) if os.path.isdir(pasta) else []
+        desde = None if inicio is None else f"{inicio:%Y-%m-%d}"
+        ate = None if fim is None else f"{fim:%Y-%m-%d}"
+        tabelas = [
+            feather.read_table(os.path.join(pasta, arquivo), memory_map=True)
+            for arquivo in arquivos
+            if arquivo.endswith(EXTENSAO) and (desde is None or arquivo[:10] >= desde) and (ate is None or arquivo[:10] <= ate)
+        ]
+        tabelas = [tabela for tabela in tabelas if tabela.num_rows]
+        if not tabelas:
+            return pd.DataFrame()
+        return _frame(pa.concat_tables(tabelas, promote_options="permissive"))
+
+    def selecao(self, inicio=None, fim=None, centros=None):
+        return Selecao(self, inicio, fim, centros)
+
+
+class Selecao:
+    """
+    Período e centros do acervo usados pela Pipeline no lugar do arquivo de registros.
+
+    As regras de roteiro que dependem do arquivo inteiro (como a escolha RAPIDO/LENTO)
+    passam a valer para o período selecionado.
+    """
+
+    def __init__(self, acervo, inicio=None, fim=None, centros=None):
+        self.acervo = acervo
+        self.inicio = inicio
+        self.fim = fim
+        self.centros = None if centros is None else sorted(centros)
+
+    def impressao(self):
+        return self.acervo.impressao(self.inicio, self.fim, self.centros)
+
+    def ler(self):
+        return self.acervo.ler(self.inicio, self.fim, self.centros)
+
+    def __repr__(self):
+        return f"Selecao({self.acervo.pasta!r}, {self.inicio}, {self.fim}, {self.centros})"
@@ -0,0 +1,109 @@
+"""
+Backends das agregações por centro/turno/dia usadas em agregar_dia e calcular_metricas.
+
+Todas as agregações passam por um único primitivo, `agrupar(df, chaves, agregacoes)`,
+equivalente a `df.groupby(chaves, as_index=False).agg(**agregacoes)` com as funções
+"sum", "mean" e "size". O pandas é a implementação de referência; o backend "duckdb"
+roda o mesmo agrupamento como uma consulta SQL num banco analítico embutido, lendo os
+frames em memória sem cópia, e devolve frames idênticos: mesmas linhas, ordem, tipos e
+valores. Para isso a consulta usa soma compensada (fsum, a mesma soma de Kahan do
+groupby do pandas), uma thread (a ordem das parcelas de cada grupo é a das linhas) e
+ordena pelas chaves, como o groupby.
+
+O backend vem da variável de ambiente RELATORIO_BACKEND ("pandas", o padrão, ou
+"duckdb"). O duckdb é dependência opcional: só é importado quando escolhido.
+"""
+import os
+import threading
+
+import pandas as pd
+
+FUNCOES = ("sum", "mean", "size")
+
+
+class BackendPandas:
+    nome = "pandas"
+
+    def agrupar(self, df, chaves, agregacoes):
+        return df.groupby(chaves, as_index=False).agg(**agregacoes)
+
+
+class BackendDuckDB:
+    nome = "duckdb"
+
+    def __init__(self):
+        import duckdb  # dependência opcional
+        self._duckdb = duckdb
+        self._local = threading.local()
+
+    def _conexao(self):
+        # Conexões do DuckDB não são para uso concorrente: uma por thread do pré-cálculo
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = self._duckdb.connect()
+            conexao.execute("SET threads = 1")
+            self._local.conexao = conexao
+        return conexao
+
+    @staticmethod
+    def _coluna(nome):
+        return '"' + nome.replace('"', '""') + '"'
+
+    def _expressao(self, coluna, funcao, dtype):
+        c = self._coluna(coluna)
+        if funcao == "size":
+            return "count(*)"
+        if funcao == "mean":
+            return f"CASE WHEN count({c}) = 0 THEN NULL ELSE fsum({c}) / count({c}) END"
+        # sum: grupo só com nulos soma 0, como no pandas; inteiros continuam inteiros
+        if pd.api.types.is_integer_dtype(dtype):
+            return f"coalesce(CAST(sum({c}) AS BIGINT), 0)"
+        return f"coalesce(fsum({c}), 0)"
+
+    def agrupar(self, df, chaves, agregacoes):
+        if df.empty:
+            # Frame vazio: os tipos das colunas de saída seguem as regras do pandas
+            return BackendPandas().agrupar(df, chaves, agregacoes)
+        colunas = list(dict.fromkeys([*chaves, *(coluna for coluna, _ in agregacoes.values())]))
+        selecao = [self._coluna(k) for k in chaves] + [
+            f"{self._expressao(coluna, funcao, df[coluna].dtype)} AS {self._coluna(saida)}"
+            for saida, (coluna, funcao) in agregacoes.items()
+        ]
+        chaves_sql = ", ".join(self._coluna(k) for k in chaves)
+        consulta = (
+            f"SELECT {', '.join(selecao)} FROM registros "
+            f"WHERE {' AND '.join(f'{self._coluna(k)} IS NOT NULL' for k in chaves)} "
+            f"GROUP BY {chaves_sql} ORDER BY {chaves_sql}"
+        )
+        conexao = self._conexao()
+        conexao.register("registros", df[colunas])
+        try:
+            resultado = conexao.execute(consulta).df()
+        finally:
+            conexao.unregister("registros")
+        for k in chaves:
+            resultado[k] = resultado[k].astype(df[k].dtype)
+        return resultado
+
+
+BACKENDS = {"pandas": BackendPandas, "duckdb": BackendDuckDB}
+
+_instancias = {}
+_lock = threading.Lock()
+
+
+def obter_backend(nome=None):
+    """
+    Backend pelo nome (padrão: RELATORIO_BACKEND, ou "pandas").
+
+    Raises:
+        ValueError: nome desconhecido
+        ImportError: backend cuja dependência opcional não está instalada
+    """
+    nome = (nome or os.environ.get("RELATORIO_BACKEND") or "pandas").strip().lower()
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de agregação desconhecido: {nome!r} (opções: {', '.join(BACKENDS)})")
+    with _lock:
+        if nome not in _instancias:
+            _instancias[nome] = BACKENDS[nome]()
+        return _instancias[nome]
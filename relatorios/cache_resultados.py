@@ -0,0 +1,223 @@
+"""
+Cache de resultados compartilhado entre as sessões do Streamlit (um por processo).
+
+Guarda as saídas das etapas da pipeline e mantém um pool de threads que pré-calcula
+todos os dias de um arquivo logo após o upload. As chaves são tuplas que começam pela
+versão do arquivo de dados; a impressão da etapa já inclui as versões das velocidades,
+das regras e a data produtiva, então o mesmo dia aberto por outra sessão sai do cache.
+
+A memória ocupada pelos resultados tem um teto, RELATORIO_CACHE_MB (padrão 2048; 0
+desliga). Passando dele, saem os resultados usados há mais tempo; o último guardado
+fica sempre, mesmo sozinho acima do teto. O tamanho de cada resultado é estimado ao
+guardar (DataFrames pelo memory_usage, textos por amostra nos frames grandes).
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+LIMITE_MB = float(os.environ.get("RELATORIO_CACHE_MB", "2048"))
+# Acima disso o tamanho das colunas de texto é estimado por uma amostra das linhas
+LINHAS_AMOSTRA = 10_000
+
+
+def tamanho_estimado(valor):
+    """Bytes aproximados ocupados pelo valor (frames, séries, coleções, bytes)."""
+    if isinstance(valor, pd.Series):
+        valor = valor.to_frame()
+    if isinstance(valor, pd.DataFrame):
+        total = int(valor.memory_usage(index=True, deep=False).sum())
+        textos = valor.select_dtypes(include="object")
+        if len(textos) and len(textos.columns):
+            amostra = textos.iloc[::max(1, len(textos) // LINHAS_AMOSTRA)]
+            extra = amostra.memory_usage(index=False, deep=True).sum() - amostra.memory_usage(index=False, deep=False).sum()
+            total += int(extra * len(textos) / len(amostra))
+        return total
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_estimado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamanho_estimado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    def __init__(self, max_workers=None, limite_mb=None):
+        self._lock = threading.Lock()
+        self._resultados = OrderedDict()  # do usado há mais tempo ao mais recente
+        self._tamanhos = {}       # chave -> bytes estimados
+        self._ocupado = 0
+        self._limite = (LIMITE_MB if limite_mb is None else limite_mb) * 1024 * 1024
+        self._contadores = {"acertos": 0, "faltas": 0, "descartes": 0}
+        self._pendentes = {}      # chave -> Future de um cálculo em andamento
+        self._precalculos = {}    # versão -> {"total": n, "feitos": k}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precalculo")
+
+    def obter(self, chave):
+        with self._lock:
+            if chave not in self._resultados:
+                return None
+            self._resultados.move_to_end(chave)
+            return self._resultados[chave]
+
+    def guardar(self, chave, valor):
+        tamanho = tamanho_estimado(valor)
+        with self._lock:
+            if chave in self._resultados:
+                self._remover(chave)
+            self._resultados[chave] = valor
+            self._tamanhos[chave] = tamanho
+            self._ocupado += tamanho
+            while self._limite and self._ocupado > self._limite and len(self._resultados) > 1:
+                self._remover(next(iter(self._resultados)))
+                self._contadores["descartes"] += 1
+
+    def _remover(self, chave):
+        del self._resultados[chave]
+        self._ocupado -= self._tamanhos.pop(chave)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Devolve o valor em cache. Se ele já estiver sendo calculado (pelo pré-cálculo ou
+        por outra sessão), espera por esse cálculo em vez de repetir o trabalho.
+        """
+        with self._lock:
+            if chave in self._resultados:
+                self._contadores["acertos"] += 1
+                self._resultados.move_to_end(chave)
+                return self._resultados[chave]
+            pendente = self._pendentes.get(chave)
+            if pendente is None:
+                self._contadores["faltas"] += 1
+                # Quem pedir a mesma chave enquanto ela é calculada aqui espera este futuro
+                futuro = self._pendentes[chave] = Future()
+            else:
+                self._contadores["acertos"] += 1
+        if pendente is not None:
+            return pendente.result()
+        try:
+            valor = calcular()
+        except BaseException as e:
+            with self._lock:
+                self._pendentes.pop(chave, None)
+            futuro.set_exception(e)
+            raise
+        self.guardar(chave, valor)
+        with self._lock:
+            self._pendentes.pop(chave, None)
+        futuro.set_result(valor)
+        return valor
+
+    def estatisticas(self):
+        """Acertos, faltas e descartes desde o início do processo, resultados guardados e memória ocupada (MB)."""
+        with self._lock:
+            return {
+                **self._contadores,
+                "resultados": len(self._resultados),
+                "ocupado_mb": self._ocupado / 1024 / 1024,
+                "limite_mb": self._limite / 1024 / 1024,
+            }
+
+    def iniciar_precalculo(self, versao, tarefas):
+        """
+        Agenda em segundo plano o cálculo de cada chave de `tarefas` (chave -> função sem
+        argumentos). Chamadas repetidas para a mesma versão não fazem nada; resultados de
+        outras versões são descartados, já que o arquivo compartilhado foi substituído.
+
+        Returns:
+            True se o pré-cálculo foi iniciado agora
+        """
+        with self._lock:
+            if versao in self._precalculos:
+                return False
+            self._descartar_outras_versoes(versao)
+            progresso = {"total": len(tarefas), "feitos": 0}
+            self._precalculos[versao] = progresso
+            for chave, calcular in tarefas.items():
+                if chave in self._resultados or chave in self._pendentes:
+                    progresso["feitos"] += 1
+                    continue
+                self._pendentes[chave] = self._executor.submit(self._executar, versao, chave, calcular)
+        return True
+
+    def calcular_em_paralelo(self, tarefas):
+        """
+        Calcula as chaves de `tarefas` (chave -> função sem argumentos) ao mesmo tempo no
+        pool, aproveitando o que já está em cache ou sendo pré-calculado.
+
+        Returns:
+            dict chave -> valor
+        """
+        futuros = {}
+        prontos = {}
+        with self._lock:
+            for chave, calcular in tarefas.items():
+                if chave in self._resultados:
+                    self._contadores["acertos"] += 1
+                    self._resultados.move_to_end(chave)
+                    prontos[chave] = self._resultados[chave]
+                    continue
+                pendente = self._pendentes.get(chave)
+                self._contadores["acertos" if pendente is not None else "faltas"] += 1
+                futuros[chave] = pendente or self._executor.submit(self._calcular_e_guardar, chave, calcular)
+        resultados = {chave: futuro.result() for chave, futuro in futuros.items()}
+        return {chave: resultados[chave] if chave in futuros else prontos[chave] for chave in tarefas}
+
+    def _calcular_e_guardar(self, chave, calcular):
+        # Não entra em _pendentes: ninguém no pool espera por estes futuros, o que evita
+        # que tarefas do pré-cálculo fiquem bloqueadas atrás delas na fila
+        valor = calcular()
+        self.guardar(chave, valor)
+        return valor
+
+    def progresso(self, versao):
+        """(feitos, total) do pré-cálculo da versão, ou None se não houver."""
+        with self._lock:
+            progresso = self._precalculos.get(versao)
+            return None if progresso is None else (progresso["feitos"], progresso["total"])
+
+    def _executar(self, versao, chave, calcular):
+        try:
+            valor = calcular()
+            self.guardar(chave, valor)
+            return valor
+        finally:
+            with self._lock:
+                self._pendentes.pop(chave, None)
+                if versao in self._precalculos:
+                    self._precalculos[versao]["feitos"] += 1
+
+    def _descartar_outras_versoes(self, versao):
+        for chave in [c for c in self._resultados if c[0] != versao]:
+            self._remover(chave)
+        for v in [v for v in self._precalculos if v != versao]:
+            del self._precalculos[v]
+
+
+class CamadaLocal:
+    """
+    Camada sobre o CacheResultados para cálculos avulsos (como a exportação de um
+    período): usa o que já está no cache compartilhado, mas o que ela própria calcula
+    fica só nela e vai embora junto com ela, sem tirar do cache compartilhado os
+    resultados que as sessões estão usando.
+    """
+
+    def __init__(self, compartilhado):
+        self.compartilhado = compartilhado
+        self._resultados = {}
+
+    def obter(self, chave):
+        if chave in self._resultados:
+            return self._resultados[chave]
+        return self.compartilhado.obter(chave)
+
+    def guardar(self, chave, valor):
+        self._resultados[chave] = valor
+
+    def obter_ou_calcular(self, chave, calcular):
+        valor = self.obter(chave)
+        if valor is None:
+            valor = self._resultados[chave] = calcular()
+        return valor
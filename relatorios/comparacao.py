@@ -0,0 +1,72 @@
+"""
+Comparação entre dois períodos produtivos (um dia ou um intervalo de dias cada).
+
+Os dias dos dois períodos são calculados ao mesmo tempo no pool do CacheResultados,
+reaproveitando os que já estão em cache, e os resumos são somados por centro e turno
+com eficiência como razão das somas.
+"""
+from datetime import timedelta
+from functools import partial
+
+import pandas as pd
+
+from processamento import agregar_resumo
+
+METRICAS_COMPARADAS = ["Produzido", "Eficiencia_%", "Paradas_h"]
+
+
+def dias_do_periodo(inicio, fim=None):
+    """Datas produtivas de `inicio` a `fim` (inclusive)."""
+    fim = inicio if fim is None else fim
+    if fim < inicio:
+        inicio, fim = fim, inicio
+    return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+
+def resumos_dos_periodos(pipeline, periodos):
+    """
+    Calcula em paralelo o resumo_turno de todos os dias dos períodos.
+
+    Args:
+        pipeline: Pipeline dos arquivos atuais (a data é trocada para cada dia)
+        periodos: dict nome -> lista de datas produtivas
+
+    Returns:
+        dict nome -> resumo_turno dos dias do período concatenados
+    """
+    pipelines = {dia: pipeline.com_data(dia) for dias in periodos.values() for dia in dias}
+    metricas = pipeline.cache.calcular_em_paralelo(
+        {p.chave("metricas"): partial(p.calcular, "metricas") for p in pipelines.values()}
+    )
+    resumos = {}
+    for nome, dias in periodos.items():
+        partes = [metricas[pipelines[dia].chave("metricas")]["resumo_turno"] for dia in dias]
+        partes = [p for p in partes if not p.empty]
+        resumos[nome] = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    return resumos
+
+
+def comparar_resumos(resumo_atual, resumo_referencia):
+    """
+    Produzido, Eficiencia_% e Paradas_h de cada período e a diferença (atual − referência),
+    por centro e turno e no total do centro (Turno = "Todos").
+    """
+    quadros = []
+    for por in (["Centro Trabalho", "Turno"], ["Centro Trabalho"]):
+        atual = agregar_resumo(resumo_atual, por)[por + METRICAS_COMPARADAS]
+        referencia = agregar_resumo(resumo_referencia, por)[por + METRICAS_COMPARADAS]
+        quadro = atual.merge(referencia, on=por, how="outer", suffixes=("_atual", "_ref"))
+        if "Turno" not in por:
+            quadro.insert(1, "Turno", "Todos")
+        quadros.append(quadro)
+    comparacao = pd.concat(quadros, ignore_index=True)
+
+    # Centro sem registros em um dos períodos: nada produzido e nenhuma parada
+    for col in ("Produzido", "Paradas_h"):
+        for sufixo in ("_atual", "_ref"):
+            comparacao[col + sufixo] = comparacao[col + sufixo].astype(float).fillna(0)
+    for col in METRICAS_COMPARADAS:
+        comparacao[f"{col}_delta"] = comparacao[f"{col}_atual"].astype(float) - comparacao[f"{col}_ref"].astype(float)
+
+    colunas = ["Centro Trabalho", "Turno"] + [f"{c}{s}" for c in METRICAS_COMPARADAS for s in ("_atual", "_ref", "_delta")]
+    return comparacao[colunas].sort_values(["Centro Trabalho", "Turno"], ignore_index=True)
@@ -0,0 +1,195 @@
+"""
+Consolidados semanais e mensais a partir do resumo_turno de cada dia, e vetores diários
+de minutos de parada por (centro, tipo) para o Pareto de paradas.
+
+Cada dia guarda as suas somas por centro e turno (Produzido, Prod_prevista,
+Prod_prevista_ajustada, Tempo_liquido_h, Paradas_h), e cada semana e mês guarda os seus
+totais, que é o que as tabelas leem. Atualizar um dia refaz só os totais da semana e do
+mês que o contêm, somando de novo as somas dos dias deles (no máximo 31): os totais não
+acumulam erro de arredondamento com um dia recalculado várias vezes, e um centro que
+sai de um dia sai dos totais.
+
+Os dias são guardados por versão dos dados (a da Pipeline: o arquivo enviado ou a
+seleção do acervo, com os seus centros), porque o mesmo dia tem resultados diferentes
+em cada arquivo ou seleção. Ficam as VERSOES_GUARDADAS versões usadas mais recentemente.
+
+Os agregados por item de cada dia também ficam por versão, e o índice deles ordenado
+pelo ID do item (ver itens.indexar_itens) é montado na primeira busca depois de um dia
+mudar.
+
+Os pares (centro, tipo de parada) recebem uma posição fixa na primeira vez que
+aparecem; cada dia guarda só o seu vetor de minutos nessas posições, e o Pareto de um
+intervalo é a soma dos vetores dos dias, sem voltar aos eventos.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from processamento import agregar_resumo
+from itens import indexar_itens, localizar_item
+
+# granularidade -> frequência do pandas (semanas de segunda a domingo)
+GRANULARIDADES = {"semana": "W-SUN", "mes": "M"}
+CHAVES = ["Periodo", "Centro Trabalho", "Turno"]
+SOMAS = ["Produzido", "Prod_prevista", "Prod_prevista_ajustada", "Tempo_liquido_h", "Paradas_h", "Dias"]
+# Versões dos dados (arquivos ou seleções do acervo) com dias consolidados em memória
+VERSOES_GUARDADAS = 8
+
+
+def periodo_do_dia(dia, granularidade):
+    return pd.Period(pd.Timestamp(dia), freq=GRANULARIDADES[granularidade])
+
+
+class Consolidados:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # versão -> {"dias": dia -> somas por centro/turno, "totais": granularidade ->
+        # período -> somas por centro/turno, "origens": dia -> chave do cálculo,
+        # "paradas": dia -> vetor de minutos de parada, "itens": dia -> agregados por item,
+        # "indice_itens": índice dos itens, None até a próxima busca}; da usada há mais
+        # tempo à mais recente
+        self._versoes = OrderedDict()
+        self._posicoes_paradas = {}  # (centro, tipo de parada) -> posição nos vetores
+
+    def _versao(self, versao):
+        # Chamado com o lock
+        if versao not in self._versoes:
+            self._versoes[versao] = {"dias": {}, "totais": {g: {} for g in GRANULARIDADES}, "origens": {},
+                                     "paradas": {}, "itens": {}, "indice_itens": None}
+            while len(self._versoes) > VERSOES_GUARDADAS:
+                self._versoes.popitem(last=False)
+        self._versoes.move_to_end(versao)
+        return self._versoes[versao]
+
+    def atualizar_dia(self, versao, dia, resumo_turno, paradas_detalhe=None, origem=None, itens=None):
+        """
+        Substitui as somas do dia na versão dos dados e, com `paradas_detalhe` e `itens`,
+        o seu vetor de paradas e os seus agregados por item. `origem` identifica o cálculo
+        que gerou os dados (ver `origem`).
+        """
+        dia = pd.Timestamp(dia).date()
+        parciais = self._somas_do_dia(resumo_turno)
+        with self._lock:
+            dados = self._versao(versao)
+            dados["dias"][dia] = parciais
+            dados["origens"][dia] = origem
+            for granularidade, totais in dados["totais"].items():
+                periodo = periodo_do_dia(dia, granularidade)
+                do_periodo = [p for d, p in sorted(dados["dias"].items()) if periodo_do_dia(d, granularidade) == periodo]
+                totais[periodo] = pd.concat(do_periodo).groupby(level=[0, 1], sort=True).sum()
+            if paradas_detalhe is not None:
+                dados["paradas"][dia] = self._vetor_paradas(paradas_detalhe)
+            if itens is not None:
+                dados["itens"][dia] = itens
+                dados["indice_itens"] = None
+
+    def origem(self, versao, dia):
+        """Chave do cálculo que gerou as somas atuais do dia na versão (None se não houver)."""
+        with self._lock:
+            dados = self._versoes.get(versao)
+            return None if dados is None else dados["origens"].get(pd.Timestamp(dia).date())
+
+    def _dias(self, versao):
+        with self._lock:
+            dados = self._versoes.get(versao)
+            return {} if dados is None else dict(dados["dias"])
+
+    def dias(self, versao, granularidade=None, periodo=None):
+        """Dias já consolidados da versão, todos ou só os do período que contém a data `periodo`."""
+        dias = sorted(self._dias(versao))
+        if granularidade is None or periodo is None:
+            return dias
+        alvo = periodo_do_dia(periodo, granularidade)
+        return [d for d in dias if periodo_do_dia(d, granularidade) == alvo]
+
+    def tabela(self, versao, granularidade, periodo=None, por=("Centro Trabalho",)):
+        """
+        Totais da versão agrupados por `por` (colunas entre Periodo, Centro Trabalho e
+        Turno), com eficiências como razão das somas. Com `periodo` (uma data qualquer
+        dentro dele), só o período que a contém.
+        """
+        with self._lock:
+            dados = self._versoes.get(versao)
+            totais = {} if dados is None else dict(dados["totais"][granularidade])
+        if periodo is not None:
+            alvo = periodo_do_dia(periodo, granularidade)
+            totais = {alvo: totais[alvo]} if alvo in totais else {}
+        if totais:
+            totais = pd.concat([t.reset_index().assign(Periodo=p) for p, t in sorted(totais.items())], ignore_index=True)
+        else:
+            totais = pd.DataFrame(columns=CHAVES + SOMAS).astype(dict.fromkeys(SOMAS, float))
+        return agregar_resumo(totais[CHAVES + SOMAS], list(por))
+
+    def localizar_item(self, versao, item_id, inicio=None, fim=None):
+        """Onde o item rodou (centro, turno, dia e agregados) nos dias consolidados da versão, de inicio a fim."""
+        with self._lock:
+            dados = self._versoes.get(versao)
+            if dados is None:
+                return indexar_itens([])
+            if dados["indice_itens"] is None:
+                dados["indice_itens"] = indexar_itens([i for _, i in sorted(dados["itens"].items())])
+            indice = dados["indice_itens"]
+        linhas = localizar_item(indice, item_id)
+        if inicio is not None:
+            linhas = linhas[linhas["DataProd"] >= pd.Timestamp(inicio)]
+        if fim is not None:
+            linhas = linhas[linhas["DataProd"] <= pd.Timestamp(fim)]
+        return linhas
+
+    def pareto_paradas(self, versao, inicio, fim, centro=None, top=None):
+        """
+        Minutos de parada por tipo da versão somados do dia `inicio` ao `fim` (inclusive), do maior
+        para o menor, com participação e participação acumulada; por centro (ou de todos
+        os centros juntos, com centro=None).
+
+        Returns:
+            DataFrame com Centro Trabalho, Descrição Parada, Parada_min, Parada_h,
+            Participacao_% e Acumulado_%; com `top`, só os `top` maiores tipos de cada centro
+        """
+        inicio, fim = pd.Timestamp(inicio).date(), pd.Timestamp(fim).date()
+        with self._lock:
+            chaves = list(self._posicoes_paradas)
+            dados = self._versoes.get(versao)
+            paradas = {} if dados is None else dados["paradas"]
+            vetores = [v for d, v in sorted(paradas.items()) if inicio <= d <= fim]
+        minutos = np.zeros(len(chaves))
+        for vetor in vetores:
+            minutos[:len(vetor)] += vetor
+
+        tabela = pd.DataFrame(chaves, columns=["Centro Trabalho", "Descrição Parada"]).assign(Parada_min=minutos)
+        if centro is not None:
+            tabela = tabela[tabela["Centro Trabalho"] == centro]
+        else:
+            tabela = tabela.groupby("Descrição Parada", as_index=False)["Parada_min"].sum()
+            tabela.insert(0, "Centro Trabalho", "Todos")
+        tabela = tabela[tabela["Parada_min"] > 0].sort_values(["Centro Trabalho", "Parada_min"], ascending=[True, False])
+
+        por_centro = tabela.groupby("Centro Trabalho")["Parada_min"]
+        tabela["Parada_h"] = tabela["Parada_min"] / 60.0
+        tabela["Participacao_%"] = tabela["Parada_min"] / por_centro.transform("sum") * 100
+        tabela["Acumulado_%"] = tabela.groupby("Centro Trabalho")["Participacao_%"].cumsum()
+        if top is not None:
+            tabela = tabela.groupby("Centro Trabalho").head(top)
+        return tabela.reset_index(drop=True)
+
+    def _vetor_paradas(self, paradas_detalhe):
+        # Chamado com o lock: novos pares (centro, tipo) ganham a próxima posição
+        if paradas_detalhe.empty:
+            return np.zeros(0)
+        por_tipo = paradas_detalhe.groupby(["Centro Trabalho", "Descrição Parada"])["Parada_min"].sum()
+        for chave in por_tipo.index:
+            self._posicoes_paradas.setdefault(chave, len(self._posicoes_paradas))
+        posicoes = np.fromiter((self._posicoes_paradas[c] for c in por_tipo.index), dtype=np.int64, count=len(por_tipo))
+        vetor = np.zeros(len(self._posicoes_paradas))
+        np.add.at(vetor, posicoes, por_tipo.to_numpy(dtype=float))
+        return vetor
+
+    @staticmethod
+    def _somas_do_dia(resumo_turno):
+        if resumo_turno.empty:
+            return pd.DataFrame(columns=SOMAS, dtype=float, index=pd.MultiIndex.from_tuples([], names=CHAVES[1:]))
+        parciais = resumo_turno.groupby(["Centro Trabalho", "Turno"])[SOMAS[:-1]].sum()
+        parciais["Dias"] = 1
+        return parciais.astype(float)
@@ -0,0 +1,216 @@
+"""
+Preparação das tabelas para exibição: nomes de colunas e quadros montados a partir
+dos resultados do dia, sem dependência do Streamlit.
+"""
+import pandas as pd
+
+from processamento import horas_para_hhmm
+
+
+# ----------------- Renomear colunas para exibição (helper) -----------------
+COL_RENAMES = {
+    "Centro Trabalho": "Centro",
+    "Produzido": "Produzido",
+    "Produzido_total": "Produção Total",
+    "Vel_padrao_media": "Velocidade Padrão Média",
+    "Vel_padrao": "Velocidade Padrão",
+    "Vel_ponderada_tempo": "Velocidade Ponderada (tempo)",
+    "Vel_ponderada_freq": "Velocidade Ponderada (frequência)",
+    "Prod_deveria": "Produção Prevista",
+    "Prod_deveria_total": "Produção Prevista Total",
+    "Vel_real": "Velocidade Real",
+    "Vel_real_media": "Velocidade Real Média",
+    "Eficiencia_%": "Eficiência (%)",
+    "Ef_ponderada": "Eficiência Ponderada",
+    "Ef_media": "Eficiência Média",
+    "Ef_media_simples": "Eficiência Média",
+    "Ef_ajustada_media": "Eficiência Ajustada Média",
+    "Ef_ajustada_ponderada": "Eficiência Ajustada Ponderada",
+    "Tempo_liquido_h": "Tempo Líquido (h)",
+    "Tempo_liquido_h_total": "Tempo Líquido Total (h)",
+    "Paradas_min": "Paradas (min)",
+    "Paradas_min_total": "Paradas Totais (min)",
+    "Paradas_h": "Paradas (h)",
+    "Paradas_total_h": "Paradas Totais (h)",
+    "Paradas_obrigatorias_h": "Paradas Obrigatórias (h)",
+    "Duracao_turno_h": "Duração Turno (h)",
+    "Turno": "Turno",
+    "Turnos_ativos": "Turnos Ativos",
+    "Conc": "Combinação",
+    "Prod_prevista_geral": "Produção Prevista Geral",
+    "Prod_prevista_ajustada": "Produção Prevista Ajustada",
+    "Eficiencia_geral_%": "Eficiência Geral (%)",
+    "Eficiencia_ajustada_%": "Eficiência Ajustada (%)",
+    "Tempo_disponivel_h": "Tempo Disponível (h)",
+    "Eficiencia_media": "Eficiência Média",
+    "Descrição Item": "Item",
+    "Qtd": "Quantidade",
+    "Minutos_producao": "Minutos de Produção",
+    "Vel_efetiva": "Velocidade Efetiva",
+    "Razao_vel_%": "Velocidade Efetiva / Padrão (%)",
+    "Produzido_atual": "Produzido (atual)",
+    "Produzido_ref": "Produzido (referência)",
+    "Produzido_delta": "Δ Produzido",
+    "Eficiencia_%_atual": "Eficiência (%) (atual)",
+    "Eficiencia_%_ref": "Eficiência (%) (referência)",
+    "Eficiencia_%_delta": "Δ Eficiência (p.p.)",
+    "Paradas_h_atual": "Paradas (h) (atual)",
+    "Paradas_h_ref": "Paradas (h) (referência)",
+    "Paradas_h_delta": "Δ Paradas (h)",
+}
+
+
+def pretty_cols(df_in):
+    # Retorna cópia com colunas renomeadas para exibição (não altera df original)
+    return df_in.rename(columns={k: v for k, v in COL_RENAMES.items() if k in df_in.columns})
+
+
+# ----------------- Formatos numéricos para exibição -----------------
+# Formato printf de cada coluna numérica; as colunas continuam numéricas (ordenação
+# correta no st.dataframe) e o formato é aplicado pela configuração de colunas.
+INTEIRO = "%.0f"
+DECIMAL = "%.2f"
+FORMATOS = {
+    "Produzido": INTEIRO,
+    "Produzido_total": INTEIRO,
+    "Prod_prevista": INTEIRO,
+    "Prod_prevista_geral": INTEIRO,
+    "Prod_prevista_ajustada": INTEIRO,
+    "Vel_real": INTEIRO,
+    "Vel_padrao": INTEIRO,
+    "Paradas_min": INTEIRO,
+    "Eficiencia_geral_%": "%.0f%%",
+    "Eficiencia_ajustada_%": "%.0f%%",
+    "Paradas_h": DECIMAL,
+    "Paradas_total_h": DECIMAL,
+    "Ef_media": "%.2f%%",
+    "Ef_ajustada_media": "%.2f%%",
+    "Ef_ponderada": "%.2f%%",
+    "Ef_ajustada_ponderada": "%.2f%%",
+    "Qtd": INTEIRO,
+    "Minutos_producao": INTEIRO,
+    "Vel_efetiva": INTEIRO,
+    "Razao_vel_%": "%.0f%%",
+    "Produzido_atual": INTEIRO,
+    "Produzido_ref": INTEIRO,
+    "Produzido_delta": INTEIRO,
+    "Eficiencia_%_atual": DECIMAL,
+    "Eficiencia_%_ref": DECIMAL,
+    "Eficiencia_%_delta": DECIMAL,
+    "Paradas_h_atual": DECIMAL,
+    "Paradas_h_ref": DECIMAL,
+    "Paradas_h_delta": DECIMAL,
+}
+
+
+def colunas_exibicao(colunas):
+    """
+    (coluna, rótulo, formato) de cada coluna: rótulo de COL_RENAMES e formato de
+    FORMATOS (None para colunas sem formato numérico).
+    """
+    return [(c, COL_RENAMES.get(c, c), FORMATOS.get(c)) for c in colunas]
+
+
+def classificar_eficiencia(ef):
+    # Classificar eficiência ajustada
+    if pd.isna(ef):
+        return "❓ Indefinido"
+    if ef >= 95:
+        return "✅ Excelente"
+    elif ef >= 85:
+        return "🟡 Bom"
+    else:
+        return "❌ Ruim"
+
+
+def ranking(resumo_turno, coluna, n=3, piores=False):
+    """As `n` linhas (centro/turno) com maior valor da coluna, ou menor com piores=True."""
+    return resumo_turno.dropna(subset=[coluna]).sort_values(coluna, ascending=piores).head(n).reset_index(drop=True)
+
+
+def resumo_geral(resumo_turno):
+    """Totais do dia mostrados no Resumo Geral (eficiências como média simples dos turnos)."""
+    return {
+        "Produzido": int(resumo_turno["Produzido"].sum()),
+        "Prod_prevista": int(resumo_turno["Prod_prevista"].sum()),
+        "Prod_prevista_ajustada": int(resumo_turno["Prod_prevista_ajustada"].sum()),
+        "Ef_media": resumo_turno["Eficiencia_%"].dropna().mean(),
+        "Ef_ajustada_media": resumo_turno["Eficiencia_ajustada_%"].dropna().mean(),
+        "Paradas_h": resumo_turno["Paradas_h"].sum(),
+    }
+
+
+def montar_sumario_centros(resumo_turno, paradas_detalhe):
+    """Sumário por centro: totais, eficiências médias, classificação e maiores paradas (valores numéricos)."""
+    # Agrupar por Centro para calcular os totais e médias
+    sumario_centros = resumo_turno.groupby("Centro Trabalho").agg(
+        Produzido_total=("Produzido", "sum"),
+        Paradas_total_h=("Paradas_h", "sum"),
+        Ef_media=("Eficiencia_%", "mean"),
+        Ef_ajustada_media=("Eficiencia_ajustada_%", "mean")
+    ).reset_index()
+
+    # Renomear a coluna "Centro Trabalho" para "Centro"
+    sumario_centros = sumario_centros.rename(columns={"Centro Trabalho": "Centro"})
+
+    sumario_centros["Classificação"] = sumario_centros["Ef_ajustada_media"].apply(classificar_eficiencia)
+
+    # Adicionar as 4 maiores paradas por centro
+    if not paradas_detalhe.empty:
+        # Primeiro agregar paradas do mesmo tipo para cada centro
+        paradas_agrupadas = (
+            paradas_detalhe
+            .groupby(["Centro Trabalho", "Descrição Parada"])["Parada_min"]
+            .sum()
+            .reset_index()
+        )
+
+        # Converter minutos para horas
+        paradas_agrupadas["Parada_h"] = paradas_agrupadas["Parada_min"] / 60.0
+        paradas_agrupadas["Parada_fmt"] = paradas_agrupadas["Parada_h"].apply(horas_para_hhmm)
+
+        # Agora selecionar as top 4 paradas por centro
+        paradas_top4 = (
+            paradas_agrupadas
+            .groupby("Centro Trabalho")  # Corrigir chamada do groupby
+            .apply(lambda x: x.nlargest(8, "Parada_min"))
+            .reset_index(level=0, drop=True)
+            .reset_index()
+        )
+
+        # Agrupar novamente para gerar o texto consolidado das paradas
+        paradas_consolidadas = (
+            paradas_top4
+            .groupby("Centro Trabalho")
+            .apply(lambda x: " | ".join(f"{row['Descrição Parada']} ({row['Parada_fmt']})" for _, row in x.iterrows()))
+            .reset_index(name="Maiores Paradas")
+        )
+
+        # Mesclar com sumario_centros
+        sumario_centros = sumario_centros.merge(paradas_consolidadas, left_on="Centro", right_on="Centro Trabalho", how="left")
+
+        # Remover coluna duplicada se presente
+        if "Centro Trabalho" in sumario_centros.columns:
+            sumario_centros = sumario_centros.drop(columns=["Centro Trabalho"])
+    else:
+        sumario_centros["Maiores Paradas"] = "—"
+
+    # Reorganizar colunas para mover "Classificação" após "Centro"
+    colunas_ordenadas = [
+        "Centro", "Classificação", "Produzido_total", "Paradas_total_h",
+        "Ef_media", "Ef_ajustada_media", "Maiores Paradas"
+    ]
+    return sumario_centros[colunas_ordenadas]
+
+
+def montar_sumario_periodo(consolidado):
+    """Sumário por centro de uma semana ou mês a partir dos consolidados (eficiência = razão das somas)."""
+    sumario = consolidado.rename(columns={
+        "Produzido": "Produzido_total",
+        "Paradas_h": "Paradas_total_h",
+        "Eficiencia_%": "Ef_ponderada",
+        "Eficiencia_ajustada_%": "Ef_ajustada_ponderada",
+    })
+    sumario["Classificação"] = sumario["Ef_ajustada_ponderada"].apply(classificar_eficiencia)
+    colunas = ["Centro Trabalho", "Classificação", "Produzido_total", "Paradas_total_h", "Ef_ponderada", "Ef_ajustada_ponderada"]
+    return sumario[colunas]
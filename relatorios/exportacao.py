@@ -0,0 +1,119 @@
+"""
+Exportação do relatório de um ou mais dias produtivos para um xlsx com uma aba por
+tabela: resumo por turno, sumário dos centros, paradas e itens.
+
+As tabelas saem dos resultados de cada dia (etapas metricas e exibicao da Pipeline), um
+dia por vez, e as linhas são escritas num workbook write-only do openpyxl, que grava
+cada aba em disco à medida que recebe as linhas. A memória usada fica a de um dia, seja
+a exportação de um dia ou de um mês.
+
+Os dias já em cache (calculados pela página ou pelo pré-cálculo) saem de lá; os que
+faltam são calculados na hora, fora do cache compartilhado (Pipeline.sem_guardar), para
+uma exportação longa não tirar dele os resultados em uso. As etapas do arquivo inteiro
+que não estiverem no cache compartilhado são calculadas uma vez, numa camada da
+exportação; as de cada dia, numa camada do dia, descartada quando ele é escrito. Por
+isso o período exportado tem um limite de dias.
+"""
+import tempfile
+
+import pandas as pd
+from openpyxl import Workbook
+
+from exibicao import COL_RENAMES
+
+# (título da aba, tabela)
+ABAS = [
+    ("Resumo por turno", "resumo_turno"),
+    ("Sumário dos centros", "sumario_centros"),
+    ("Paradas", "paradas_detalhe"),
+    ("Itens", "itens_por_centro_turno"),
+]
+# Colunas internas que não vão para a planilha
+COLUNAS_OMITIDAS = {"Item_id"}
+# Dias de um mesmo arquivo exportado (os que não estão em cache são calculados na hora)
+DIAS_MAXIMOS = 62
+# Etapas do arquivo inteiro que os dias leem (com as suas entradas)
+ETAPAS_DO_ARQUIVO = ("roteiros", "itens", "regras")
+
+
+def tabelas_do_dia(pipeline_dia):
+    """Tabelas exportadas de um dia, a partir dos resultados memorizados da Pipeline."""
+    metricas = pipeline_dia.executar("metricas")
+    sumario = pipeline_dia.executar("exibicao")["sumario_centros"]
+    dia = pd.Timestamp(pipeline_dia.parametros["data_base"])
+    return {
+        "resumo_turno": metricas["resumo_turno"],
+        "sumario_centros": sumario.assign(DataProd=dia)[["DataProd", *sumario.columns]] if not sumario.empty else sumario,
+        "paradas_detalhe": metricas["paradas_detalhe"],
+        "itens_por_centro_turno": metricas["itens_por_centro_turno"],
+    }
+
+
+def _linhas(df, colunas):
+    df = df.reindex(columns=colunas)
+    for coluna in colunas:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            # Datas produtivas como data (sem a hora 00:00) na planilha
+            df[coluna] = df[coluna].dt.date
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+
+def escrever_relatorio(destino, dias_tabelas):
+    """
+    Escreve o xlsx em `destino` (caminho ou arquivo aberto).
+
+    Args:
+        dias_tabelas: iterável com as tabelas de cada dia (ver tabelas_do_dia); é
+            consumido uma vez, um dia por vez
+
+    Returns:
+        dict tabela -> linhas escritas
+    """
+    livro = Workbook(write_only=True)
+    abas = {tabela: livro.create_sheet(titulo) for titulo, tabela in ABAS}
+    colunas = {}
+    linhas = dict.fromkeys(abas, 0)
+    for tabelas in dias_tabelas:
+        for tabela, aba in abas.items():
+            df = tabelas.get(tabela)
+            if df is None or df.empty:
+                continue
+            if tabela not in colunas:
+                # O primeiro dia com linhas define as colunas da aba
+                colunas[tabela] = [c for c in df.columns if c not in COLUNAS_OMITIDAS]
+                aba.append([COL_RENAMES.get(c, c) for c in colunas[tabela]])
+            for linha in _linhas(df, colunas[tabela]):
+                aba.append(linha)
+                linhas[tabela] += 1
+    livro.save(destino)
+    return linhas
+
+
+def _tabelas_dos_dias(exportacao, dias):
+    # Com arquivos grandes, as métricas dos dias que faltam vêm do pool de processos, à
+    # frente do dia sendo escrito
+    calculados = exportacao.metricas_em_processos(dias)
+    proximo = next(calculados, None)
+    for dia in dias:
+        pipeline_dia = exportacao.com_data(dia).sem_guardar()
+        if proximo is not None and proximo[0] == dia:
+            pipeline_dia.cache.guardar(pipeline_dia.chave("metricas"), proximo[1])
+            proximo = next(calculados, None)
+        yield tabelas_do_dia(pipeline_dia)
+
+
+def exportar_dias(pipeline, dias):
+    """
+    Relatório dos dias produtivos num arquivo temporário aberto e posicionado no início:
+    o conteúdo fica em disco até ser lido.
+    """
+    if len(dias) > DIAS_MAXIMOS:
+        raise ValueError(f"Exportação limitada a {DIAS_MAXIMOS} dias ({len(dias)} pedidos)")
+    exportacao = pipeline.sem_guardar()
+    for etapa in ETAPAS_DO_ARQUIVO:
+        exportacao.executar(etapa)
+    arquivo = tempfile.TemporaryFile(suffix=".xlsx")
+    escrever_relatorio(arquivo, _tabelas_dos_dias(exportacao, dias))
+    arquivo.seek(0)
+    return arquivo
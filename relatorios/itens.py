@@ -0,0 +1,99 @@
+"""
+Dimensão de itens: cada "Descrição Item" do arquivo recebe um ID inteiro (posição na
+dimensão ordenada), e os agregados por item, centro, turno e dia saem de uma única
+passada agrupada por esse ID, ordenados por ele.
+
+Os agregados de vários dias juntos formam um índice ordenado pelo ID (indexar_itens):
+onde um item rodou (centros, turnos e dias) é uma busca binária nesse índice
+(localizar_item), em vez de uma varredura dos dias.
+"""
+import numpy as np
+import pandas as pd
+
+COLUNAS_ITENS = [
+    "Item_id", "Descrição Item", "Centro Trabalho", "Turno", "DataProd",
+    "Qtd", "Minutos_producao", "Vel_padrao", "Vel_efetiva", "Razao_vel_%",
+]
+
+
+def _descricoes(serie):
+    descricoes = serie.astype("string").str.strip()
+    return descricoes.mask(descricoes == "")
+
+
+def dimensao_itens(registros):
+    """Itens distintos do arquivo, ordenados; o ID de um item é a sua posição aqui."""
+    return pd.Index(_descricoes(registros["Descrição Item"]).dropna().unique()).sort_values()
+
+
+def agregar_itens(producao, vel_evento, tempo_evento_h, dimensao=None):
+    """
+    Quantidade, minutos de produção e velocidade efetiva x padrão por item, centro, turno
+    e dia, numa única passada agrupada.
+
+    Args:
+        producao: reportes de produção do dia
+        vel_evento: velocidade padrão de cada reporte, já com os ajustes por centro
+        tempo_evento_h: duração de cada reporte em horas, já saneada
+        dimensao: dimensão de itens do arquivo; sem ela, os IDs valem só para o dia
+
+    Returns:
+        DataFrame com COLUNAS_ITENS ordenado por Item_id
+    """
+    descricoes = _descricoes(producao["Descrição Item"])
+    if dimensao is None:
+        dimensao = pd.Index(descricoes.dropna().unique()).sort_values()
+    item_id = dimensao.get_indexer(descricoes.fillna(""))
+
+    eventos = pd.DataFrame({
+        "Item_id": item_id,
+        "Centro Trabalho": producao["Centro Trabalho"],
+        "Turno": producao["Turno"],
+        "DataProd": producao["DataProd"],
+        "Qtd": pd.to_numeric(producao["Qtd Aprovada"], errors="coerce").fillna(0),
+        "Tempo_h": tempo_evento_h,
+        "Vel_x_tempo": vel_evento * tempo_evento_h,
+    })
+    eventos = eventos[eventos["Item_id"] >= 0]
+
+    itens = (
+        eventos.groupby(["Item_id", "Centro Trabalho", "Turno", "DataProd"], as_index=False, sort=True)
+        .agg(Qtd=("Qtd", "sum"), Tempo_h=("Tempo_h", "sum"), Vel_x_tempo=("Vel_x_tempo", "sum"))
+    )
+    tempo = itens["Tempo_h"].replace(0, np.nan)
+    itens["Descrição Item"] = dimensao.take(itens["Item_id"].to_numpy())
+    itens["Minutos_producao"] = itens["Tempo_h"] * 60
+    itens["Vel_padrao"] = itens["Vel_x_tempo"] / tempo
+    itens["Vel_efetiva"] = itens["Qtd"] / tempo
+    itens["Razao_vel_%"] = itens["Vel_efetiva"] / itens["Vel_padrao"] * 100
+    return itens[COLUNAS_ITENS]
+
+
+def indexar_itens(itens_por_dia):
+    """Agregados de vários dias (com os IDs da mesma dimensão) num frame ordenado por Item_id e dia."""
+    itens_por_dia = [itens for itens in itens_por_dia if not itens.empty]
+    if not itens_por_dia:
+        return pd.DataFrame(columns=COLUNAS_ITENS)
+    indice = pd.concat(itens_por_dia, ignore_index=True)
+    return indice.sort_values(["Item_id", "DataProd"], kind="mergesort", ignore_index=True)
+
+
+def localizar_item(indice, item_id):
+    """Linhas (centro, turno, dia e agregados) de um item no índice, por busca binária no Item_id."""
+    ids = indice["Item_id"].to_numpy()
+    inicio, fim = np.searchsorted(ids, [item_id, item_id + 1])
+    return indice.iloc[inicio:fim]
+
+
+def itens_do_turno(itens, centro, turno, dia=None):
+    """Itens produzidos num centro e turno (e dia), do mais produzido ao menos."""
+    filtro = (itens["Centro Trabalho"] == centro) & (itens["Turno"] == turno)
+    if dia is not None:
+        filtro &= itens["DataProd"] == dia
+    return itens[filtro].sort_values("Qtd", ascending=False)
+
+
+def itens_lentos(itens, centro, limite_pct=100.0):
+    """Itens do centro com velocidade efetiva abaixo de `limite_pct` % da padrão, dos mais lentos aos menos."""
+    lentos = itens[(itens["Centro Trabalho"] == centro) & (itens["Razao_vel_%"] < limite_pct)]
+    return lentos.sort_values("Razao_vel_%")
@@ -0,0 +1,177 @@
+"""
+Relatório em lote, sem o Streamlit, para rodar pelo cron na máquina do relatório:
+
+    */15 * * * * cd /caminho/do/projeto && python relatorios/lote.py
+
+Cada execução:
+1. lê as exportações (.xlsx) novas ou alteradas da pasta vigiada (RELATORIO_ENTRADA) e
+   grava os registros normalizados de cada uma no acervo;
+2. escolhe os dias produtivos fechados (06→06) a gerar: os das exportações novas e,
+   dentro da janela de recuperação, os do acervo que ainda não têm relatório (o dia
+   anterior, normalmente; vários, depois de um período com a máquina parada);
+3. calcula esses dias ao mesmo tempo pela Pipeline e, para cada um, grava as tabelas
+   agregadas no acervo e o xlsx e o PDF em <saída>/AAAA-MM/ (RELATORIO_SAIDA).
+
+Um dia vem da última exportação que o traz, calculado sobre o arquivo inteiro como
+no upload pela página; os dias que só estão no acervo vêm de uma seleção do acervo.
+Exportações ainda sendo copiadas (alteradas há menos de um minuto) ficam para a
+próxima execução, e uma execução que encontra outra em andamento não faz nada.
+
+As gravações no acervo usam as mesmas travas de arquivo por partição e por tabela
+agregada que os uploads pela página (ver acervo.trava_arquivo): um upload em andamento
+numa partição faz o lote esperar por ela, e vice-versa. A trava do próprio lote
+(<saída>/.lote.lock) também é uma trava de arquivo, que o sistema solta se a
+execução morrer.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from acervo import Acervo, trava_arquivo
+from cache_resultados import CacheResultados
+from exportacao import escrever_relatorio, tabelas_do_dia
+from pipeline import Pipeline, impressao_arquivo
+from regras import CAMINHO_REGRAS
+
+PASTA_BASE = os.path.dirname(os.path.abspath(__file__))
+PASTA_ENTRADA = os.environ.get("RELATORIO_ENTRADA") or os.path.join(PASTA_BASE, "entrada")
+PASTA_SAIDA = os.environ.get("RELATORIO_SAIDA") or os.path.join(PASTA_BASE, "saida")
+CAMINHO_VELOCIDADES = os.path.join(PASTA_BASE, "static", "Velocidade.xlsx")
+# Dias para trás em que relatórios que faltam são gerados
+JANELA_DIAS = 31
+# Exportação alterada há menos que isso ainda pode estar sendo copiada
+ESPERA_COPIA_S = 60
+ESTADO = ".lote.json"
+TRAVA = ".lote"
+
+
+def ultimo_dia_fechado(agora=None):
+    """Último dia produtivo encerrado: o dia produtivo de agora começou às 06:00 de hoje ou de ontem."""
+    agora = agora or datetime.now()
+    return (agora - timedelta(hours=6)).date() - timedelta(days=1)
+
+
+def caminhos_do_dia(saida, dia):
+    pasta = os.path.join(saida, f"{dia:%Y-%m}")
+    return (os.path.join(pasta, f"relatorio_producao_{dia:%Y%m%d}.xlsx"),
+            os.path.join(pasta, f"relatorio_producao_{dia:%Y%m%d}.pdf"))
+
+
+def exportacoes_novas(entrada, estado, agora=None):
+    """(caminho, impressão) das exportações da pasta vigiada ainda não processadas, das mais antigas às mais novas."""
+    if not os.path.isdir(entrada):
+        return []
+    agora = agora or time.time()
+    novas = []
+    for nome in os.listdir(entrada):
+        caminho = os.path.join(entrada, nome)
+        if not nome.lower().endswith(".xlsx") or nome.startswith("~$") or not os.path.isfile(caminho):
+            continue
+        modificado = os.path.getmtime(caminho)
+        if agora - modificado < ESPERA_COPIA_S:
+            continue
+        impressao = impressao_arquivo(caminho)
+        if estado.get(nome) != impressao:
+            novas.append((modificado, caminho, impressao))
+    return [(caminho, impressao) for _, caminho, impressao in sorted(novas)]
+
+
+def gerar_dia(pipeline_dia, acervo, saida):
+    """Grava as tabelas agregadas do dia no acervo e o xlsx e o PDF na pasta de saída."""
+    dia = pipeline_dia.parametros["data_base"]
+    tabelas = tabelas_do_dia(pipeline_dia)
+    pdf = pipeline_dia.executar("pdf")
+    acervo.gravar_agregados(dia, tabelas)
+    caminho_xlsx, caminho_pdf = caminhos_do_dia(saida, dia)
+    os.makedirs(os.path.dirname(caminho_xlsx), exist_ok=True)
+    # Gravados à parte e renomeados: ninguém abre um relatório pela metade. O PDF por
+    # último, porque é ele que marca o dia como gerado.
+    escrever_relatorio(f"{caminho_xlsx}.tmp", [tabelas])
+    os.replace(f"{caminho_xlsx}.tmp", caminho_xlsx)
+    with open(f"{caminho_pdf}.tmp", "wb") as arquivo:
+        arquivo.write(pdf)
+    os.replace(f"{caminho_pdf}.tmp", caminho_pdf)
+    return dia
+
+
+def executar_lote(entrada=PASTA_ENTRADA, saida=PASTA_SAIDA, acervo=None, velocidades=CAMINHO_VELOCIDADES,
+                  regras=CAMINHO_REGRAS, janela=JANELA_DIAS, trabalhadores=None, agora=None):
+    """
+    Uma execução do lote (ver o docstring do módulo).
+
+    Returns:
+        dias gerados, em ordem
+    """
+    acervo = acervo or Acervo()
+    cache = CacheResultados(max_workers=trabalhadores)
+    fechado = ultimo_dia_fechado(agora)
+    caminho_estado = os.path.join(saida, ESTADO)
+    estado = {}
+    if os.path.exists(caminho_estado):
+        with open(caminho_estado, encoding="utf-8") as arquivo:
+            estado = json.load(arquivo)
+
+    # Exportações novas: acervo e dias fechados de cada uma (o da mais nova prevalece)
+    fonte_do_dia = {}
+    processadas = {}
+    for caminho, impressao in exportacoes_novas(entrada, estado, agora and agora.timestamp()):
+        pipeline = Pipeline(cache, caminho, velocidades, arquivo_regras=regras)
+        acervo.gravar(pipeline.executar("normalizados"))
+        for dia in pipeline.dias_do_arquivo():
+            if dia <= fechado:
+                fonte_do_dia[dia] = pipeline
+        processadas[os.path.basename(caminho)] = impressao
+        print(f"Exportação {os.path.basename(caminho)} gravada no acervo")
+
+    # Dias do acervo na janela ainda sem relatório
+    faltantes = [dia for dia in acervo.dias()
+                 if fechado - timedelta(days=janela) < dia <= fechado and dia not in fonte_do_dia
+                 and not os.path.exists(caminhos_do_dia(saida, dia)[1])]
+    if faltantes:
+        selecao = Pipeline(cache, acervo.selecao(faltantes[0], faltantes[-1]), velocidades, arquivo_regras=regras)
+        fonte_do_dia.update(dict.fromkeys(faltantes, selecao))
+
+    # As etapas do arquivo inteiro de cada fonte antes, para os dias não as calcularem em dobro
+    for pipeline in {id(p): p for p in fonte_do_dia.values()}.values():
+        pipeline.executar("turnos")
+    dias = sorted(fonte_do_dia)
+    with ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="lote") as executor:
+        gerados = list(executor.map(lambda dia: gerar_dia(fonte_do_dia[dia].com_data(dia), acervo, saida), dias))
+    for dia in gerados:
+        print(f"Relatório de {dia:%d/%m/%Y} gerado")
+
+    if processadas:
+        os.makedirs(saida, exist_ok=True)
+        estado.update(processadas)
+        with open(f"{caminho_estado}.tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(estado, arquivo, indent=1, sort_keys=True)
+        os.replace(f"{caminho_estado}.tmp", caminho_estado)
+    return gerados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios dos dias produtivos fechados a partir das exportações.")
+    parser.add_argument("--entrada", default=PASTA_ENTRADA, help="pasta vigiada das exportações (.xlsx)")
+    parser.add_argument("--saida", default=PASTA_SAIDA, help="pasta dos relatórios gerados")
+    parser.add_argument("--janela", type=int, default=JANELA_DIAS, help="dias para trás em que relatórios faltantes são gerados")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="dias calculados ao mesmo tempo (padrão: do Python)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.saida, exist_ok=True)
+    try:
+        with trava_arquivo(os.path.join(args.saida, TRAVA), esperar=False):
+            gerados = executar_lote(args.entrada, args.saida, janela=args.janela, trabalhadores=args.trabalhadores)
+    except BlockingIOError:
+        print("Outra execução do lote está em andamento")
+        return 0
+    if not gerados:
+        print("Nenhum relatório a gerar")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
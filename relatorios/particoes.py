@@ -0,0 +1,142 @@
+"""
+Execução em partições num pool de processos, em dois pontos da Pipeline:
+
+- Turnos do arquivo inteiro (etapa "turnos", usada pelo lote): depois das regras de
+  roteiro, cada centro é independente nas etapas por linha (término, data produtiva e
+  turno). O frame é dividido por centro, cada parte roda num processo e as partes
+  voltam em ordem de centro e passam pela mesma ordenação estável da execução serial,
+  o que dá exatamente o mesmo frame, linha a linha.
+- Vários dias de uma vez (consolidados semanais/mensais, Pareto e exportação da
+  página): cada dia roda as etapas dia → agregados → metricas num processo, a partir
+  das linhas da sua janela. Os agregados de um dia não se dividem por centro (a escala
+  das paradas e a ordem das paradas saem do dia inteiro), então a partição é o dia; as
+  funções são as mesmas da Pipeline, e os resultados também.
+
+O número de processos vem da variável de ambiente RELATORIO_PROCESSOS (1 desliga; o
+padrão é um por núcleo). Arquivos pequenos rodam sempre em série: enviar as partes
+custaria mais do que o ganho.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from processamento import completar_registros, ordenar_por_dia, fatiar_dias, agregar_dia, calcular_metricas
+
+LINHAS_MINIMAS = 200_000
+
+_pool = None
+_lock = threading.Lock()
+
+
+def processos_configurados():
+    """Processos do pool: RELATORIO_PROCESSOS, ou um por núcleo."""
+    return max(1, int(os.environ.get("RELATORIO_PROCESSOS", os.cpu_count() or 1)))
+
+
+def processos_para(linhas):
+    """Processos a usar com um arquivo de `linhas` linhas: os configurados, ou 1 (em série) se ele for pequeno."""
+    return processos_configurados() if linhas >= LINHAS_MINIMAS else 1
+
+
+def _obter_pool(processos):
+    # Um pool por processo do Streamlit, reaproveitado entre sessões. "spawn" porque o
+    # servidor tem threads: um fork no meio de um lock travaria o filho.
+    global _pool
+    with _lock:
+        if _pool is None or _pool._max_workers != processos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def particionar(df, coluna="Centro Trabalho"):
+    """Partes do frame por valor da coluna, em ordem de valor; cada parte mantém a ordem das linhas."""
+    return [parte for _, parte in df.groupby(coluna, sort=True)]
+
+
+def completar_por_centro(base, processos=None, linhas_minimas=LINHAS_MINIMAS):
+    """
+    completar_registros(base) calculado por centro num pool de processos.
+
+    As partes maiores são enviadas primeiro para os processos terminarem juntos; a junção
+    é sempre na ordem dos centros, seja qual for a ordem em que as partes terminam.
+    """
+    processos = processos_configurados() if processos is None else processos
+    if processos <= 1 or len(base) < linhas_minimas:
+        return completar_registros(base)
+    partes = particionar(base)
+    if len(partes) <= 1:
+        return completar_registros(base)
+
+    pool = _obter_pool(processos)
+    try:
+        futuros = {i: pool.submit(completar_registros, partes[i])
+                   for i in sorted(range(len(partes)), key=lambda i: -len(partes[i]))}
+        resultados = [futuros[i].result() for i in range(len(partes))]
+    except BrokenProcessPool:
+        # Um processo do pool morreu (memória, sinal): recria na próxima e faz esta em série
+        _descartar_pool()
+        return completar_registros(base)
+    return ordenar_por_dia(pd.concat(resultados))
+
+
+def metricas_do_dia(registros, data_base, velocidades, dimensao, regras, completar=True):
+    """
+    Etapas dia → agregados → metricas da Pipeline para um dia, fora dela. `registros` são
+    as linhas com roteiro da janela do dia (completar=True) ou o dia já fatiado dos turnos
+    do arquivo inteiro (completar=False).
+    """
+    if completar:
+        registros = completar_registros(registros, data_base)
+    dia = fatiar_dias(registros, data_base)
+    return calcular_metricas(agregar_dia(dia, velocidades, dimensao, regras), regras)
+
+
+def metricas_por_dia(entradas, processos):
+    """
+    metricas_do_dia de cada entrada (dict com os argumentos), cada uma num processo do pool,
+    gerando os resultados na ordem das entradas. No máximo um dia por processo fica
+    esperando ser consumido, para a memória não crescer com o número de dias.
+    """
+    pool = _obter_pool(processos)
+    em_andamento = deque()
+
+    def proximo():
+        nonlocal pool
+        entrada, futuro = em_andamento.popleft()
+        if futuro is not None:
+            try:
+                return futuro.result()
+            except BrokenProcessPool:
+                # Um processo do pool morreu: este dia e os seguintes em série
+                _descartar_pool()
+                pool = None
+        return metricas_do_dia(**entrada)
+
+    for entrada in entradas:
+        futuro = None
+        if pool is not None:
+            try:
+                futuro = pool.submit(metricas_do_dia, **entrada)
+            except BrokenProcessPool:
+                _descartar_pool()
+                pool = None
+        em_andamento.append((entrada, futuro))
+        if len(em_andamento) > processos:
+            yield proximo()
+    while em_andamento:
+        yield proximo()
@@ -0,0 +1,243 @@
+"""
+Perfil opcional de uma execução do relatório, sem dependência do Streamlit.
+
+Uma CapturaPerfil amostra em intervalos fixos as pilhas da thread do script e das
+threads do pré-cálculo e liga o tracemalloc enquanto dura a execução. As etapas da
+pipeline se registram com `etapa(nome)`; as chamadas st.* e px.* e as seções são atribuídas
+pelas amostras, a partir da linha do script que está executando.
+
+Sem captura ativa, `etapa` só lê uma variável global: as execuções normais não pagam
+pelo perfil.
+"""
+import linecache
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+# Uma captura por processo: o tracemalloc e as threads amostradas são globais
+_captura_ativa = None
+_lock = threading.Lock()
+
+# Chamadas de renderização (st.*) e de montagem de gráficos (px.*) numa linha do script
+CHAMADA_RENDER = re.compile(r"\b((?:st|px)\.(?:sidebar\.|column_config\.)?\w+)\s*\(")
+TOP = 25
+
+
+def etapa(nome):
+    """Contexto que mede uma etapa da pipeline na captura ativa (nenhum efeito sem captura)."""
+    captura = _captura_ativa
+    if captura is None:
+        return nullcontext()
+    return captura._medir_etapa(nome)
+
+
+def _rotulo(arquivo, funcao):
+    return f"{os.path.basename(arquivo)}:{funcao}"
+
+
+class CapturaPerfil:
+    def __init__(self, arquivo_script, intervalo=0.005, prefixos_threads=("precalculo",), limite_s=300):
+        self.arquivo_script = os.path.abspath(arquivo_script)
+        self.intervalo = intervalo
+        self.prefixos_threads = tuple(prefixos_threads)
+        # Uma captura interrompida (st.stop, erro, sessão fechada) para sozinha depois disso
+        self.limite_s = limite_s
+        self.contexto = {}
+        self.ativa = False
+
+    def iniciar(self):
+        """
+        Liga a amostragem e o tracemalloc.
+
+        Returns:
+            False se outra captura já estiver ativa no processo
+        """
+        global _captura_ativa
+        with _lock:
+            if _captura_ativa is not None:
+                return False
+            _captura_ativa = self
+        self._thread_script = threading.get_ident()
+        self._parar = threading.Event()
+        self._lock_etapas = threading.Lock()
+        self._em_curso = {}                  # thread -> pilha de etapas abertas
+        self._etapas = defaultdict(lambda: {"chamadas": 0, "total_s": 0.0, "proprio_s": 0.0, "memoria": 0})
+        self._pilhas = Counter()             # (thread, quadros...) -> amostras
+        self._proprio = Counter()
+        self._acumulado = Counter()
+        self._chamadas_st = Counter()
+        self._secoes = Counter()
+        self.amostras_script = 0
+        self.execucoes = 1
+        self._tracemalloc_proprio = not tracemalloc.is_tracing()
+        if self._tracemalloc_proprio:
+            tracemalloc.start()
+        self.momento = datetime.now()
+        self._inicio = time.perf_counter()
+        self.ativa = True
+        self._amostrador = threading.Thread(target=self._amostrar, name="perfil-amostrador", daemon=True)
+        self._amostrador.start()
+        return True
+
+    def continuar(self):
+        """Segue a captura numa nova execução do script (o Streamlit pode trocar de thread)."""
+        self._thread_script = threading.get_ident()
+        self.execucoes += 1
+
+    def finalizar(self):
+        """Para a amostragem, guarda o snapshot de memória e libera a captura do processo."""
+        global _captura_ativa
+        if not self.ativa:
+            return self
+        self._parar.set()
+        if self._amostrador is not threading.current_thread():
+            self._amostrador.join()
+        self.duracao_s = time.perf_counter() - self._inicio
+        _, self.pico_memoria = tracemalloc.get_traced_memory()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        if self._tracemalloc_proprio:
+            tracemalloc.stop()
+        self.ativa = False
+        with _lock:
+            if _captura_ativa is self:
+                _captura_ativa = None
+        return self
+
+    # ----------------- Coleta -----------------
+    @contextmanager
+    def _medir_etapa(self, nome):
+        pilha = self._em_curso.setdefault(threading.get_ident(), [])
+        aberta = {"filhos_s": 0.0}
+        pilha.append(aberta)
+        memoria_antes = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            memoria = tracemalloc.get_traced_memory()[0] - memoria_antes
+            pilha.pop()
+            # Etapas chamam outras pelo cache: o tempo próprio desconta as internas
+            if pilha:
+                pilha[-1]["filhos_s"] += duracao
+            with self._lock_etapas:
+                registro = self._etapas[nome]
+                registro["chamadas"] += 1
+                registro["total_s"] += duracao
+                registro["proprio_s"] += duracao - aberta["filhos_s"]
+                registro["memoria"] += memoria
+
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            if time.perf_counter() - self._inicio > self.limite_s:
+                self.finalizar()
+                return
+            nomes = {th.ident: th.name for th in threading.enumerate()}
+            for ident, quadro in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                nome = "script" if ident == self._thread_script else nomes.get(ident, "")
+                if nome != "script" and not nome.startswith(self.prefixos_threads):
+                    continue
+                pilha = []
+                while quadro is not None:
+                    pilha.append((quadro.f_code.co_filename, quadro.f_code.co_name, quadro.f_lineno))
+                    quadro = quadro.f_back
+                pilha.reverse()
+                self._registrar(nome, pilha)
+
+    def _registrar(self, thread, pilha):
+        rotulos = [_rotulo(arquivo, funcao) for arquivo, funcao, _ in pilha]
+        self._pilhas[(thread, *rotulos)] += 1
+        if rotulos:
+            self._proprio[rotulos[-1]] += 1
+        for rotulo in set(rotulos):
+            self._acumulado[rotulo] += 1
+        if thread != "script":
+            return
+        self.amostras_script += 1
+
+        # Última linha do script na pilha: uma chamada st.*/px.* se ainda houver quadros abaixo dela
+        do_script = [i for i, (arquivo, _, _) in enumerate(pilha) if arquivo == self.arquivo_script]
+        if not do_script:
+            return
+        arquivo, _, linha = pilha[do_script[-1]]
+        chamada = CHAMADA_RENDER.search(linecache.getline(arquivo, linha))
+        if chamada and do_script[-1] < len(pilha) - 1:
+            self._chamadas_st[chamada.group(1)] += 1
+        secoes = [pilha[i][1] for i in do_script if pilha[i][1].startswith(("secao_", "selecao_"))]
+        self._secoes[secoes[0] if secoes else "(nível do script)"] += 1
+
+    # ----------------- Saídas -----------------
+    def _ms_por_amostra(self):
+        return 1000.0 * self.duracao_s / self.amostras_script if self.amostras_script else 0.0
+
+    def _tabela_amostras(self, contagem, rotulo):
+        total = sum(self._pilhas.values()) if rotulo == "função" else self.amostras_script
+        linhas = [
+            {rotulo: nome, "amostras": n, "%": round(100.0 * n / total, 1) if total else 0.0}
+            for nome, n in contagem.most_common(TOP)
+        ]
+        if rotulo != "função":
+            for linha in linhas:
+                linha["≈ ms"] = round(linha["amostras"] * self._ms_por_amostra(), 1)
+        return pd.DataFrame(linhas).to_string(index=False) if linhas else "(sem amostras)"
+
+    def tabela_etapas(self):
+        """Etapas da pipeline calculadas durante a captura (acertos de cache não aparecem)."""
+        with self._lock_etapas:
+            linhas = [
+                {"etapa": nome, "chamadas": r["chamadas"], "total_ms": round(1000 * r["total_s"], 1),
+                 "proprio_ms": round(1000 * r["proprio_s"], 1), "memoria_liquida_MB": round(r["memoria"] / 2**20, 2)}
+                for nome, r in self._etapas.items()
+            ]
+        colunas = ["etapa", "chamadas", "total_ms", "proprio_ms", "memoria_liquida_MB"]
+        return pd.DataFrame(linhas, columns=colunas).sort_values("proprio_ms", ascending=False, ignore_index=True)
+
+    def relatorio(self):
+        """Relatório em texto: etapas, chamadas st.*/px.*, seções, funções e alocações."""
+        etapas = self.tabela_etapas()
+        alocacoes = self._snapshot.statistics("lineno")[:TOP]
+        partes = [
+            f"Perfil da execução — {self.momento:%d/%m/%Y %H:%M:%S}",
+            *(f"{chave}: {valor}" for chave, valor in self.contexto.items()),
+            f"Duração: {self.duracao_s:.3f} s em {self.execucoes} execução(ões) do script | amostras do script: {self.amostras_script} "
+            f"(intervalo {1000 * self.intervalo:.0f} ms) | pico de memória (tracemalloc): {self.pico_memoria / 2**20:.1f} MB",
+            "",
+            "== Etapas da pipeline (calculadas nesta execução; as lidas do cache não aparecem) ==",
+            etapas.to_string(index=False) if not etapas.empty else "(nenhuma etapa calculada: tudo veio do cache)",
+            "",
+            "== Chamadas st.* e px.* (amostras da thread do script) ==",
+            self._tabela_amostras(self._chamadas_st, "chamada"),
+            "",
+            "== Seções (amostras da thread do script) ==",
+            self._tabela_amostras(self._secoes, "seção"),
+            "",
+            f"== Funções com mais tempo próprio (top {TOP}, todas as threads) ==",
+            self._tabela_amostras(self._proprio, "função"),
+            "",
+            f"== Funções com mais tempo acumulado (top {TOP}, todas as threads) ==",
+            self._tabela_amostras(self._acumulado, "função"),
+            "",
+            f"== Memória ainda alocada ao fim da execução, por linha (top {TOP}) ==",
+            *(f"{s.size / 2**10:10.1f} KiB  {s.count:8d} blocos  {s.traceback[0].filename}:{s.traceback[0].lineno}"
+              for s in alocacoes),
+        ]
+        return "\n".join(partes) + "\n"
+
+    def pilhas_colapsadas(self):
+        """Pilhas no formato "a;b;c amostras" (flamegraph.pl, speedscope)."""
+        return "".join(f"{';'.join(pilha)} {n}\n" for pilha, n in sorted(self._pilhas.items()))
@@ -0,0 +1,346 @@
+"""
+Pipeline do relatório em etapas com entradas declaradas.
+
+Cada etapa é memorizada no CacheResultados pela impressão digital das suas entradas:
+trocar a data produtiva reaproveita os registros normalizados e com roteiros, e só
+refaz da fatia do dia em diante.
+
+    arquivo_registros → registros_brutos → normalizados ┐
+    arquivo_velocidades → velocidades ────────────────────┼→ roteiros → turnos
+    arquivo_regras → regras ──────────────────────────────┘
+    normalizados → itens (dimensão de itens do arquivo)
+    roteiros + data_base → dia → agregados (+ itens, regras) → metricas (+ regras) → exibicao
+    metricas + exibicao → pdf (relatório do dia em PDF)
+
+A atribuição de turnos vem depois das regras de roteiro porque as regras valem para o
+arquivo inteiro, enquanto os turnos podem ser calculados só para a janela do dia. Para o
+arquivo inteiro, os turnos são calculados por centro num pool de processos (particoes).
+Os caminhos da página que pedem vários dias de uma vez (consolidar_dias e a exportação)
+calculam, com arquivos grandes, cada dia num processo desse mesmo pool
+(metricas_em_processos).
+
+No lugar do arquivo de registros pode vir uma Selecao do acervo (período e centros de
+registros já normalizados, ver acervo); as demais etapas não mudam.
+"""
+import hashlib
+import json
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from processamento import (
+    normalizar_registros, normalizar_velocidades, atribuir_roteiros, completar_registros,
+    fatiar_dias, janela_do_dia, agregar_dia, calcular_metricas,
+)
+from exibicao import montar_sumario_centros
+from consolidados import periodo_do_dia
+from itens import dimensao_itens
+from particoes import completar_por_centro, processos_para, metricas_por_dia
+from acervo import PASTA_ACERVO, Selecao
+from regras import CAMINHO_REGRAS, carregar_regras
+from perfil import etapa
+from cache_resultados import CamadaLocal
+
+
+def impressao_arquivo(caminho, conteudo=True):
+    """Impressão digital de um arquivo: hash do conteúdo, ou só tamanho e data de modificação."""
+    if not caminho or not os.path.exists(caminho):
+        return None
+    if not conteudo:
+        estado = os.stat(caminho)
+        return f"{estado.st_size}-{estado.st_mtime_ns}"
+    with open(caminho, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+# Cópias das planilhas já lidas, para um processo novo não abrir o Excel de novo. A
+# pasta é só do usuário do app (0700), ao lado do acervo
+PASTA_PLANILHAS = os.environ.get("RELATORIO_PLANILHAS") or os.path.join(os.path.dirname(os.path.abspath(PASTA_ACERVO)), "planilhas")
+
+
+def _gravar_copia(df, caminho):
+    """
+    Frame lido do Excel em Arrow IPC. Colunas de texto com células de outros tipos
+    (códigos numéricos, datas no meio de textos) viram uma coluna por tipo, para a
+    leitura devolver cada célula com o tipo que o read_excel deu.
+    """
+    colunas, mistas = {}, {}
+    for posicao, (_, col) in enumerate(df.items()):
+        tipos = col[col.notna()].map(lambda v: type(v).__name__) if col.dtype == object else None
+        if tipos is None or set(tipos) <= {"str"}:
+            colunas[str(posicao)] = pa.array(col, from_pandas=True)
+            continue
+        tipos = col.map(lambda v: type(v).__name__)
+        mistas[str(posicao)] = sorted(set(tipos))
+        for tipo in mistas[str(posicao)]:
+            colunas[f"{posicao}:{tipo}"] = pa.array([v if t == tipo else None for v, t in zip(col, tipos)])
+    tabela = pa.table(colunas).replace_schema_metadata({
+        "colunas": json.dumps(list(df.columns)),
+        "objetos": json.dumps([str(p) for p, dtype in enumerate(df.dtypes) if dtype == object]),
+        "mistas": json.dumps(mistas),
+    })
+    feather.write_feather(tabela, caminho, compression="uncompressed")
+
+
+def _ler_copia(caminho):
+    tabela = feather.read_table(caminho)
+    metadados = tabela.schema.metadata
+    nomes = json.loads(metadados[b"colunas"])
+    objetos = set(json.loads(metadados[b"objetos"]))
+    mistas = json.loads(metadados[b"mistas"])
+    colunas = {}
+    for posicao in map(str, range(len(nomes))):
+        if posicao in mistas:
+            valores = np.full(tabela.num_rows, None, dtype=object)
+            for tipo in mistas[posicao]:
+                lista = tabela.column(f"{posicao}:{tipo}").to_pylist()
+                if tipo == "Timestamp":
+                    lista = [None if v is None else pd.Timestamp(v) for v in lista]
+                preenchidos = np.fromiter((v is not None for v in lista), dtype=bool, count=len(lista))
+                valores[preenchidos] = np.asarray(lista, dtype=object)[preenchidos]
+            colunas[posicao] = valores
+        else:
+            col = tabela.column(posicao).to_pandas()
+            # Células vazias de texto voltam como NaN, como na leitura do Excel
+            colunas[posicao] = col.where(col.notna(), np.nan) if posicao in objetos else col
+    df = pd.DataFrame(colunas)
+    df.columns = nomes
+    return df
+
+
+def ler_planilha(caminho, impressao):
+    """
+    pd.read_excel com cópia em disco (Arrow IPC) por impressão do arquivo: enquanto ele
+    não mudar, as próximas leituras, inclusive de outros processos, vêm da cópia. Linhas
+    totalmente vazias são descartadas (a planilha de velocidades declara um milhão de
+    linhas para ~mil preenchidas, e a leitura delas dominava o início).
+    """
+    prefixo = hashlib.md5(os.path.abspath(caminho).encode()).hexdigest()[:12]
+    copia = os.path.join(PASTA_PLANILHAS, f"{prefixo}-{impressao}.arrow")
+    if os.path.exists(copia):
+        try:
+            return _ler_copia(copia)
+        except Exception:
+            pass  # cópia corrompida: lê a planilha e grava de novo
+    df = pd.read_excel(caminho, engine="openpyxl").dropna(how="all").reset_index(drop=True)
+    try:
+        os.makedirs(PASTA_PLANILHAS, mode=0o700, exist_ok=True)
+        os.chmod(PASTA_PLANILHAS, 0o700)
+        # Só uma cópia por arquivo; gravada à parte e renomeada para nunca ser lida pela metade
+        for antiga in os.listdir(PASTA_PLANILHAS):
+            if antiga.startswith(prefixo):
+                os.remove(os.path.join(PASTA_PLANILHAS, antiga))
+        temporario = f"{copia}.{os.getpid()}.tmp"
+        _gravar_copia(df, temporario)
+        os.replace(temporario, copia)
+    except (OSError, TypeError, ValueError, pa.ArrowException):
+        pass  # sem cópia: a próxima leitura abre o Excel de novo
+    return df
+
+
+class Pipeline:
+    # etapa -> entradas (outras etapas ou parâmetros)
+    ENTRADAS = {
+        "registros_brutos": ("arquivo_registros",),
+        "velocidades": ("arquivo_velocidades",),
+        "regras": ("arquivo_regras",),
+        "normalizados": ("registros_brutos",),
+        "roteiros": ("normalizados", "velocidades", "regras"),
+        "turnos": ("roteiros",),
+        "itens": ("normalizados",),
+        "dia": ("roteiros", "data_base"),
+        "agregados": ("dia", "roteiros", "itens", "regras"),
+        "metricas": ("agregados", "regras"),
+        "exibicao": ("metricas",),
+        "pdf": ("metricas", "exibicao"),
+    }
+
+    def __init__(self, cache, arquivo_registros, arquivo_velocidades, data_base=None, consolidados=None,
+                 arquivo_regras=CAMINHO_REGRAS, _impressoes=None):
+        self.cache = cache
+        self.consolidados = consolidados
+        self.parametros = {
+            "arquivo_registros": arquivo_registros,
+            "arquivo_velocidades": arquivo_velocidades,
+            "arquivo_regras": arquivo_regras,
+            "data_base": data_base,
+        }
+        self._impressoes = dict(_impressoes or {})
+        self._impressoes["data_base"] = None if data_base is None else str(data_base)
+
+    def com_data(self, data_base):
+        """Mesma pipeline para outra data produtiva, reaproveitando as impressões dos arquivos."""
+        arquivos = ("arquivo_registros", "arquivo_velocidades", "arquivo_regras")
+        impressoes = {k: v for k, v in self._impressoes.items() if k in arquivos}
+        return Pipeline(self.cache, self.parametros["arquivo_registros"], self.parametros["arquivo_velocidades"],
+                        data_base, self.consolidados, self.parametros["arquivo_regras"], _impressoes=impressoes)
+
+    def sem_guardar(self):
+        """
+        Mesma pipeline lendo o cache compartilhado, mas com o que faltar calculado numa
+        camada própria (ver CamadaLocal), descartada junto com ela; não alimenta os
+        consolidados.
+        """
+        return Pipeline(CamadaLocal(self.cache), self.parametros["arquivo_registros"],
+                        self.parametros["arquivo_velocidades"], self.parametros["data_base"], None,
+                        self.parametros["arquivo_regras"], _impressoes=self._impressoes)
+
+    @property
+    def versao(self):
+        """Versão dos dados: impressão do arquivo de registros."""
+        return self.impressao("arquivo_registros")
+
+    def impressao(self, nome):
+        if nome not in self._impressoes:
+            if isinstance(self.parametros.get(nome), Selecao):
+                self._impressoes[nome] = self.parametros[nome].impressao()
+            elif nome in ("arquivo_registros", "arquivo_regras"):
+                self._impressoes[nome] = impressao_arquivo(self.parametros[nome])
+            elif nome == "arquivo_velocidades":
+                # arquivo estático e grande: tamanho e data de modificação bastam
+                self._impressoes[nome] = impressao_arquivo(self.parametros[nome], conteudo=False)
+            else:
+                partes = [nome] + [self.impressao(e) for e in self.ENTRADAS[nome]]
+                self._impressoes[nome] = hashlib.md5(repr(partes).encode()).hexdigest()
+        return self._impressoes[nome]
+
+    def chave(self, nome):
+        # A versão dos dados vem primeiro para o cache descartar tudo de um arquivo substituído
+        return (self.versao, nome, self.impressao(nome))
+
+    def executar(self, nome):
+        """Saída memorizada da etapa."""
+        return self.cache.obter_ou_calcular(self.chave(nome), partial(self.calcular, nome))
+
+    def em_cache(self, nome):
+        """Saída da etapa se já estiver em cache, sem calcular."""
+        return self.cache.obter(self.chave(nome))
+
+    def dias_do_arquivo(self):
+        """
+        Datas produtivas com registros no arquivo atual. Saem do início dos registros com
+        roteiro (a data produtiva de turnos é a desse início), sem calcular a etapa de
+        turnos do arquivo inteiro.
+        """
+        registros, _, _ = self.executar("roteiros")
+        dias = (registros["DataHoraInicio"].dropna() - pd.Timedelta(hours=6)).dt.normalize().unique()
+        return sorted(pd.Timestamp(d).date() for d in dias)
+
+    def metricas_em_processos(self, dias):
+        """
+        Gera (dia, metricas) dos `dias` que não estão em cache, na ordem deles, calculados
+        num pool de processos, um dia por processo (ver particoes). Não gera nada quando não
+        compensa (um processo só, um dia só ou arquivo pequeno): esses dias seguem pelas
+        etapas da Pipeline, em threads.
+        """
+        faltam = [d for d in dias if self.com_data(d).em_cache("metricas") is None]
+        registros, velocidades, _ = self.executar("roteiros")
+        processos = processos_para(len(registros))
+        if processos <= 1 or len(faltam) <= 1:
+            return
+        # Com os turnos do arquivo inteiro em cache, cada dia é uma fatia deles; senão vai
+        # a janela do dia, completada no processo, como em _dia
+        turnos = self.em_cache("turnos")
+        dimensao, regras = self.executar("itens"), self.executar("regras")
+        entradas = (
+            {"registros": janela_do_dia(registros, d) if turnos is None else fatiar_dias(turnos, d), "data_base": d,
+             "velocidades": velocidades, "dimensao": dimensao, "regras": regras, "completar": turnos is None}
+            for d in faltam
+        )
+        yield from zip(faltam, metricas_por_dia(entradas, processos))
+
+    def consolidar_dias(self, dias):
+        """
+        Garante nos consolidados da versão atual os dias informados, calculados a partir
+        dos arquivos atuais; os que faltam são calculados em paralelo (em processos, com
+        arquivos grandes). É o único ponto que escreve nos consolidados.
+        """
+        pipelines = [self.com_data(d) for d in dias]
+        pipelines = [p for p in pipelines
+                     if self.consolidados.origem(self.versao, p.parametros["data_base"]) != p.chave("metricas")]
+        if not pipelines:
+            return
+        for dia, resultado in self.metricas_em_processos([p.parametros["data_base"] for p in pipelines]):
+            self.cache.guardar(self.com_data(dia).chave("metricas"), resultado)
+        metricas = self.cache.calcular_em_paralelo(
+            {p.chave("metricas"): partial(p.calcular, "metricas") for p in pipelines}
+        )
+        for p in pipelines:
+            resultado = metricas[p.chave("metricas")]
+            self.consolidados.atualizar_dia(self.versao, p.parametros["data_base"], resultado["resumo_turno"],
+                                            resultado["paradas_detalhe"], origem=p.chave("metricas"),
+                                            itens=resultado["itens_por_centro_turno"])
+
+    def consolidar_periodo(self, granularidade):
+        """Garante nos consolidados todos os dias do arquivo na semana ou no mês da data_base."""
+        alvo = periodo_do_dia(self.parametros["data_base"], granularidade)
+        self.consolidar_dias([d for d in self.dias_do_arquivo() if periodo_do_dia(d, granularidade) == alvo])
+
+    def calcular(self, nome):
+        """Calcula a etapa (as entradas continuam vindo do cache)."""
+        with etapa(nome):
+            return getattr(self, f"_{nome}")()
+
+    # ----------------- Etapas -----------------
+    def _registros_brutos(self):
+        fonte = self.parametros["arquivo_registros"]
+        if isinstance(fonte, Selecao):
+            # Período do acervo: registros já normalizados, sem abrir o Excel
+            return fonte.ler()
+        return ler_planilha(self.parametros["arquivo_registros"], self.impressao("arquivo_registros"))
+
+    def _velocidades(self):
+        return ler_planilha(self.parametros["arquivo_velocidades"], self.impressao("arquivo_velocidades"))
+
+    def _regras(self):
+        return carregar_regras(self.parametros["arquivo_regras"])
+
+    def _normalizados(self):
+        registros = self.executar("registros_brutos")
+        if isinstance(self.parametros["arquivo_registros"], Selecao):
+            return registros
+        return normalizar_registros(registros)
+
+    def _roteiros(self):
+        velocidades = normalizar_velocidades(self.executar("velocidades"))
+        return atribuir_roteiros(self.executar("normalizados"), velocidades, self.executar("regras"))
+
+    def _turnos(self):
+        # Arquivo inteiro: com muitas linhas, cada centro é completado num processo
+        registros, _, _ = self.executar("roteiros")
+        return completar_por_centro(registros)
+
+    def _itens(self):
+        return dimensao_itens(self.executar("normalizados"))
+
+    def _dia(self):
+        data_base = self.parametros["data_base"]
+        # Com o arquivo inteiro já processado, basta fatiar; senão só a janela do dia
+        # passa pelas etapas por linha. As duas fatias são idênticas.
+        registros = self.em_cache("turnos")
+        if registros is None:
+            registros, _, _ = self.executar("roteiros")
+            registros = completar_registros(registros, data_base)
+        return fatiar_dias(registros, data_base)
+
+    def _agregados(self):
+        _, velocidades, _ = self.executar("roteiros")
+        return agregar_dia(self.executar("dia"), velocidades, self.executar("itens"), self.executar("regras"))
+
+    def _metricas(self):
+        return calcular_metricas(self.executar("agregados"), self.executar("regras"))
+
+    def _exibicao(self):
+        metricas = self.executar("metricas")
+        return {"sumario_centros": montar_sumario_centros(metricas["resumo_turno"], metricas["paradas_detalhe"])}
+
+    def _pdf(self):
+        # fpdf só é importado quando algum PDF é pedido
+        from relatorio_pdf import gerar_pdf
+        metricas = self.executar("metricas")
+        return gerar_pdf(self.parametros["data_base"], metricas["resumo_turno"], metricas["paradas_detalhe"],
+                         self.executar("exibicao")["sumario_centros"])
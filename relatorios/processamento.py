@@ -0,0 +1,539 @@
+"""
+Processamento dos registros de produção, sem dependência do Streamlit.
+
+As funções deste módulo são chamadas tanto pela página quanto pelas threads de
+pré-cálculo, por isso não exibem mensagens: avisos voltam junto com os
+resultados para a interface mostrar.
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from agregacao import obter_backend
+from itens import agregar_itens
+from regras import carregar_regras, aplicar_roteiros, multiplicador_velocidade
+from velocidades import COLUNA_VIGENCIA, indice_velocidades, inicio_do_dia
+
+# Chaves dos agregados por centro/turno de um dia
+CHAVES_TURNO = ["Centro Trabalho", "Turno", "DataProd"]
+
+
+# ----------------- Funções auxiliares -----------------
+def t(hhmm):
+    return datetime.strptime(hhmm, "%H:%M").time()
+
+def data_produtiva(dt):
+    if pd.isna(dt):
+        return pd.NaT
+    return pd.Timestamp(dt.date()) if dt.time() >= t("06:00") else pd.Timestamp((dt - timedelta(days=1)).date())
+
+def atribuir_turno(datahora, centro_trabalho, prod_date):
+    if pd.isna(datahora) or pd.isna(prod_date):
+        return "Indefinido"
+    hora = datahora.time()
+    sab = prod_date.weekday() == 5
+    if str(centro_trabalho).startswith("GR"):
+        return "Turno Dia (GR)" if t("06:00") <= hora < t("18:00") else "Turno Noite (GR)"
+    if t("06:00") <= hora < t("14:20"):
+        return "Turno 1"
+    if t("14:20") <= hora < (t("22:13") if sab else t("22:40")):
+        return "Turno 2"
+    return "Turno 3"
+
+def intervalo_turno(prod_date, turno, centro_trabalho):
+    sab = prod_date.weekday() == 5
+    if str(centro_trabalho).startswith("GR"):
+        if "Dia" in turno:
+            return (datetime.combine(prod_date.date(), t("06:00")),
+                    datetime.combine(prod_date.date(), t("18:00")))
+        else:
+            return (datetime.combine(prod_date.date(), t("18:00")),
+                    datetime.combine((prod_date + timedelta(days=1)).date(), t("06:00")))
+    if turno == "Turno 1":
+        return (datetime.combine(prod_date.date(), t("06:00")),
+                datetime.combine(prod_date.date(), t("14:20")))
+    if turno == "Turno 2":
+        fim_hora = "22:13" if sab else "22:40"
+        return (datetime.combine(prod_date.date(), t("14:20")),
+                datetime.combine(prod_date.date(), t(fim_hora)))
+    ini_hora = "22:13" if sab else "22:40"
+    return (datetime.combine(prod_date.date(), t(ini_hora)),
+            datetime.combine((prod_date + timedelta(days=1)).date(), t("06:00")))
+
+def horas_para_hhmm(horas):
+    if pd.isna(horas):
+        return ""
+    total_min = int(round(horas * 60))
+    return f"{total_min // 60:02d}:{total_min % 60:02d}"
+
+
+def _mapear_unicos(codigos, convertidos, index):
+    # Leva os valores convertidos de volta às linhas; código -1 (célula vazia) vira NaT
+    return pd.Series(convertidos.array.take(codigos, allow_fill=True), index=index)
+
+
+def _converter_datas(col):
+    """Datas da coluna normalizadas para meia-noite. Células datetime/date são usadas direto;
+    textos são lidos como dd/mm/aaaa, cada valor distinto uma única vez."""
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.normalize()
+    codigos, unicos = pd.factorize(col)
+    unicos = pd.Series(unicos, dtype=object)
+    convertidos = pd.Series(pd.NaT, index=unicos.index, dtype="datetime64[ns]")
+    nativos = unicos.map(lambda v: isinstance(v, date)).astype(bool)
+    if nativos.any():
+        convertidos[nativos] = pd.to_datetime(unicos[nativos], errors="coerce").dt.normalize()
+    if (~nativos).any():
+        convertidos[~nativos] = pd.to_datetime(
+            unicos[~nativos].astype(str).str.strip(), format="%d/%m/%Y", errors="coerce"
+        )
+    return _mapear_unicos(codigos, convertidos, col.index)
+
+
+def _hora_nativa(v):
+    if isinstance(v, timedelta):
+        return pd.Timedelta(v)
+    if isinstance(v, datetime):
+        v = v.time()
+    return pd.Timedelta(hours=v.hour, minutes=v.minute, seconds=v.second, microseconds=v.microsecond)
+
+
+def _converter_horas(col):
+    """Horas da coluna como deslocamento desde a meia-noite. Células time/datetime/timedelta
+    são usadas direto; textos são lidos como HH:MM:SS, cada valor distinto uma única vez."""
+    if pd.api.types.is_timedelta64_dtype(col):
+        return col
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col - col.dt.normalize()
+    codigos, unicos = pd.factorize(col)
+    unicos = pd.Series(unicos, dtype=object)
+    convertidos = pd.Series(pd.NaT, index=unicos.index, dtype="timedelta64[ns]")
+    nativos = unicos.map(lambda v: isinstance(v, (time, datetime, timedelta))).astype(bool)
+    if nativos.any():
+        convertidos[nativos] = pd.to_timedelta(unicos[nativos].map(_hora_nativa))
+    if (~nativos).any():
+        horas = pd.to_datetime(unicos[~nativos].astype(str).str.strip(), format="%H:%M:%S", errors="coerce")
+        convertidos[~nativos] = horas - horas.dt.normalize()
+    return _mapear_unicos(codigos, convertidos, col.index)
+
+
+def parse_dt(df, data_col, hora_col):
+    """
+    Combina as colunas de data e hora em um datetime por registro (NaT quando alguma falta).
+
+    O Excel pode entregar as células já tipadas (datetime, time) ou como texto
+    ("dd/mm/aaaa", "HH:MM:SS"); cada coluna é convertida conforme o tipo das suas
+    células e a combinação é feita somando data e hora, sem passar por strings.
+    """
+    return _converter_datas(df[data_col]) + _converter_horas(df[hora_col])
+
+
+def atribuir_roteiros(df, vel, regras=None):
+    """
+    Atribui roteiros genéricos aos registros sem roteiro conforme as regras do arquivo
+    static/regras.json (ver o módulo regras), e completa a tabela de velocidades com as
+    velocidades dessas regras.
+
+    Args:
+        df: DataFrame principal com registros de produção
+        vel: DataFrame de velocidades
+        regras: regras compiladas; sem elas, as do arquivo padrão
+
+    Returns:
+        DataFrame com roteiros atualizados, tabela de velocidades atualizada e
+        quantidade de registros que receberam roteiro
+    """
+    return aplicar_roteiros(df, vel, carregar_regras() if regras is None else regras)
+
+
+def normalizar_registros(df):
+    """
+    Colunas sem espaços, apenas centros CA, Conc e data/hora de início.
+    Não altera o DataFrame recebido.
+
+    O filtro de centro vem antes de tudo porque as regras de roteiro só tratam centros CA.
+    """
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = df[df["Centro Trabalho"].str.startswith("CA", na=False)].copy()
+    df["Conc"] = df["Centro Trabalho"].astype(str).str.strip() + "-" + df["Roteiro"].astype(str).str.strip()
+    df["DataHoraInicio"] = parse_dt(df, "Data Início", "Hora Início")
+    return df
+
+
+def normalizar_velocidades(vel):
+    """
+    Tabela de velocidades com colunas Conc e Velocidade Padrão, e a data de vigência de
+    cada versão quando a planilha a traz (ver o módulo velocidades). Não altera o
+    DataFrame recebido.
+    """
+    vel = vel.copy()
+    vel.columns = vel.columns.str.strip()
+    vel = vel.rename(columns={"Vel Padrão/Ideal": "Velocidade Padrão"})
+    if "Conc" not in vel.columns:
+        vel = pd.DataFrame({"Conc": pd.Series(dtype=object), "Velocidade Padrão": pd.Series(dtype=float)})
+    # Linhas sem Conc nunca casam com um registro (a planilha traz muitas linhas vazias)
+    vel = vel.dropna(subset=["Conc"])
+    vel["Conc"] = vel["Conc"].astype(str).str.strip()
+    if COLUNA_VIGENCIA in vel.columns:
+        vel[COLUNA_VIGENCIA] = _converter_datas(vel[COLUNA_VIGENCIA])
+    return vel
+
+
+def janela_do_dia(base, data_base):
+    """Linhas que começam na janela de data_base 06:00 com um dia de folga para cada lado."""
+    ini = datetime.combine(data_base, t("06:00"))
+    janela = (base["DataHoraInicio"] >= ini - timedelta(days=1)) & (base["DataHoraInicio"] < ini + timedelta(days=2))
+    return base[janela]
+
+
+def completar_registros(base, data_base=None):
+    """
+    Etapas por linha: data/hora de término, data produtiva e turno.
+
+    Com data_base, só passam por elas as linhas que começam na janela de data_base 06:00
+    com um dia de folga para cada lado; as demais nunca pertencem a esse dia produtivo.
+    """
+    if data_base is not None:
+        base = janela_do_dia(base, data_base)
+    df = base.copy()
+
+    df["DataHoraFim"] = parse_dt(df, "Data Término", "Hora Fim")
+    df["DataProd"] = pd.to_datetime(df["DataHoraInicio"].apply(data_produtiva))
+    df["Turno"] = df.apply(lambda r: atribuir_turno(r["DataHoraInicio"], r["Centro Trabalho"], r["DataProd"]), axis=1)
+    return ordenar_por_dia(df)
+
+
+def ordenar_por_dia(df):
+    """Ordena por (DataProd, Centro Trabalho, DataHoraInicio), com DataProd vazia no fim,
+    deixando as linhas de cada dia contíguas para fatiar_dias."""
+    return df.sort_values(["DataProd", "Centro Trabalho", "DataHoraInicio"], kind="stable", na_position="last")
+
+
+def indexar_dias(df):
+    """
+    Tabela de deslocamentos de um frame ordenado por ordenar_por_dia: para cada DataProd,
+    as posições [inicio, fim) das suas linhas.
+    """
+    datas = df["DataProd"].to_numpy()
+    dias, inicio, contagem = np.unique(datas[~np.isnat(datas)], return_index=True, return_counts=True)
+    return pd.DataFrame({"DataProd": dias, "inicio": inicio, "fim": inicio + contagem})
+
+
+def fatiar_dias(df, inicio, fim=None):
+    """
+    Linhas dos dias produtivos de inicio a fim (inclusive; só inicio se fim for None) de um
+    frame ordenado por ordenar_por_dia. As bordas saem de busca binária em DataProd e o
+    resultado é uma fatia posicional, sem varrer nem copiar o frame.
+    """
+    fim = inicio if fim is None else fim
+    datas = df["DataProd"].to_numpy()
+    i = datas.searchsorted(np.datetime64(pd.Timestamp(inicio)), side="left")
+    j = datas.searchsorted(np.datetime64(pd.Timestamp(fim)), side="right")
+    return df.iloc[i:j]
+
+
+def agregar_dia(df, vel, dimensao_itens=None, regras=None, backend=None):
+    """
+    Agregados por centro/turno dos registros de um dia: paradas, produção com a velocidade
+    média do centro, velocidades ponderadas e itens produzidos (com `dimensao_itens`, os
+    IDs dos itens são os do arquivo inteiro). Os agrupamentos rodam no `backend` de
+    agregação (padrão: o configurado, ver o módulo agregacao).
+
+    Returns:
+        dict com paradas_globais, paradas_detalhe, prod, velocidades_ponderadas,
+        itens_por_centro_turno e avisos
+    """
+    avisos = []
+    backend = obter_backend() if backend is None else backend
+    df = df.copy()
+
+    df["MinEvento"] = (df["DataHoraFim"] - df["DataHoraInicio"]).dt.total_seconds().div(60).fillna(0)
+
+    df["Parada Real Útil"] = pd.to_numeric(
+        df.get("Parada Real Útil", 0).astype(str).str.replace(",", "."),
+        errors="coerce"
+    ).fillna(0)
+
+    sample = df.loc[df["Tipo Registro"] == "Reporte de Parada", "Parada Real Útil"]
+    max_val = float(sample.max()) if not sample.empty else 0.0
+    med_val = float(sample.median()) if not sample.empty else 0.0
+    assume_minutes = (med_val > 24) or (max_val > 48)
+
+    if assume_minutes:
+        df["Parada_min"] = df["Parada Real Útil"]
+        df["Parada_h"] = df["Parada_min"] / 60.0
+    else:
+        df["Parada_h"] = df["Parada Real Útil"]
+        df["Parada_min"] = df["Parada_h"] * 60.0
+
+    paradas = df[df["Tipo Registro"] == "Reporte de Parada"]
+    paradas_globais = backend.agrupar(paradas, CHAVES_TURNO, {"Paradas_min": ("MinEvento", "sum")})
+
+    paradas_detalhe = (
+        backend.agrupar(paradas, CHAVES_TURNO + ["Descrição Parada"], {"Parada_min": ("Parada_min", "sum")})
+        .sort_values("Parada_min", ascending=False)
+    )
+
+    paradas_detalhe["Parada_h"] = paradas_detalhe["Parada_min"] / 60.0
+    paradas_detalhe["Parada_fmt"] = paradas_detalhe["Parada_h"].apply(horas_para_hhmm)
+
+    # Garantir que Qtd Aprovada seja numérica antes do agrupamento
+    df["Qtd Aprovada"] = pd.to_numeric(df["Qtd Aprovada"], errors="coerce").fillna(0)
+
+    # Calcular produção por centro, turno e data
+    prod = backend.agrupar(df[df["Tipo Registro"] == "Reporte de Produção"], CHAVES_TURNO,
+                           {"Qtd Aprovada": ("Qtd Aprovada", "sum")})
+
+    # Preparar velocidades - primeiro agregando todos os roteiros por centro
+    # Obter combinações únicas e válidas de Centro-Roteiro
+    roteiros_validos = df[
+        (df["Centro Trabalho"].notna()) & 
+        (df["Roteiro"].notna()) & 
+        (df["Centro Trabalho"] != "") & 
+        (df["Roteiro"] != "")
+    ][["Centro Trabalho", "Roteiro"]].drop_duplicates()
+
+    # Criar a coluna Conc para cada combinação válida
+    roteiros_validos["Conc"] = roteiros_validos["Centro Trabalho"].astype(str).str.strip() + "-" + roteiros_validos["Roteiro"].astype(str).str.strip()
+
+    # Calcular velocidade média para cada centro de trabalho
+    if not vel.empty and "Velocidade Padrão" in vel.columns:
+        # Mesclar roteiros com as velocidades em vigor no início do dia produtivo
+        dia = df["DataProd"].min()
+        vigentes = indice_velocidades(vel).vigentes_em(inicio_do_dia(dia) if pd.notna(dia) else pd.Timestamp.max)
+        roteiros_velocidades = roteiros_validos.merge(vigentes, on="Conc", how="left")
+
+        # Verificar valores numéricos
+        roteiros_velocidades["Velocidade Padrão"] = pd.to_numeric(roteiros_velocidades["Velocidade Padrão"], errors="coerce")
+
+        # Calcular média por centro
+        centro_velocidades = backend.agrupar(roteiros_velocidades, ["Centro Trabalho"],
+                                             {"Velocidade Padrão": ("Velocidade Padrão", "mean")})
+    else:
+        # Criar um DataFrame vazio se não houver dados de velocidade
+        centro_velocidades = pd.DataFrame({"Centro Trabalho": [], "Velocidade Padrão": []})
+        avisos.append(("warning", "Planilha de velocidades não disponível ou não contém dados válidos"))
+
+    # Tratar valores faltantes e zeros
+    centro_velocidades.loc[centro_velocidades["Velocidade Padrão"].isna(), "Velocidade Padrão"] = 20000  # Valor padrão
+    centro_velocidades.loc[centro_velocidades["Velocidade Padrão"] <= 0, "Velocidade Padrão"] = 20000    # Valor padrão
+
+    # Mesclar velocidades médias com prod
+    prod = prod.merge(centro_velocidades, on="Centro Trabalho", how="left")
+
+    # Garantir que todos os centros tenham velocidades
+    if prod["Velocidade Padrão"].isna().any():
+        avisos.append(("warning", f"{prod['Velocidade Padrão'].isna().sum()} centros sem velocidade padrão. Usando valor padrão."))
+        prod.loc[prod["Velocidade Padrão"].isna(), "Velocidade Padrão"] = 20000
+
+    # ===== Velocidades padrão ponderadas (razão de somas) =====
+    # Cada reporte de produção recebe a velocidade do seu Conc em vigor no início do
+    # evento; tempo fora do intervalo válido é tratado como antes (negativo -> 0, acima
+    # de 24h -> 8h).
+    producao = df[df["Tipo Registro"] == "Reporte de Produção"]
+    if not vel.empty and {"Conc", "Velocidade Padrão"}.issubset(vel.columns):
+        vel_evento = indice_velocidades(vel).por_evento(producao["Conc"], producao["DataHoraInicio"])
+    else:
+        vel_evento = pd.Series(np.nan, index=producao.index)
+
+    vel_evento = vel_evento.fillna(20000)
+    vel_evento = vel_evento.mask(vel_evento <= 0, 20000)
+    tempo_evento_h = (producao["DataHoraFim"] - producao["DataHoraInicio"]).dt.total_seconds().div(3600).fillna(0)
+    tempo_evento_h = tempo_evento_h.clip(lower=0).mask(tempo_evento_h > 24, 8)
+
+    # Uma única passada agrupada com as somas parciais; as médias saem da razão das somas
+    velocidades_ponderadas = backend.agrupar(
+        pd.DataFrame({
+            "Centro Trabalho": producao["Centro Trabalho"],
+            "Turno": producao["Turno"],
+            "DataProd": producao["DataProd"],
+            "Tempo_h": tempo_evento_h,
+            "Vel_x_tempo": vel_evento * tempo_evento_h,
+            "Vel_evento": vel_evento,
+        }),
+        CHAVES_TURNO,
+        {
+            "Tempo_producao_h": ("Tempo_h", "sum"),
+            "Vel_x_tempo": ("Vel_x_tempo", "sum"),
+            "Vel_soma": ("Vel_evento", "sum"),
+            "Frequencia": ("Vel_evento", "size"),
+        },
+    )
+    velocidades_ponderadas["Vel_ponderada_tempo"] = (
+        velocidades_ponderadas["Vel_x_tempo"] / velocidades_ponderadas["Tempo_producao_h"].replace(0, np.nan)
+    )
+    velocidades_ponderadas["Vel_ponderada_freq"] = velocidades_ponderadas["Vel_soma"] / velocidades_ponderadas["Frequencia"]
+
+    # Itens produzidos por centro/turno, com quantidade, minutos e velocidade efetiva x padrão
+    multiplicador = multiplicador_velocidade(producao["Centro Trabalho"], carregar_regras() if regras is None else regras)
+    itens_por_centro_turno = agregar_itens(producao, vel_evento * multiplicador, tempo_evento_h, dimensao_itens)
+
+    return {
+        "paradas_globais": paradas_globais,
+        "paradas_detalhe": paradas_detalhe,
+        "prod": prod,
+        "velocidades_ponderadas": velocidades_ponderadas,
+        "itens_por_centro_turno": itens_por_centro_turno,
+        "avisos": avisos,
+    }
+
+
+def calcular_metricas(agregados, regras=None, backend=None):
+    """
+    Monta o resumo_turno (produção prevista, velocidade real e eficiências) a partir dos
+    agregados do dia. Os agrupamentos rodam no `backend` de agregação.
+
+    Returns:
+        dict com resumo_turno, paradas_detalhe, itens_por_centro_turno e avisos
+        (lista de tuplas (nível, mensagem) para a interface exibir)
+    """
+    avisos = list(agregados["avisos"])
+    backend = obter_backend() if backend is None else backend
+    paradas_globais = agregados["paradas_globais"]
+    paradas_detalhe = agregados["paradas_detalhe"]
+    velocidades_ponderadas = agregados["velocidades_ponderadas"]
+    prod = agregados["prod"].copy()
+
+    # Antes de agrupar, garantir tipos numéricos
+    prod["Qtd Aprovada"] = pd.to_numeric(prod["Qtd Aprovada"], errors="coerce").fillna(0)
+    prod["Velocidade Padrão"] = pd.to_numeric(prod["Velocidade Padrão"], errors="coerce").fillna(0)
+
+
+    # Agrupamento com verificação de erros
+    try:
+        resumo_turno = backend.agrupar(prod, CHAVES_TURNO, {
+            "Produzido": ("Qtd Aprovada", "sum"),
+            "Vel_padrao_media": ("Velocidade Padrão", "mean"),
+        })
+
+        # Verificar se o resultado contém NaN
+        if resumo_turno["Vel_padrao_media"].isna().any():
+            avisos.append(("warning", "Alguns centros/turnos ficaram sem velocidade padrão média"))
+    except Exception as e:
+        avisos.append(("error", f"Erro ao agrupar por centro e turno: {str(e)}"))
+        # Criar um resumo_turno vazio para evitar erros posteriores
+        resumo_turno = pd.DataFrame(columns=["Centro Trabalho", "Turno", "DataProd", 
+                                            "Produzido", "Vel_padrao_media"])
+
+    resumo_turno = resumo_turno.merge(paradas_globais, on=["Centro Trabalho", "Turno", "DataProd"], how="left")
+    resumo_turno["Paradas_min"] = resumo_turno["Paradas_min"].fillna(0)
+    resumo_turno["Paradas_h"] = resumo_turno["Paradas_min"] / 60.0
+
+    # Velocidade de referência: ponderada pelo tempo de produção; sem tempo registrado,
+    # ponderada pela frequência dos roteiros; sem reportes, a média simples do centro
+    resumo_turno = resumo_turno.merge(
+        velocidades_ponderadas[["Centro Trabalho", "Turno", "DataProd", "Vel_ponderada_tempo", "Vel_ponderada_freq"]],
+        on=["Centro Trabalho", "Turno", "DataProd"], how="left"
+    )
+    resumo_turno["Vel_padrao"] = (
+        resumo_turno["Vel_ponderada_tempo"]
+        .fillna(resumo_turno["Vel_ponderada_freq"])
+        .fillna(resumo_turno["Vel_padrao_media"])
+    )
+
+    # Ajustes de velocidade por centro do arquivo de regras (ex.: CA12 em dobro)
+    colunas_velocidade = ["Vel_padrao_media", "Vel_ponderada_tempo", "Vel_ponderada_freq", "Vel_padrao"]
+    multiplicador = multiplicador_velocidade(resumo_turno["Centro Trabalho"], carregar_regras() if regras is None else regras)
+    resumo_turno[colunas_velocidade] = resumo_turno[colunas_velocidade].mul(multiplicador, axis=0)
+
+    # Garantir que não há velocidades zero
+    if (resumo_turno["Vel_padrao"] <= 0).any():
+        avisos.append(("warning", "Encontradas velocidades padrão zeradas ou negativas; usado o valor padrão 20000."))
+        # Substituir por um valor padrão conservador (20000) para evitar divisões por zero
+        resumo_turno.loc[resumo_turno["Vel_padrao"] <= 0, "Vel_padrao"] = 20000
+
+
+    resumo_turno["Duracao_turno_h"] = resumo_turno.apply(
+        lambda r: (intervalo_turno(r["DataProd"], r["Turno"], r["Centro Trabalho"])[1] -
+                   intervalo_turno(r["DataProd"], r["Turno"], r["Centro Trabalho"])[0]).total_seconds() / 3600,
+        axis=1, result_type="reduce"  # dia sem registros: Series vazia, não DataFrame
+    )
+
+    resumo_turno["Tempo_liquido_h"] = (resumo_turno["Duracao_turno_h"] - resumo_turno["Paradas_h"]).clip(lower=0)
+    resumo_turno["Prod_prevista"] = resumo_turno["Vel_padrao"] * resumo_turno["Tempo_liquido_h"]
+    resumo_turno["Prod_deveria"] = resumo_turno["Prod_prevista"]
+
+    # CORRIGIDO - Proteger contra divisão por zero
+    resumo_turno["Tempo_liquido_h_safe"] = resumo_turno["Tempo_liquido_h"].replace(0, np.nan)
+    resumo_turno["Vel_real"] = resumo_turno["Produzido"] / resumo_turno["Tempo_liquido_h_safe"]
+
+    # CORRIGIDO - Proteger cálculo de eficiência
+    resumo_turno["Eficiencia_%"] = np.where(
+        (resumo_turno["Vel_padrao"] > 0) & (resumo_turno["Vel_real"].notna()),
+        (resumo_turno["Vel_real"] / resumo_turno["Vel_padrao"]) * 100,
+        np.nan
+    )
+
+    # Limitação de valores extremos
+    resumo_turno["Eficiencia_%"] = resumo_turno["Eficiencia_%"].clip(lower=0, upper=999.99)
+
+    # ===== Cálculo de Eficiência e Produção Prevista =====
+
+    # Filtrar paradas obrigatórias
+    paradas_obrigatorias = ["REFEIÇÕES", "ACERTO", "TESTE", "PRODUÇÃO INTERROMPIDA"]
+    paradas_obrigatorias_df = backend.agrupar(
+        paradas_detalhe[paradas_detalhe["Descrição Parada"].isin(paradas_obrigatorias)],
+        CHAVES_TURNO, {"Paradas_obrigatorias_h": ("Parada_h", "sum")}
+    )
+
+    # Mesclar paradas obrigatórias ao resumo_turno
+    resumo_turno = resumo_turno.merge(paradas_obrigatorias_df, on=["Centro Trabalho", "Turno", "DataProd"], how="left")
+    resumo_turno["Paradas_obrigatorias_h"] = resumo_turno["Paradas_obrigatorias_h"].fillna(0)
+
+    # Recalcular tempo disponível máximo para produção
+    resumo_turno["Tempo_disponivel_h"] = (resumo_turno["Duracao_turno_h"] - resumo_turno["Paradas_obrigatorias_h"]).clip(lower=0)
+
+    # Produção prevista ajustada (descontando apenas paradas obrigatórias)
+    resumo_turno["Prod_prevista_ajustada"] = resumo_turno["Vel_padrao"] * resumo_turno["Tempo_disponivel_h"]
+
+    # ===== Cálculo de Eficiência Geral e Ajustada =====
+
+    # CORRIGIDO - Eficiência geral com proteção contra divisão por zero
+    resumo_turno["Eficiencia_geral_%"] = np.where(
+        resumo_turno["Prod_prevista"] > 0,
+        (resumo_turno["Produzido"] / resumo_turno["Prod_prevista"]) * 100,
+        np.nan
+    )
+
+    # CORRIGIDO - Eficiência ajustada com proteção contra divisão por zero
+    resumo_turno["Eficiencia_ajustada_%"] = np.where(
+        resumo_turno["Prod_prevista_ajustada"] > 0,
+        (resumo_turno["Produzido"] / resumo_turno["Prod_prevista_ajustada"]) * 100,
+        np.nan
+    )
+
+    # Limitação de valores extremos
+    resumo_turno["Eficiencia_geral_%"] = resumo_turno["Eficiencia_geral_%"].clip(lower=0, upper=999.99)
+    resumo_turno["Eficiencia_ajustada_%"] = resumo_turno["Eficiencia_ajustada_%"].clip(lower=0, upper=999.99)
+
+    # Produção prevista geral (considerando todas as paradas)
+    resumo_turno["Prod_prevista_geral"] = resumo_turno["Vel_padrao"] * resumo_turno["Tempo_liquido_h"]
+
+    return {
+        "resumo_turno": resumo_turno,
+        "paradas_detalhe": paradas_detalhe,
+        "itens_por_centro_turno": agregados["itens_por_centro_turno"],
+        "avisos": avisos,
+    }
+
+
+def agregar_resumo(resumo_turno, por):
+    """
+    Soma linhas de resumo_turno (vários turnos ou dias) pelas colunas `por`. Produção
+    prevista, tempos e paradas são somados; as eficiências são razão das somas, e não a
+    média das eficiências de cada linha, para que turnos longos pesem mais que os curtos.
+    """
+    somas = ["Produzido", "Prod_prevista", "Prod_prevista_ajustada", "Tempo_liquido_h", "Paradas_h"]
+    if resumo_turno.empty:
+        return pd.DataFrame(columns=list(por) + somas + ["Eficiencia_%", "Eficiencia_geral_%", "Eficiencia_ajustada_%"])
+
+    agregado = resumo_turno.groupby(list(por), as_index=False)[somas].sum()
+    prevista = agregado["Prod_prevista"].where(agregado["Prod_prevista"] > 0)
+    prevista_ajustada = agregado["Prod_prevista_ajustada"].where(agregado["Prod_prevista_ajustada"] > 0)
+    # Por linha, Eficiencia_% e Eficiencia_geral_% coincidem: Produzido / Prod_prevista
+    agregado["Eficiencia_%"] = (agregado["Produzido"] / prevista * 100).clip(lower=0, upper=999.99)
+    agregado["Eficiencia_geral_%"] = agregado["Eficiencia_%"]
+    agregado["Eficiencia_ajustada_%"] = (agregado["Produzido"] / prevista_ajustada * 100).clip(lower=0, upper=999.99)
+    return agregado
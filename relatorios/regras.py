@@ -0,0 +1,235 @@
+"""
+Regras de roteiro padrão e ajustes de velocidade, lidas de um arquivo JSON versionado
+(static/regras.json) em vez de fixas no código.
+
+O arquivo é validado e compilado uma vez por conteúdo (hash) em tabelas de consulta:
+todas as regras de roteiro são aplicadas numa única passada sobre os registros sem
+roteiro, não importa quantas sejam.
+
+Formato:
+    {
+      "versao": 1,
+      "roteiros": [
+        {"centro": "CA04", "operacao": "Pre Vincagem", "roteiro": "PREVINCAGEM", "velocidade": 120000},
+        {"centro": "CA09", "operacao_diferente_de": "Colagem", "roteiro": "GERAL", "velocidade": 12000},
+        {"centro": "CA01", "roteiro": "GERAL", "velocidade": 9000},
+        {"centro": "CA05", "por_quantidade": {"limite": 18000,
+                                              "ate_limite": {"roteiro": "RAPIDO", "velocidade": 50000},
+                                              "acima_limite": {"roteiro": "LENTO", "velocidade": 70000}}}
+      ],
+      "multiplicadores_velocidade": {"CA12": 2}
+    }
+
+Um registro sem roteiro recebe a primeira regra do seu centro que casar. Nas regras
+por quantidade, o roteiro de cada item sai da Qtd Aprovada do primeiro registro do item.
+"""
+import hashlib
+import json
+import os
+import threading
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+CAMINHO_REGRAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "regras.json")
+
+_compiladas = {}      # hash do conteúdo -> regras compiladas
+_lock = threading.Lock()
+
+
+def _velocidade_valida(v):
+    return isinstance(v, Number) and not isinstance(v, bool) and v > 0
+
+
+def _validar_destino(destino, onde, erros):
+    if not isinstance(destino, dict):
+        erros.append(f"{onde}: esperado objeto com roteiro e velocidade")
+        return
+    if not isinstance(destino.get("roteiro"), str) or not destino["roteiro"].strip():
+        erros.append(f"{onde}: 'roteiro' deve ser um texto não vazio")
+    if not _velocidade_valida(destino.get("velocidade")):
+        erros.append(f"{onde}: 'velocidade' deve ser um número positivo")
+
+
+def validar_regras(dados):
+    """Levanta ValueError listando todos os problemas encontrados no conteúdo do arquivo."""
+    erros = []
+    if not isinstance(dados, dict):
+        raise ValueError("Arquivo de regras: o conteúdo deve ser um objeto JSON")
+    if not isinstance(dados.get("versao"), int) or isinstance(dados.get("versao"), bool):
+        erros.append("'versao' deve ser um número inteiro")
+
+    roteiros = dados.get("roteiros", [])
+    if not isinstance(roteiros, list):
+        erros.append("'roteiros' deve ser uma lista")
+        roteiros = []
+    for i, regra in enumerate(roteiros, start=1):
+        onde = f"roteiros[{i}]"
+        if not isinstance(regra, dict):
+            erros.append(f"{onde}: esperado objeto")
+            continue
+        if not isinstance(regra.get("centro"), str) or not regra["centro"].strip():
+            erros.append(f"{onde}: 'centro' deve ser um texto não vazio")
+        if "operacao" in regra and "operacao_diferente_de" in regra:
+            erros.append(f"{onde}: use 'operacao' ou 'operacao_diferente_de', não os dois")
+        if "por_quantidade" in regra:
+            faixa = regra["por_quantidade"]
+            if not isinstance(faixa, dict) or not isinstance(faixa.get("limite"), Number):
+                erros.append(f"{onde}.por_quantidade: 'limite' deve ser um número")
+                continue
+            _validar_destino(faixa.get("ate_limite"), f"{onde}.por_quantidade.ate_limite", erros)
+            _validar_destino(faixa.get("acima_limite"), f"{onde}.por_quantidade.acima_limite", erros)
+        else:
+            _validar_destino(regra, onde, erros)
+
+    multiplicadores = dados.get("multiplicadores_velocidade", {})
+    if not isinstance(multiplicadores, dict):
+        erros.append("'multiplicadores_velocidade' deve ser um objeto centro -> fator")
+    else:
+        for centro, fator in multiplicadores.items():
+            if not _velocidade_valida(fator):
+                erros.append(f"multiplicadores_velocidade[{centro}]: o fator deve ser um número positivo")
+
+    if erros:
+        raise ValueError("Arquivo de regras inválido:\n- " + "\n- ".join(erros))
+
+
+def compilar_regras(dados):
+    """
+    Tabelas de consulta das regras já validadas.
+
+    Returns:
+        dict com versao, roteiros (uma linha por regra, com a ordem de prioridade),
+        multiplicadores (Series centro -> fator) e velocidades (Conc -> velocidade das
+        regras, para completar a planilha de velocidades)
+    """
+    linhas = []
+    for ordem, regra in enumerate(dados.get("roteiros", [])):
+        base = {
+            "Ordem": ordem,
+            "Centro Trabalho": regra["centro"].strip(),
+            "Operacao": regra.get("operacao"),
+            "Operacao_excluida": regra.get("operacao_diferente_de"),
+        }
+        if "por_quantidade" in regra:
+            faixa = regra["por_quantidade"]
+            linhas.append({
+                **base,
+                "Limite_qtd": float(faixa["limite"]),
+                "Roteiro": faixa["ate_limite"]["roteiro"].strip(),
+                "Velocidade": float(faixa["ate_limite"]["velocidade"]),
+                "Roteiro_acima": faixa["acima_limite"]["roteiro"].strip(),
+                "Velocidade_acima": float(faixa["acima_limite"]["velocidade"]),
+            })
+        else:
+            linhas.append({
+                **base,
+                "Limite_qtd": np.nan,
+                "Roteiro": regra["roteiro"].strip(),
+                "Velocidade": float(regra["velocidade"]),
+                "Roteiro_acima": None,
+                "Velocidade_acima": np.nan,
+            })
+    roteiros = pd.DataFrame(linhas, columns=[
+        "Ordem", "Centro Trabalho", "Operacao", "Operacao_excluida",
+        "Limite_qtd", "Roteiro", "Velocidade", "Roteiro_acima", "Velocidade_acima",
+    ])
+
+    velocidades = pd.concat([
+        pd.Series(roteiros["Velocidade"].to_numpy(), index=roteiros["Centro Trabalho"] + "-" + roteiros["Roteiro"]),
+        pd.Series(roteiros["Velocidade_acima"].to_numpy(),
+                  index=roteiros["Centro Trabalho"] + "-" + roteiros["Roteiro_acima"].fillna("")),
+    ]).dropna()
+    velocidades = velocidades[~velocidades.index.duplicated()]
+
+    multiplicadores = pd.Series(
+        {str(c).strip(): float(f) for c, f in dados.get("multiplicadores_velocidade", {}).items()}, dtype=float
+    )
+    return {
+        "versao": dados["versao"],
+        "roteiros": roteiros,
+        "multiplicadores": multiplicadores,
+        "velocidades": velocidades,
+    }
+
+
+def carregar_regras(caminho=CAMINHO_REGRAS):
+    """Regras compiladas do arquivo; compila só na primeira vez que vê cada conteúdo."""
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    impressao = hashlib.md5(conteudo).hexdigest()
+    with _lock:
+        regras = _compiladas.get(impressao)
+    if regras is None:
+        dados = json.loads(conteudo.decode("utf-8"))
+        validar_regras(dados)
+        regras = {**compilar_regras(dados), "hash": impressao}
+        with _lock:
+            _compiladas[impressao] = regras
+    return regras
+
+
+def aplicar_roteiros(df, vel, regras):
+    """
+    Atribui roteiro e Conc aos registros sem roteiro conforme as regras, numa passada.
+
+    Returns:
+        (df, vel, roteiros_atribuidos) — vel ganha as velocidades das regras usadas cujo
+        Conc ainda não estava na planilha
+    """
+    df = df.copy()
+    tabela = regras["roteiros"]
+    sem_roteiro = df["Roteiro"].isna() | (df["Roteiro"] == "")
+    candidatos = df.loc[sem_roteiro & df["Centro Trabalho"].isin(tabela["Centro Trabalho"]),
+                        ["Centro Trabalho", "Descrição Operação", "Descrição Item", "Qtd Aprovada"]]
+    if candidatos.empty or tabela.empty:
+        return df, vel, 0
+
+    # Cada registro candidato contra as regras do seu centro (poucas por centro)
+    pares = candidatos.reset_index(names="_linha").merge(tabela, on="Centro Trabalho", how="inner")
+    operacao = pares["Descrição Operação"]
+    casa = (
+        (pares["Operacao"].isna() | (operacao == pares["Operacao"]))
+        & (pares["Operacao_excluida"].isna() | (operacao != pares["Operacao_excluida"]))
+    )
+
+    # Regras por quantidade: a faixa de cada item vem do primeiro registro com Qtd numérica
+    por_qtd = pares["Limite_qtd"].notna()
+    qtd = pd.to_numeric(pares["Qtd Aprovada"], errors="coerce")
+    if por_qtd.any():
+        primeiras = (
+            pares[por_qtd & casa & qtd.notna()]
+            .groupby(["Ordem", "Descrição Item"], sort=False)["Qtd Aprovada"].first()
+            .rename("Qtd_item")
+        )
+        pares = pares.join(primeiras, on=["Ordem", "Descrição Item"])
+        casa &= ~por_qtd | pares["Qtd_item"].notna()
+        acima = por_qtd & (pd.to_numeric(pares["Qtd_item"], errors="coerce") > pares["Limite_qtd"])
+        pares.loc[acima, "Roteiro"] = pares.loc[acima, "Roteiro_acima"]
+        pares.loc[acima, "Velocidade"] = pares.loc[acima, "Velocidade_acima"]
+
+    # Vale a primeira regra (menor Ordem) que casar com o registro
+    escolhidas = pares[casa].sort_values(["_linha", "Ordem"]).drop_duplicates("_linha")
+    linhas = escolhidas["_linha"].to_numpy()
+    df.loc[linhas, "Roteiro"] = escolhidas["Roteiro"].to_numpy()
+    df.loc[linhas, "Conc"] = (escolhidas["Centro Trabalho"] + "-" + escolhidas["Roteiro"]).to_numpy()
+
+    # Completar a planilha com as velocidades das regras usadas que ainda não estão nela
+    usadas = (escolhidas["Centro Trabalho"] + "-" + escolhidas["Roteiro"]).drop_duplicates()
+    novas = usadas[~usadas.isin(vel["Conc"])]
+    if not novas.empty:
+        vel = pd.concat([vel, pd.DataFrame({
+            "Conc": novas.to_numpy(),
+            "Velocidade Padrão": regras["velocidades"].reindex(novas.to_numpy()).to_numpy(),
+        })], ignore_index=True)
+
+    # Regras por quantidade contam itens; as demais contam registros
+    por_item = escolhidas["Limite_qtd"].notna()
+    atribuidos = int((~por_item).sum()) + int(escolhidas[por_item].drop_duplicates(["Ordem", "Descrição Item"]).shape[0])
+    return df, vel, atribuidos
+
+
+def multiplicador_velocidade(centros, regras):
+    """Fator de ajuste da velocidade padrão de cada centro (1 quando não há regra)."""
+    return centros.map(regras["multiplicadores"]).fillna(1.0)
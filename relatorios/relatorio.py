@@ -1,11 +1,15 @@
-import re
+import time
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import os
-import plotly.express as px
-from io import BytesIO
+
+# Marcos do início da execução: o título e a barra lateral aparecem antes das
+# importações pesadas e da leitura das planilhas
+inicio_execucao = time.perf_counter()
+marcos_inicio = {}
+
+
+def marcar_inicio(nome):
+    marcos_inicio[nome] = 1000 * (time.perf_counter() - inicio_execucao)
+
 
 # Função para detectar dispositivos móveis
 def is_mobile():
@@ -26,6 +30,39 @@ st.set_page_config(
     initial_sidebar_state="collapsed" if is_mobile() else "expanded"
 )
 
+# ----------------- Entrada -----------------
+st.title("📊 Relatório de Produção")
+
+FONTE_ACERVO = "Acervo (registros arquivados)"
+source = st.sidebar.selectbox("Fonte de dados", ["Upload (Excel)", "Banco de Dados (SQL)", "Arquivos locais", FONTE_ACERVO], index=0)
+
+# No início do app, após as importações
+upload_option = st.sidebar.radio("Selecione a ação:", ["Ver dados existentes", "Fazer upload de novo arquivo"])
+marcar_inicio("Título e barra lateral")
+
+# ----------------- Importações pesadas -----------------
+# pandas e os módulos do relatório só depois da primeira pintura; o plotly é importado
+# apenas pelas seções que desenham gráficos (Plot Área e comparação)
+import pandas as pd
+from datetime import datetime, timedelta
+import os
+from io import BytesIO
+from functools import partial
+
+from processamento import t, data_produtiva
+from cache_resultados import CacheResultados
+from pipeline import Pipeline
+from exibicao import COL_RENAMES, pretty_cols, colunas_exibicao, montar_sumario_periodo, ranking, resumo_geral
+from consolidados import Consolidados
+from itens import itens_do_turno, itens_lentos
+from comparacao import METRICAS_COMPARADAS, dias_do_periodo, resumos_dos_periodos, comparar_resumos
+from perfil import CapturaPerfil
+from agregacao import obter_backend
+from acervo import Acervo
+from velocidades import COLUNA_VIGENCIA
+from exportacao import DIAS_MAXIMOS, exportar_dias
+marcar_inicio("Importações")
+
 # Caminho do arquivo compartilhado no ambiente do deploy
 SHARED_UPLOAD_PATH = "shared_buffer_data.xlsx"
 
@@ -37,54 +74,65 @@ if "buffer" not in st.session_state:
 if "centro_sel" not in st.session_state:
     st.session_state["centro_sel"] = None
 
-# ----------------- Funções auxiliares -----------------
-def t(hhmm):
-    return datetime.strptime(hhmm, "%H:%M").time()
-
-def data_produtiva(dt):
-    if pd.isna(dt):
-        return pd.NaT
-    return pd.Timestamp(dt.date()) if dt.time() >= t("06:00") else pd.Timestamp((dt - timedelta(days=1)).date())
-
-def atribuir_turno(datahora, centro_trabalho, prod_date):
-    if pd.isna(datahora) or pd.isna(prod_date):
-        return "Indefinido"
-    hora = datahora.time()
-    sab = prod_date.weekday() == 5
-    if str(centro_trabalho).startswith("GR"):
-        return "Turno Dia (GR)" if t("06:00") <= hora < t("18:00") else "Turno Noite (GR)"
-    if t("06:00") <= hora < t("14:20"):
-        return "Turno 1"
-    if t("14:20") <= hora < (t("22:13") if sab else t("22:40")):
-        return "Turno 2"
-    return "Turno 3"
-
-def intervalo_turno(prod_date, turno, centro_trabalho):
-    sab = prod_date.weekday() == 5
-    if str(centro_trabalho).startswith("GR"):
-        if "Dia" in turno:
-            return (datetime.combine(prod_date.date(), t("06:00")),
-                    datetime.combine(prod_date.date(), t("18:00")))
-        else:
-            return (datetime.combine(prod_date.date(), t("18:00")),
-                    datetime.combine((prod_date + timedelta(days=1)).date(), t("06:00")))
-    if turno == "Turno 1":
-        return (datetime.combine(prod_date.date(), t("06:00")),
-                datetime.combine(prod_date.date(), t("14:20")))
-    if turno == "Turno 2":
-        fim_hora = "22:13" if sab else "22:40"
-        return (datetime.combine(prod_date.date(), t("14:20")),
-                datetime.combine(prod_date.date(), t(fim_hora)))
-    ini_hora = "22:13" if sab else "22:40"
-    return (datetime.combine(prod_date.date(), t(ini_hora)),
-            datetime.combine((prod_date + timedelta(days=1)).date(), t("06:00")))
-
-def horas_para_hhmm(horas):
-    if pd.isna(horas):
-        return ""
-    total_min = int(round(horas * 60))
-    return f"{total_min // 60:02d}:{total_min % 60:02d}"
+# ----------------- Perfil opcional da execução -----------------
+# Com ?perfil=1 na URL toda execução completa é perfilada; o interruptor da barra lateral
+# perfila só a próxima execução depois de ligado. Sem nenhum dos dois nada é medido.
+def guardar_perfil(captura):
+    captura.finalizar()
+    st.session_state["perfil_resultado"] = {
+        "momento": captura.momento,
+        "duracao_s": captura.duracao_s,
+        "relatorio": captura.relatorio(),
+        "pilhas": captura.pilhas_colapsadas(),
+    }
+
+perfilar = st.query_params.get("perfil") == "1"
+if st.session_state.get("perfil_proxima"):
+    # A execução causada pelo próprio interruptor não conta; a seguinte é perfilada
+    if st.session_state.get("perfil_armado"):
+        perfilar = True
+        st.session_state["perfil_proxima"] = False
+    st.session_state["perfil_armado"] = not perfilar
+else:
+    st.session_state["perfil_armado"] = False
+
+# Uma captura que não chegou ao fim do script (st.rerun da troca de data, st.stop) segue
+# nesta execução, que é a que o usuário espera
+captura_perfil = st.session_state.get("perfil_captura")
+if captura_perfil is not None and captura_perfil.ativa:
+    captura_perfil.continuar()
+elif perfilar:
+    captura_perfil = CapturaPerfil(__file__)
+    if captura_perfil.iniciar():
+        st.session_state["perfil_captura"] = captura_perfil
+    else:
+        captura_perfil = None
+        st.sidebar.warning("Outra sessão está sendo perfilada agora; esta execução não foi medida.")
+else:
+    captura_perfil = None
+
+@st.cache_resource
+def obter_cache_resultados():
+    # Um único cache por processo, compartilhado por todas as sessões
+    return CacheResultados()
+
+cache_resultados = obter_cache_resultados()
+
+@st.cache_resource
+def obter_consolidados():
+    # Consolidados semanais e mensais, mantidos conforme os dias são calculados
+    return Consolidados()
 
+consolidados = obter_consolidados()
+
+@st.cache_resource
+def obter_acervo():
+    # Registros normalizados de todos os uploads, por mês produtivo e centro (RELATORIO_ACERVO)
+    return Acervo()
+
+acervo = obter_acervo()
+
+# ----------------- Funções auxiliares -----------------
 def cor_eficiencia(val):
     if pd.isna(val): return ''
     if val >= 90:
@@ -94,27 +142,40 @@ def cor_eficiencia(val):
     else:
         return 'background-color: #f8d7da;'  # vermelho claro
 
-# ----------------- Entrada -----------------
-st.title("📊 Relatório de Produção")
-
-source = st.sidebar.selectbox("Fonte de dados", ["Upload (Excel)", "Banco de Dados (SQL)", "Arquivos locais"], index=0)
-
+# ----------------- Dados -----------------
 df = None
 vel = None
+upload_concluido = False
 vel_path = os.path.join("relatorios", "static", "Velocidade.xlsx")
 
+# Etapas memorizadas no cache compartilhado; impressões dos arquivos calculadas sob demanda
+pipeline = Pipeline(cache_resultados, SHARED_UPLOAD_PATH, vel_path, consolidados=consolidados)
+
 # Caminho para salvar o arquivo enviado pela conta do deploy
 deploy_file_path = os.path.join("static", "registros.xlsx")
 
 # Caminho para salvar o arquivo enviado localmente
 local_file_path = "registros_local.xlsx"
 
+# Período do acervo: registros já normalizados de uploads anteriores, sem abrir o Excel
+if source == FONTE_ACERVO:
+    dias_acervo = acervo.dias()
+    if dias_acervo:
+        periodo_acervo = st.sidebar.date_input(
+            "Período do acervo", value=(max(dias_acervo[0], dias_acervo[-1] - timedelta(days=30)), dias_acervo[-1]),
+            min_value=dias_acervo[0], max_value=dias_acervo[-1],
+        )
+        # Enquanto só a primeira data do intervalo foi escolhida, o período é esse dia
+        inicio_acervo, fim_acervo = (periodo_acervo[0], periodo_acervo[-1]) if periodo_acervo else (dias_acervo[0], dias_acervo[-1])
+        centros_acervo = st.sidebar.multiselect("Centros do acervo (vazio = todos)", acervo.centros())
+        pipeline = Pipeline(cache_resultados, acervo.selecao(inicio_acervo, fim_acervo, centros_acervo or None), vel_path,
+                            consolidados=consolidados)
+        df = pipeline.executar("registros_brutos")
+        st.sidebar.info(f"🗄️ Acervo: {len(df)} registros de {inicio_acervo:%d/%m/%Y} a {fim_acervo:%d/%m/%Y}.")
+    else:
+        st.sidebar.warning("⚠️ O acervo ainda está vazio. Faça o upload de um arquivo.")
 # Upload de arquivo pelo usuário
-
-# No início do app, após as importações
-upload_option = st.sidebar.radio("Selecione a ação:", ["Ver dados existentes", "Fazer upload de novo arquivo"])
-
-if upload_option == "Fazer upload de novo arquivo":
+elif upload_option == "Fazer upload de novo arquivo":
     reg_file = st.sidebar.file_uploader("Upload: arquivo de registros (Excel)", type=["xls", "xlsx"], key="new_upload")
     if reg_file is not None:
 
@@ -124,7 +185,7 @@ if upload_option == "Fazer upload de novo arquivo":
                 f.write(reg_file.getbuffer())
             
             # 2. Carregar o arquivo no DataFrame atual
-            df_user = pd.read_excel(SHARED_UPLOAD_PATH, engine="openpyxl")
+            df_user = pipeline.executar("registros_brutos")
             st.success("✅ Arquivo carregado e disponível para todos os usuários.")
             
             # 3. Armazenar na sessão atual também
@@ -132,13 +193,14 @@ if upload_option == "Fazer upload de novo arquivo":
             
             # Atribuir ao DataFrame principal
             df = df_user
+            upload_concluido = True
         except Exception as e:
             st.error(f"Falha ao processar arquivo: {str(e)}")
 # Verificar se existe arquivo compartilhado
 elif os.path.exists(SHARED_UPLOAD_PATH):
     try:
         # Carregar dados do arquivo compartilhado
-        df = pd.read_excel(SHARED_UPLOAD_PATH, engine="openpyxl")
+        df = pipeline.executar("registros_brutos")
         st.sidebar.info("📄 Usando dados compartilhados do último upload.")
     except Exception as e:
         st.sidebar.error(f"Erro ao carregar arquivo compartilhado: {str(e)}")
@@ -147,11 +209,13 @@ else:
 
 if os.path.exists(vel_path):
     try:
-        vel = pd.read_excel(vel_path)
+        vel = pipeline.executar("velocidades")
         if vel.empty:
             st.sidebar.warning("A planilha de velocidades está vazia — velocidades serão tratadas como faltantes.")
         else:
             st.sidebar.success(f"Arquivo de velocidades carregado de static/: {vel_path}")
+            if COLUNA_VIGENCIA in vel.columns.str.strip():
+                st.sidebar.caption(f"Velocidades com vigência ({COLUNA_VIGENCIA}): cada dia usa as versões em vigor nele.")
     except Exception as e:
         vel = pd.DataFrame()
         st.sidebar.error(f"Falha ao ler velocidade em static/: {e}")
@@ -159,485 +223,159 @@ else:
     vel = pd.DataFrame()
     st.sidebar.error(f"Arquivo de velocidades não encontrado em: {vel_path}")
 
+# Regras de roteiro e ajustes de velocidade (static/regras.json), compiladas por conteúdo
+try:
+    regras = pipeline.executar("regras")
+    st.sidebar.caption(f"Regras de roteiro: versão {regras['versao']} ({len(regras['roteiros'])} regras)")
+except (OSError, ValueError) as e:
+    st.error(f"Falha ao carregar o arquivo de regras (static/regras.json): {e}")
+    st.stop()
+
+# Backend das agregações (RELATORIO_BACKEND): um nome inválido ou sem a dependência
+# instalada para aqui, e não no meio do cálculo de um dia
+try:
+    backend_agregacao = obter_backend()
+    st.sidebar.caption(f"Agregações: {backend_agregacao.nome}")
+except (ValueError, ImportError) as e:
+    st.error(f"Backend de agregação indisponível (RELATORIO_BACKEND): {e}")
+    st.stop()
+marcar_inicio("Planilhas e regras")
+
 if df is None:
     df = pd.DataFrame()
 if vel is None:
     vel = pd.DataFrame()
 
-# ----------------- Processamento (quando há registros) -----------------
-if not df.empty:
-    if vel.empty:
-        st.sidebar.warning("A planilha de velocidades (static) não foi encontrada ou está vazia — velocidades serão tratadas como faltantes.")
-    df.columns = df.columns.str.strip()
-    vel.columns = vel.columns.str.strip()
-
-    def parse_dt(data_col, hora_col):
-        return pd.to_datetime(
-            df[data_col].astype(str).str.strip() + " " +
-            df[hora_col].astype(str).str.strip(),
-            format="%d/%m/%Y %H:%M:%S", errors="coerce"
-        )
+# ----------------- Fragmentos -----------------
+# Cada seção roda de novo sozinha quando o usuário interage com ela; todas leem os
+# resultados do dia do cache compartilhado, então nenhuma refaz o trabalho das outras.
 
-    df["DataHoraInicio"] = parse_dt("Data Início", "Hora Início")
-    df["DataHoraFim"] = parse_dt("Data Término", "Hora Fim")
-    df["DataProd"] = df["DataHoraInicio"].apply(data_produtiva)
-    df["Turno"] = df.apply(lambda r: atribuir_turno(r["DataHoraInicio"], r["Centro Trabalho"], r["DataProd"]), axis=1)
-
-    df["Conc"] = df["Centro Trabalho"].astype(str).str.strip() + "-" + df["Roteiro"].astype(str).str.strip()
-    vel = vel.rename(columns={"Vel Padrão/Ideal": "Velocidade Padrão"})
-
-    def atribuir_roteiros(df, vel):
-        """
-        Atribui roteiros genéricos para diversos centros de trabalho baseado em regras específicas:
-        - CA05: Baseado na quantidade aprovada (≤18000: 50000, >18000: 70000)
-        - CA04: Operação "Pre Vincagem" - velocidade 60000
-        - CA16: Operação "Pre Vincagem" - velocidade 100000 (50000*2)
-        - CA15: Operação "Aplic Ink-Jet / Colagem" - velocidade 10000
-        - CA09: Qualquer operação diferente de "Colagem" - velocidade 12000
-        - CA01: Qualquer operação com roteiro vazio - velocidade 9000
-        
-        Args:
-            df: DataFrame principal com registros de produção
-            vel: DataFrame de velocidades
-        
-        Returns:
-            DataFrame com roteiros atualizados e tabela de velocidades atualizada
-        """
-        # Trabalhar com uma cópia para não afetar o original durante o processamento
-        df = df.copy()
-        
-        # Contador para roteiros atribuídos
-        roteiros_atribuidos = 0
-        
-        # ----- Regra 1: CA05 (baseada em Qtd Aprovada) -----
-        registros_ca05_sem_roteiro = df[
-            (df["Centro Trabalho"] == "CA05") & 
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        ]
-
-        if not registros_ca05_sem_roteiro.empty:
-            itens_unicos = {}
-            for _, row in registros_ca05_sem_roteiro.iterrows():
-                item = row["Descrição Item"]
-    
-                # Converte o valor de Qtd Aprovada para número, com segurança
-                try:
-                    qtd_aprovada = float(row["Qtd Aprovada"])
-                except (ValueError, TypeError):
-                    continue  # pula se não for possível converter
-        
-                if item not in itens_unicos:
-                    itens_unicos[item] = {
-                        "qtd": qtd_aprovada,
-                        "roteiro": "RAPIDO" if qtd_aprovada <= 18000 else "LENTO",
-                        "velocidade": 50000 if qtd_aprovada <= 18000 else 70000
-                    }
-            # Atribuir roteiros e atualizar o DataFrame
-            for item, info in itens_unicos.items():
-                mask = (
-                    (df["Centro Trabalho"] == "CA05") & 
-                    (df["Descrição Item"] == item) & 
-                    (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-                )
-                
-                df.loc[mask, "Roteiro"] = info["roteiro"]
-                df.loc[mask, "Conc"] = df.loc[mask, "Centro Trabalho"].astype(str) + "-" + df.loc[mask, "Roteiro"].astype(str)
-                
-            # Atualizar velocidades
-            for item, info in itens_unicos.items():
-                conc = f"CA05-{info['roteiro']}"
-                if conc not in vel["Conc"].values:
-                    nova_vel = pd.DataFrame({
-                        "Conc": [conc],
-                        "Velocidade Padrão": [info["velocidade"]]
-                    })
-                    vel = pd.concat([vel, nova_vel], ignore_index=True)
-                    
-            roteiros_atribuidos += len(itens_unicos)
-            
-        # ----- Regra 2: CA04 e CA16 (Pre Vincagem) -----
-# ----- Regra 2: CA04 e CA16 (Pre Vincagem) -----
-        # CA04 - Pre Vincagem - 60000
-        mask_ca04 = (
-            (df["Centro Trabalho"] == "CA04") & 
-            (df["Descrição Operação"] == "Pre Vincagem") &
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca04.any():
-            df.loc[mask_ca04, "Roteiro"] = "PREVINCAGEM"
-            df.loc[mask_ca04, "Conc"] = "CA04-PREVINCAGEM"
-            if "CA04-PREVINCAGEM" not in vel["Conc"].values:
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA04-PREVINCAGEM"],
-                    "Velocidade Padrão": [120000]
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca04.sum()
-            
-        # CA04 - Aplic Ink-Jet / Pré-Vincagem - velocidade padrão * 2
-        mask_ca04_inkjet = (
-            (df["Centro Trabalho"] == "CA04") & 
-            (df["Descrição Operação"] == "Aplic Ink-Jet / Pré-Vincagem") &
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca04_inkjet.any():
-            df.loc[mask_ca04_inkjet, "Roteiro"] = "INKJET_PREVINCAGEM"
-            df.loc[mask_ca04_inkjet, "Conc"] = "CA04-INKJET_PREVINCAGEM"
-            if "CA04-INKJET_PREVINCAGEM" not in vel["Conc"].values:
-                # Usando a mesma base de CA04-PREVINCAGEM, mas multiplicando por 2
-                velocidade_base = 30000  # Velocidade padrão do CA04-PREVINCAGEM
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA04-INKJET_PREVINCAGEM"],
-                    "Velocidade Padrão": [velocidade_base * 2]  # Multiplicando por 2
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca04_inkjet.sum()
-        
-        # CA16 - Pre Vincagem - 50000*2 = 100000
-        mask_ca16 = (
-            (df["Centro Trabalho"] == "CA16") & 
-            (df["Descrição Operação"] == "Pre Vincagem") &
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca16.any():
-            df.loc[mask_ca16, "Roteiro"] = "PREVINCAGEM"
-            df.loc[mask_ca16, "Conc"] = "CA16-PREVINCAGEM"
-            if "CA16-PREVINCAGEM" not in vel["Conc"].values:
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA16-PREVINCAGEM"],
-                    "Velocidade Padrão": [100000]
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca16.sum()
-        
-        # ----- Regra 3: CA15 (Aplic Ink-Jet / Colagem) -----
-        mask_ca15 = (
-            (df["Centro Trabalho"] == "CA15") & 
-            (df["Descrição Operação"] == "Aplic Ink-Jet / Colagem") &
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca15.any():
-            df.loc[mask_ca15, "Roteiro"] = "INKJET"
-            df.loc[mask_ca15, "Conc"] = "CA15-INKJET"
-            if "CA15-INKJET" not in vel["Conc"].values:
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA15-INKJET"],
-                    "Velocidade Padrão": [10000]
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca15.sum()
-        
-        # ----- Regra 4: CA09 (Qualquer operação diferente de Colagem) -----
-        mask_ca09 = (
-            (df["Centro Trabalho"] == "CA09") & 
-            (df["Descrição Operação"] != "Colagem") &
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca09.any():
-            df.loc[mask_ca09, "Roteiro"] = "GERAL"
-            df.loc[mask_ca09, "Conc"] = "CA09-GERAL"
-            if "CA09-GERAL" not in vel["Conc"].values:
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA09-GERAL"],
-                    "Velocidade Padrão": [12000]
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca09.sum()
-        
-        # ----- Regra 5: CA01 (Roteiro vazio) - velocidade 9000 -----
-        mask_ca01 = (
-            (df["Centro Trabalho"] == "CA01") & 
-            (df["Roteiro"].isna() | (df["Roteiro"] == ""))
-        )
-        if mask_ca01.any():
-            df.loc[mask_ca01, "Roteiro"] = "GERAL"
-            df.loc[mask_ca01, "Conc"] = "CA01-GERAL"
-            if "CA01-GERAL" not in vel["Conc"].values:
-                nova_vel = pd.DataFrame({
-                    "Conc": ["CA01-GERAL"],
-                    "Velocidade Padrão": [9000]
-                })
-                vel = pd.concat([vel, nova_vel], ignore_index=True)
-            roteiros_atribuidos += mask_ca01.sum()
-            
-        if roteiros_atribuidos > 0:
-            st.success(f"Roteiros atribuídos para {roteiros_atribuidos} registros sem roteiro definido")
-        
-        return df, vel    
-    # Aplicar regra para CA05
-    df, vel = atribuir_roteiros(df, vel)
-
-    df = df[df["Centro Trabalho"].str.startswith("CA", na=False)].copy()
-
-    data_sugerida = df["DataProd"].min().date() if pd.notna(df["DataProd"].min()) else datetime.today().date()
+@st.fragment
+def selecao_dados(data_sugerida):
     data_base = st.date_input("📆 Data produtiva (06→06)", value=data_sugerida)
+    st.session_state["data_base"] = data_base
     janela_ini = datetime.combine(data_base, t("06:00"))
     janela_fim = janela_ini + timedelta(days=1)
     st.caption(f"Janela ativa: {janela_ini:%d/%m/%Y %H:%M} → {janela_fim:%d/%m/%Y %H:%M}")
 
-    df = df[df["DataProd"] == pd.Timestamp(data_base)].copy()
+    # A data muda todas as seções: só então o script inteiro roda de novo (etapas em cache)
+    aplicada = st.session_state.get("data_base_aplicada")
+    if aplicada is not None and aplicada != data_base:
+        st.session_state["data_base_aplicada"] = data_base
+        st.rerun(scope="app")
 
-    df["MinEvento"] = (df["DataHoraFim"] - df["DataHoraInicio"]).dt.total_seconds().div(60).fillna(0)
 
-    df["Parada Real Útil"] = pd.to_numeric(
-        df.get("Parada Real Útil", 0).astype(str).str.replace(",", "."),
-        errors="coerce"
-    ).fillna(0)
+# Segundos entre duas leituras do progresso do pré-cálculo enquanto faltam dias
+INTERVALO_PROGRESSO = 1
 
-    sample = df.loc[df["Tipo Registro"] == "Reporte de Parada", "Parada Real Útil"]
-    max_val = float(sample.max()) if not sample.empty else 0.0
-    med_val = float(sample.median()) if not sample.empty else 0.0
-    assume_minutes = (med_val > 24) or (max_val > 48)
 
-    if assume_minutes:
-        df["Parada_min"] = df["Parada Real Útil"]
-        df["Parada_h"] = df["Parada_min"] / 60.0
-    else:
-        df["Parada_h"] = df["Parada Real Útil"]
-        df["Parada_min"] = df["Parada_h"] * 60.0
-
-    paradas_globais = (
-        df[df["Tipo Registro"] == "Reporte de Parada"]
-        .groupby(["Centro Trabalho", "Turno", "DataProd"])["MinEvento"]
-        .sum()
-        .reset_index(name="Paradas_min")
-    )
+def barra_precalculo(feitos, total):
+    st.progress(feitos / total if total else 1.0, text=f"Pré-cálculo dos dias: {feitos}/{total}")
 
-    paradas_detalhe = (
-        df[df["Tipo Registro"] == "Reporte de Parada"]
-        .groupby(["Centro Trabalho", "Turno", "DataProd", "Descrição Parada"])["Parada_min"]
-        .sum()
-        .reset_index()
-        .sort_values("Parada_min", ascending=False)
-    )
 
-    paradas_detalhe["Parada_h"] = paradas_detalhe["Parada_min"] / 60.0
-    paradas_detalhe["Parada_fmt"] = paradas_detalhe["Parada_h"].apply(horas_para_hhmm)
-   
-    # Garantir que Qtd Aprovada seja numérica antes do agrupamento
-    df["Qtd Aprovada"] = pd.to_numeric(df["Qtd Aprovada"], errors="coerce").fillna(0)
-
-    # Calcular produção por centro, turno e data
-    prod = (
-        df[df["Tipo Registro"] == "Reporte de Produção"]
-        .groupby(["Centro Trabalho", "Turno", "DataProd"], as_index=False)["Qtd Aprovada"]
-        .sum()
-    )
+@st.fragment(run_every=INTERVALO_PROGRESSO)
+def acompanhar_precalculo(versao):
+    """Barra do pré-cálculo, relida do cache a cada INTERVALO_PROGRESSO segundos."""
+    progresso = cache_resultados.progresso(versao)
+    if progresso is not None:
+        barra_precalculo(*progresso)
+    if progresso is None or progresso[0] >= progresso[1]:
+        # Acabou (ou outra versão tomou o cache): o app roda de novo uma vez e põe a
+        # barra fixa no lugar deste fragmento, que para de rodar
+        st.rerun(scope="app")
 
-    # Preparar velocidades - primeiro agregando todos os roteiros por centro
-    # Obter combinações únicas e válidas de Centro-Roteiro
-    roteiros_validos = df[
-        (df["Centro Trabalho"].notna()) & 
-        (df["Roteiro"].notna()) & 
-        (df["Centro Trabalho"] != "") & 
-        (df["Roteiro"] != "")
-    ][["Centro Trabalho", "Roteiro"]].drop_duplicates()
-
-    # Criar a coluna Conc para cada combinação válida
-    roteiros_validos["Conc"] = roteiros_validos["Centro Trabalho"].astype(str).str.strip() + "-" + roteiros_validos["Roteiro"].astype(str).str.strip()
-
-    # Calcular velocidade média para cada centro de trabalho
-    if not vel.empty and "Velocidade Padrão" in vel.columns:
-        # Preparar dados para merge
-        vel["Conc"] = vel["Conc"].astype(str).str.strip()
-        
-        # Mesclar roteiros com velocidades
-        roteiros_velocidades = roteiros_validos.merge(vel[["Conc", "Velocidade Padrão"]], on="Conc", how="left")
-        
-        # Verificar valores numéricos
-        roteiros_velocidades["Velocidade Padrão"] = pd.to_numeric(roteiros_velocidades["Velocidade Padrão"], errors="coerce")
-        
-        # Calcular média por centro
-        centro_velocidades = roteiros_velocidades.groupby("Centro Trabalho")["Velocidade Padrão"].mean().reset_index()
-        
-        # Depuração - mostrar as velocidades calculadas
-        print("\n=== Velocidades médias por centro de trabalho ===")
-        print(centro_velocidades)
-    else:
-        # Criar um DataFrame vazio se não houver dados de velocidade
-        centro_velocidades = pd.DataFrame({"Centro Trabalho": [], "Velocidade Padrão": []})
-        st.warning("Planilha de velocidades não disponível ou não contém dados válidos")
-
-    # Tratar valores faltantes e zeros
-    centro_velocidades.loc[centro_velocidades["Velocidade Padrão"].isna(), "Velocidade Padrão"] = 20000  # Valor padrão
-    centro_velocidades.loc[centro_velocidades["Velocidade Padrão"] <= 0, "Velocidade Padrão"] = 20000    # Valor padrão
-
-    # Mesclar velocidades médias com prod
-    prod = prod.merge(centro_velocidades, on="Centro Trabalho", how="left")
-
-    # Garantir que todos os centros tenham velocidades
-    if prod["Velocidade Padrão"].isna().any():
-        st.warning(f"{prod['Velocidade Padrão'].isna().sum()} centros sem velocidade padrão. Usando valor padrão.")
-        prod.loc[prod["Velocidade Padrão"].isna(), "Velocidade Padrão"] = 20000
-
-
-    # Verificação final
-    print("\n=== Velocidades finais por centro (após ajustes) ===")
-    print(prod.groupby("Centro Trabalho")["Velocidade Padrão"].mean())
-    
-    # Criar DataFrame com os itens produzidos por centro e turno
-    # Este DataFrame deve vir do df original, não do prod já agrupado
-    itens_por_centro_turno = (
-        df[df["Tipo Registro"] == "Reporte de Produção"]
-        [["Centro Trabalho", "Turno", "DataProd", "Descrição Item"]]
-        .dropna(subset=["Descrição Item"])  # Remover linhas sem descrição
-        .drop_duplicates()  # Remover duplicatas
-        .groupby(["Centro Trabalho", "Turno", "DataProd"])["Descrição Item"]
-        .apply(list)
-        .reset_index()
-    )
 
-    # Depuração: verificar o conteúdo
-    print(f"Número de itens por centro/turno: {len(itens_por_centro_turno)}")
-    if not itens_por_centro_turno.empty:
-        print(f"Exemplo: {itens_por_centro_turno.iloc[0]}")
+GRANULARIDADES_EXIBICAO = {"Dia": None, "Semana": "semana", "Mês": "mes"}
 
-    # Antes de agrupar, garantir tipos numéricos
-    prod["Qtd Aprovada"] = pd.to_numeric(prod["Qtd Aprovada"], errors="coerce").fillna(0)
-    prod["Velocidade Padrão"] = pd.to_numeric(prod["Velocidade Padrão"], errors="coerce").fillna(0)
-    
 
-    # Agrupamento com verificação de erros
-    try:
-        resumo_turno = prod.groupby(["Centro Trabalho", "Turno", "DataProd"]).agg(
-            Produzido=("Qtd Aprovada", "sum"),
-            Vel_padrao_media=("Velocidade Padrão", "mean")
-        ).reset_index()
-    
-        # Verificar se o resultado contém NaN
-        if resumo_turno["Vel_padrao_media"].isna().any():
-            st.warning("Alguns centros/turnos ficaram sem velocidade padrão média")
-    except Exception as e:
-        st.error(f"Erro ao agrupar por centro e turno: {str(e)}")
-        # Criar um resumo_turno vazio para evitar erros posteriores
-        resumo_turno = pd.DataFrame(columns=["Centro Trabalho", "Turno", "DataProd", 
-                                            "Produzido", "Vel_padrao_media"])
-
-    resumo_turno = resumo_turno.merge(paradas_globais, on=["Centro Trabalho", "Turno", "DataProd"], how="left")
-    resumo_turno["Paradas_min"] = resumo_turno["Paradas_min"].fillna(0)
-    resumo_turno["Paradas_h"] = resumo_turno["Paradas_min"] / 60.0
-    
-    # ADICIONE ESTE AJUSTE AQUI - Dobrar a velocidade padrão para CA12
-    resumo_turno.loc[resumo_turno["Centro Trabalho"] == "CA12", "Vel_padrao_media"] *= 2
-    
-    # ADICIONE ESTA VERIFICAÇÃO - Garantir que não há velocidades zero
-    if (resumo_turno["Vel_padrao_media"] <= 0).any():
-        print("⚠️ ATENÇÃO: Encontradas velocidades padrão zeradas ou negativas!")
-        # Substituir por um valor padrão conservador (20000) para evitar divisões por zero
-        resumo_turno.loc[resumo_turno["Vel_padrao_media"] <= 0, "Vel_padrao_media"] = 20000
-        
-    
-    resumo_turno["Duracao_turno_h"] = resumo_turno.apply(
-        lambda r: (intervalo_turno(r["DataProd"], r["Turno"], r["Centro Trabalho"])[1] -
-                   intervalo_turno(r["DataProd"], r["Turno"], r["Centro Trabalho"])[0]).total_seconds() / 3600,
-        axis=1
-    )
-    
-    resumo_turno["Tempo_liquido_h"] = (resumo_turno["Duracao_turno_h"] - resumo_turno["Paradas_h"]).clip(lower=0)
-    resumo_turno["Prod_prevista"] = resumo_turno["Vel_padrao_media"] * resumo_turno["Tempo_liquido_h"]
-    resumo_turno["Prod_deveria"] = resumo_turno["Prod_prevista"]
-    
-    # CORRIGIDO - Proteger contra divisão por zero
-    resumo_turno["Tempo_liquido_h_safe"] = resumo_turno["Tempo_liquido_h"].replace(0, np.nan)
-    resumo_turno["Vel_real"] = resumo_turno["Produzido"] / resumo_turno["Tempo_liquido_h_safe"]
-    
-    # CORRIGIDO - Proteger cálculo de eficiência
-    resumo_turno["Eficiencia_%"] = np.where(
-        (resumo_turno["Vel_padrao_media"] > 0) & (resumo_turno["Vel_real"].notna()),
-        (resumo_turno["Vel_real"] / resumo_turno["Vel_padrao_media"]) * 100,
-        np.nan
-    )
-    
-    # Limitação de valores extremos
-    resumo_turno["Eficiencia_%"] = resumo_turno["Eficiencia_%"].clip(lower=0, upper=999.99)
-    
-    # ===== Cálculo de Eficiência e Produção Prevista =====
-    
-    # Filtrar paradas obrigatórias
-    paradas_obrigatorias = ["REFEIÇÕES", "ACERTO", "TESTE", "PRODUÇÃO INTERROMPIDA"]
-    paradas_obrigatorias_df = (
-        paradas_detalhe[paradas_detalhe["Descrição Parada"].isin(paradas_obrigatorias)]
-        .groupby(["Centro Trabalho", "Turno", "DataProd"])["Parada_h"]
-        .sum()
-        .reset_index(name="Paradas_obrigatorias_h")
-    )
-    
-    # Mesclar paradas obrigatórias ao resumo_turno
-    resumo_turno = resumo_turno.merge(paradas_obrigatorias_df, on=["Centro Trabalho", "Turno", "DataProd"], how="left")
-    resumo_turno["Paradas_obrigatorias_h"] = resumo_turno["Paradas_obrigatorias_h"].fillna(0)
-    
-    # Recalcular tempo disponível máximo para produção
-    resumo_turno["Tempo_disponivel_h"] = (resumo_turno["Duracao_turno_h"] - resumo_turno["Paradas_obrigatorias_h"]).clip(lower=0)
-    
-    # Produção prevista ajustada (descontando apenas paradas obrigatórias)
-    resumo_turno["Prod_prevista_ajustada"] = resumo_turno["Vel_padrao_media"] * resumo_turno["Tempo_disponivel_h"]
-    
-    # ===== Cálculo de Eficiência Geral e Ajustada =====
-    
-    # CORRIGIDO - Eficiência geral com proteção contra divisão por zero
-    resumo_turno["Eficiencia_geral_%"] = np.where(
-        resumo_turno["Prod_prevista"] > 0,
-        (resumo_turno["Produzido"] / resumo_turno["Prod_prevista"]) * 100,
-        np.nan
-    )
-    
-    # CORRIGIDO - Eficiência ajustada com proteção contra divisão por zero
-    resumo_turno["Eficiencia_ajustada_%"] = np.where(
-        resumo_turno["Prod_prevista_ajustada"] > 0,
-        (resumo_turno["Produzido"] / resumo_turno["Prod_prevista_ajustada"]) * 100,
-        np.nan
-    )
-    
-    # Limitação de valores extremos
-    resumo_turno["Eficiencia_geral_%"] = resumo_turno["Eficiencia_geral_%"].clip(lower=0, upper=999.99)
-    resumo_turno["Eficiencia_ajustada_%"] = resumo_turno["Eficiencia_ajustada_%"].clip(lower=0, upper=999.99)
-    
-    # Produção prevista geral (considerando todas as paradas)
-    resumo_turno["Prod_prevista_geral"] = resumo_turno["Vel_padrao_media"] * resumo_turno["Tempo_liquido_h"]
-
-    # ----------------- Renomear colunas para exibição (helper) -----------------
-    COL_RENAMES = {
-        "Centro Trabalho": "Centro",
-        "Produzido": "Produzido",
-        "Produzido_total": "Produção Total",
-        "Vel_padrao_media": "Velocidade Padrão",
-        "Prod_deveria": "Produção Prevista",
-        "Prod_deveria_total": "Produção Prevista Total",
-        "Vel_real": "Velocidade Real",
-        "Vel_real_media": "Velocidade Real Média",
-        "Eficiencia_%": "Eficiência (%)",
-        "Ef_ponderada": "Eficiência Ponderada",
-        "Ef_media": "Eficiência Média",
-        "Ef_media_simples": "Eficiência Média",
-        "Ef_ajustada_media": "Eficiência Ajustada Média",
-        "Tempo_liquido_h": "Tempo Líquido (h)",
-        "Tempo_liquido_h_total": "Tempo Líquido Total (h)",
-        "Paradas_min": "Paradas (min)",
-        "Paradas_min_total": "Paradas Totais (min)",
-        "Paradas_h": "Paradas (h)",
-        "Paradas_total_h": "Paradas Totais (h)",
-        "Paradas_obrigatorias_h": "Paradas Obrigatórias (h)",
-        "Duracao_turno_h": "Duração Turno (h)",
-        "Turno": "Turno",
-        "Turnos_ativos": "Turnos Ativos",
-        "Conc": "Combinação",
-        "Prod_prevista_geral": "Produção Prevista Geral",
-        "Prod_prevista_ajustada": "Produção Prevista Ajustada",
-        "Eficiencia_geral_%": "Eficiência Geral (%)",
-        "Eficiencia_ajustada_%": "Eficiência Ajustada (%)",
-        "Tempo_disponivel_h": "Tempo Disponível (h)",
-        "Eficiencia_media": "Eficiência Média"
-    }
+def escolher_granularidade(chave):
+    rotulo = st.radio("Granularidade", list(GRANULARIDADES_EXIBICAO), horizontal=True, key=chave)
+    return GRANULARIDADES_EXIBICAO[rotulo]
+
+
+def consolidado_do_periodo(pipeline_dia, granularidade, por):
+    """Totais da semana/mês da data selecionada, lidos dos consolidados materializados."""
+    pipeline_dia.consolidar_periodo(granularidade)
+    data_base = pipeline_dia.parametros["data_base"]
+    dias = consolidados.dias(pipeline_dia.versao, granularidade, data_base)
+    st.caption(f"{'Semana' if granularidade == 'semana' else 'Mês'} de {dias[0]:%d/%m/%Y} a {dias[-1]:%d/%m/%Y} "
+               f"({len(dias)} dias com registros)" if dias else "Nenhum dia consolidado neste período.")
+    return consolidados.tabela(pipeline_dia.versao, granularidade, data_base, por)
+
+
+COLUNAS_ITENS_EXIBICAO = ["Descrição Item", "Qtd", "Minutos_producao", "Vel_efetiva", "Vel_padrao", "Razao_vel_%"]
+
 
-    def pretty_cols(df_in):
-        # Retorna cópia com colunas renomeadas para exibição (não altera df original)
-        return df_in.rename(columns={k: v for k, v in COL_RENAMES.items() if k in df_in.columns})
+def resultados_do_dia(pipeline_dia):
+    """(resumo_turno, paradas_detalhe, itens_por_centro_turno) do dia, vazios sem dados."""
+    if pipeline_dia is None:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    resultado = pipeline_dia.executar("metricas")
+    return resultado["resumo_turno"], resultado["paradas_detalhe"], resultado["itens_por_centro_turno"]
 
-    # NÃO sobrescrever `resumo_turno` — manter colunas originais para cálculos.
-    # Criar uma cópia com nomes "bonitos" apenas para exibição quando necessário.
-    resumo_turno_display = pretty_cols(resumo_turno)
+
+# ----------------- Processamento (quando há registros) -----------------
+pipeline_dia = None
+data_base = None
+if not df.empty:
+    if vel.empty:
+        st.sidebar.warning("A planilha de velocidades (static) não foi encontrada ou está vazia — velocidades serão tratadas como faltantes.")
+
+    # Centros CA e regras de roteiro valem para o arquivo inteiro; as etapas por linha
+    # (término, data produtiva, turno) ficam para depois
+    _, _, roteiros_atribuidos = pipeline.executar("roteiros")
+    if roteiros_atribuidos > 0:
+        st.success(f"Roteiros atribuídos para {roteiros_atribuidos} registros sem roteiro definido")
+
+    # Após um upload, guardar os registros no acervo e calcular todos os dias produtivos
+    # do arquivo em segundo plano. O arquivo continua no file_uploader nas execuções
+    # seguintes: cada versão dos dados vai para o acervo uma vez só por sessão
+    if upload_concluido:
+        if st.session_state.get("versao_no_acervo") != pipeline.versao:
+            try:
+                acervo.gravar(pipeline.executar("normalizados"))
+                st.session_state["versao_no_acervo"] = pipeline.versao
+            except (OSError, ValueError, TypeError) as e:
+                st.sidebar.warning(f"Não foi possível guardar os registros no acervo: {e}")
+        dias_arquivo = pipeline.dias_do_arquivo()
+        tarefas = {}
+        for dia in dias_arquivo:
+            pipeline_dia = pipeline.com_data(dia)
+            tarefas[pipeline_dia.chave("exibicao")] = partial(pipeline_dia.calcular, "exibicao")
+        cache_resultados.iniciar_precalculo(pipeline.versao, tarefas)
+
+    progresso = cache_resultados.progresso(pipeline.versao)
+    if progresso is not None:
+        feitos, total = progresso
+        with st.sidebar:
+            if feitos < total:
+                acompanhar_precalculo(pipeline.versao)
+            else:
+                barra_precalculo(feitos, total)
+
+    # A data produtiva é monótona no horário de início: a menor vem do menor início
+    inicio_min = pipeline.executar("normalizados")["DataHoraInicio"].min()
+    data_sugerida = data_produtiva(inicio_min).date() if pd.notna(inicio_min) else datetime.today().date()
+    selecao_dados(data_sugerida)
+    data_base = st.session_state["data_base"]
+    st.session_state["data_base_aplicada"] = data_base
+
+    # Trocar a data reaproveita registros normalizados e roteiros; só o dia em diante é refeito
+    pipeline_dia = pipeline.com_data(data_base)
+    for nivel, mensagem in pipeline_dia.executar("metricas")["avisos"]:
+        getattr(st, nivel)(mensagem)
 
 # ----------------- Helpers de visualização -----------------
+def mostrar_tabela(df_exibir, **kwargs):
+    """st.dataframe com rótulos e formatos declarados por coluna; os valores continuam numéricos."""
+    config = {}
+    for coluna, rotulo, formato in colunas_exibicao(df_exibir.columns):
+        if formato is not None:
+            config[coluna] = st.column_config.NumberColumn(rotulo, format=formato)
+        elif rotulo != coluna:
+            config[coluna] = rotulo
+    st.dataframe(df_exibir, column_config=config, use_container_width=True, **kwargs)
+
 def medalha_html(posicao, centro, turno, produzido, eficiencia):
     estilos = {
         1: {"hex": "#FFD700", "bg": "rgba(255,215,0,0.12)", "emoji": "🥇"},
@@ -691,480 +429,189 @@ def medalha_pior_html(posicao, centro, turno, produzido, eficiencia):
     """
 
 # ===== Ranking Geral - Eficiência =====
-st.subheader("🏆 Ranking Geral - Eficiência")
-if "resumo_turno" in locals() and not resumo_turno.empty:
-    top_efic = resumo_turno.dropna(subset=["Eficiencia_%"]).sort_values("Eficiencia_%", ascending=False).reset_index(drop=True)
-
-    cols = st.columns(3)
-    for i in range(3):
-        with cols[i]:
-            if i < len(top_efic):
-                row = top_efic.iloc[i]
-                st.markdown(
-                    medalha_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
-                                 row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
-                    unsafe_allow_html=True
-                )
+@st.fragment
+def secao_rankings(pipeline_dia):
+    resumo_turno, *_ = resultados_do_dia(pipeline_dia)
 
-    def medalha_pior_html(posicao, centro, turno, produzido, eficiencia):
-        estilos = {
-            1: {"hex": "#b22222", "bg": "rgba(178,34,34,0.06)", "emoji": "🔻"},
-            2: {"hex": "#ff4500", "bg": "rgba(255,69,0,0.06)", "emoji": "🔻"},
-            3: {"hex": "#ff8c00", "bg": "rgba(255,140,0,0.06)", "emoji": "🔻"},
-        }
-        s = estilos.get(posicao, {"hex": "#6c757d", "bg": "rgba(108,117,125,0.06)", "emoji": "🔻"})
-        try:
-            prod_val = 0 if pd.isna(produzido) else int(round(float(produzido)))
-        except Exception:
-            prod_val = 0
-        try:
-            ef_val = 0 if pd.isna(eficiencia) else int(round(float(eficiencia)))
-        except Exception:
-            ef_val = 0
-        return f"""
-        <div style="display:flex; align-items:center; background-color:{s['bg']};
-                    border:2px solid {s['hex']}; border-radius:10px; padding:10px; margin-bottom:8px; opacity:0.95">
-            <div style="font-size:22px; margin-right:12px">{s['emoji']}</div>
-            <div style="font-size:14px; line-height:1.3">
-                <strong>{posicao}º pior</strong> — {centro} ({turno})<br>
-                Produzido: <b>{f"{prod_val:,}".replace(",", ".")}</b> | Eficiência: <b>{ef_val}%</b>
-            </div>
-        </div>
-        """
+    st.subheader("🏆 Ranking Geral - Eficiência")
+    if not resumo_turno.empty:
+        top_efic = ranking(resumo_turno, "Eficiencia_%")
 
-    bottom_efic = resumo_turno.dropna(subset=["Eficiencia_%"]).sort_values("Eficiencia_%", ascending=True).reset_index(drop=True)
-    if not bottom_efic.empty:
-        st.markdown("### ⤵️ 3 Piores - Eficiência")
         cols = st.columns(3)
         for i in range(3):
             with cols[i]:
-                if i < len(bottom_efic):
-                    row = bottom_efic.iloc[i]
+                if i < len(top_efic):
+                    row = top_efic.iloc[i]
                     st.markdown(
-                        medalha_pior_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
-                                          row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
+                        medalha_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
+                                     row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
                         unsafe_allow_html=True
                     )
-else:
-    st.info("Nenhum dado para ranking de eficiência.")
-
-
-# ===== Ranking Geral - Produção (Top 3 lado a lado + Piores 3) =====
-st.subheader("📦 Ranking Geral - Produção")
-if "resumo_turno" in locals() and not resumo_turno.empty:
-    top_prod = resumo_turno.dropna(subset=["Produzido"]).sort_values("Produzido", ascending=False).reset_index(drop=True)
-
-    cols = st.columns(3)
-    for i in range(3):
-        with cols[i]:
-            if i < len(top_prod):
-                row = top_prod.iloc[i]
-                st.markdown(
-                    medalha_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
-                                 row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
-                    unsafe_allow_html=True
-                )
 
-    bottom_prod = resumo_turno.dropna(subset=["Produzido"]).sort_values("Produzido", ascending=True).reset_index(drop=True)
-    if not bottom_prod.empty:
-        st.markdown("### ⤵️ 3 Piores - Produção")
+        bottom_efic = ranking(resumo_turno, "Eficiencia_%", piores=True)
+        if not bottom_efic.empty:
+            st.markdown("### ⤵️ 3 Piores - Eficiência")
+            cols = st.columns(3)
+            for i in range(3):
+                with cols[i]:
+                    if i < len(bottom_efic):
+                        row = bottom_efic.iloc[i]
+                        st.markdown(
+                            medalha_pior_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
+                                              row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
+                            unsafe_allow_html=True
+                        )
+    else:
+        st.info("Nenhum dado para ranking de eficiência.")
+
+
+    # ===== Ranking Geral - Produção (Top 3 lado a lado + Piores 3) =====
+    st.subheader("📦 Ranking Geral - Produção")
+    if not resumo_turno.empty:
+        top_prod = ranking(resumo_turno, "Produzido")
+
         cols = st.columns(3)
         for i in range(3):
             with cols[i]:
-                if i < len(bottom_prod):
-                    row = bottom_prod.iloc[i]
+                if i < len(top_prod):
+                    row = top_prod.iloc[i]
                     st.markdown(
-                        medalha_pior_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
-                                          row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
+                        medalha_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
+                                     row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
                         unsafe_allow_html=True
                     )
-else:
-    st.info("Nenhum dado para ranking de produção.")
 
-# ===== Resumo Geral =====
-
-st.title("🏭 Resumo Geral")
-
-with st.expander("📊 Resumo Geral", expanded=True):
-    if "resumo_turno" in locals() and not resumo_turno.empty:
-        total_produzido = int(resumo_turno["Produzido"].sum())
-        tempo_total_h = float(resumo_turno["Tempo_liquido_h"].sum())
-        avg_ef = resumo_turno["Eficiencia_%"].dropna().mean()
-        avg_ef_ajustada = resumo_turno["Eficiencia_ajustada_%"].dropna().mean()
-        total_paradas_h = resumo_turno["Paradas_h"].sum()
-        prod_prevista_geral = int(resumo_turno["Prod_prevista"].sum())
-        prod_prevista_ajustada = int(resumo_turno["Prod_prevista_ajustada"].sum())
-
-        c1, c2, c3, c4, c5, c6 = st.columns(6)
-        c1.metric("📦 Produção Total", f"{total_produzido:,}".replace(",", "."))
-        c2.metric("📦 Produção Prevista", f"{prod_prevista_geral:,}".replace(",", "."))
-        c3.metric("📦 Produção Prevista Ajustada", f"{prod_prevista_ajustada:,}".replace(",", "."))
-        c4.metric("⚙️ Eficiência Média", f"{avg_ef:.2f} %")
-        c5.metric("⚙️ Eficiência Ajustada", f"{avg_ef_ajustada:.2f} %")
-        c6.metric("⏱️ Tempo Total de Paradas (h)", f"{total_paradas_h:.2f}")
+        bottom_prod = ranking(resumo_turno, "Produzido", piores=True)
+        if not bottom_prod.empty:
+            st.markdown("### ⤵️ 3 Piores - Produção")
+            cols = st.columns(3)
+            for i in range(3):
+                with cols[i]:
+                    if i < len(bottom_prod):
+                        row = bottom_prod.iloc[i]
+                        st.markdown(
+                            medalha_pior_html(i+1, row.get('Centro Trabalho', '—'), row.get('Turno', '—'),
+                                              row.get('Produzido', 0), row.get('Eficiencia_%', 0)),
+                            unsafe_allow_html=True
+                        )
     else:
-        st.info("Nenhum dado disponível para o resumo geral.")
-
-# ===== Sumário dos Centros =====
-st.title("📋 Sumário dos Centros")
-
-if "resumo_turno" in locals() and not resumo_turno.empty:
-    # Agrupar por Centro para calcular os totais e médias
-    sumario_centros = resumo_turno.groupby("Centro Trabalho").agg(
-        Produzido_total=("Produzido", "sum"),
-        Paradas_total_h=("Paradas_h", "sum"),
-        Ef_media=("Eficiencia_%", "mean"),
-        Ef_ajustada_media=("Eficiencia_ajustada_%", "mean")
-    ).reset_index()
-
-    # Renomear a coluna "Centro Trabalho" para "Centro"
-    sumario_centros = sumario_centros.rename(columns={"Centro Trabalho": "Centro"})
-
-    # Classificar eficiência ajustada
-    def classificar_eficiencia(ef):
-        if pd.isna(ef):
-            return "❓ Indefinido"
-        if ef >= 95:
-            return "✅ Excelente"
-        elif ef >= 85:
-            return "🟡 Bom"
-        else:
-            return "❌ Ruim"
-
-    sumario_centros["Classificação"] = sumario_centros["Ef_ajustada_media"].apply(classificar_eficiencia)
-
-    # Formatar os valores para exibição
-    sumario_centros["Produzido_total"] = sumario_centros["Produzido_total"].apply(lambda v: f"{int(round(v))}".replace(",", "."))
-    sumario_centros["Paradas_total_h"] = sumario_centros["Paradas_total_h"].apply(lambda v: f"{v:.2f}" if pd.notna(v) else "—")
-    sumario_centros["Ef_media"] = sumario_centros["Ef_media"].apply(lambda v: f"{v:.2f}%" if pd.notna(v) else "—")
-    sumario_centros["Ef_ajustada_media"] = sumario_centros["Ef_ajustada_media"].apply(lambda v: f"{v:.2f}%" if pd.notna(v) else "—")
-
-    # Adicionar as 4 maiores paradas por centro
-    if "paradas_detalhe" in locals() and not paradas_detalhe.empty:
-        # Verificar se a coluna "Centro Trabalho" existe no DataFrame
-        if "Centro Trabalho" in paradas_detalhe.columns:
-            # Primeiro agregar paradas do mesmo tipo para cada centro
-            paradas_agrupadas = (
-                paradas_detalhe
-                .groupby(["Centro Trabalho", "Descrição Parada"])["Parada_min"]
-                .sum()
-                .reset_index()
-            )
-            
-            # Converter minutos para horas
-            paradas_agrupadas["Parada_h"] = paradas_agrupadas["Parada_min"] / 60.0
-            paradas_agrupadas["Parada_fmt"] = paradas_agrupadas["Parada_h"].apply(horas_para_hhmm)
-            
-            # Agora selecionar as top 4 paradas por centro
-            paradas_top4 = (
-                paradas_agrupadas
-                .groupby("Centro Trabalho")  # Corrigir chamada do groupby
-                .apply(lambda x: x.nlargest(8, "Parada_min"))
-                .reset_index(level=0, drop=True)
-                .reset_index()
-            )
-            
-            # Agrupar novamente para gerar o texto consolidado das paradas
-            paradas_consolidadas = (
-                paradas_top4
-                .groupby("Centro Trabalho")
-                .apply(lambda x: " | ".join(f"{row['Descrição Parada']} ({row['Parada_fmt']})" for _, row in x.iterrows()))
-                .reset_index(name="Maiores Paradas")
-            )
-            
-            # Mesclar com sumario_centros
-            sumario_centros = sumario_centros.merge(paradas_consolidadas, left_on="Centro", right_on="Centro Trabalho", how="left")
-            
-            # Remover coluna duplicada se presente
-            if "Centro Trabalho" in sumario_centros.columns:
-                sumario_centros = sumario_centros.drop(columns=["Centro Trabalho"])
-        else:
-            st.error("A coluna 'Centro Trabalho' não está presente no DataFrame 'paradas_detalhe'.")
-    else:
-        sumario_centros["Maiores Paradas"] = "—"
-
-    # Reorganizar colunas para mover "Classificação" após "Centro"
-    colunas_ordenadas = [
-        "Centro", "Classificação", "Produzido_total", "Paradas_total_h",
-        "Ef_media", "Ef_ajustada_media", "Maiores Paradas"
-    ]
-    sumario_centros = sumario_centros[colunas_ordenadas]
-
-    # Renomear colunas para melhor leitura
-    sumario_centros = pretty_cols(sumario_centros)
-
-    # Exibir tabela com largura ajustada usando st.dataframe
-    st.dataframe(sumario_centros, use_container_width=True)
-else:
-    st.info("Nenhum dado disponível para o sumário dos centros.")
-
-# Fim do arquivo
+        st.info("Nenhum dado para ranking de produção.")
 
 
-# ===== Detalhes por Centro =====
-st.subheader("🔍 Detalhes por Centro")
+# ===== Resumo Geral =====
+@st.fragment
+def secao_resumo_geral(pipeline_dia):
+    resumo_turno, *_ = resultados_do_dia(pipeline_dia)
+
+    st.title("🏭 Resumo Geral")
+
+    with st.expander("📊 Resumo Geral", expanded=True):
+        granularidade = escolher_granularidade("granularidade_resumo") if pipeline_dia is not None else None
+        if granularidade is not None:
+            periodo = consolidado_do_periodo(pipeline_dia, granularidade, ("Periodo",))
+            if periodo.empty:
+                st.info("Nenhum dado disponível para o resumo geral.")
+                return
+            total = periodo.iloc[0]
+            c1, c2, c3, c4, c5, c6 = st.columns(6)
+            c1.metric("📦 Produção Total", f"{int(total['Produzido']):,}".replace(",", "."))
+            c2.metric("📦 Produção Prevista", f"{int(total['Prod_prevista']):,}".replace(",", "."))
+            c3.metric("📦 Produção Prevista Ajustada", f"{int(total['Prod_prevista_ajustada']):,}".replace(",", "."))
+            c4.metric("⚙️ Eficiência Ponderada", f"{total['Eficiencia_%']:.2f} %")
+            c5.metric("⚙️ Eficiência Ajustada", f"{total['Eficiencia_ajustada_%']:.2f} %")
+            c6.metric("⏱️ Tempo Total de Paradas (h)", f"{total['Paradas_h']:.2f}")
+        elif not resumo_turno.empty:
+            total = resumo_geral(resumo_turno)
+            c1, c2, c3, c4, c5, c6 = st.columns(6)
+            c1.metric("📦 Produção Total", f"{total['Produzido']:,}".replace(",", "."))
+            c2.metric("📦 Produção Prevista", f"{total['Prod_prevista']:,}".replace(",", "."))
+            c3.metric("📦 Produção Prevista Ajustada", f"{total['Prod_prevista_ajustada']:,}".replace(",", "."))
+            c4.metric("⚙️ Eficiência Média", f"{total['Ef_media']:.2f} %")
+            c5.metric("⚙️ Eficiência Ajustada", f"{total['Ef_ajustada_media']:.2f} %")
+            c6.metric("⏱️ Tempo Total de Paradas (h)", f"{total['Paradas_h']:.2f}")
+        else:
+            st.info("Nenhum dado disponível para o resumo geral.")
 
-if "resumo_turno" in locals() and not resumo_turno.empty:
-    # Remover esta linha que está duplicando a multiplicação
-    # resumo_turno.loc[resumo_turno["Centro Trabalho"] == "CA12", "Vel_padrao_media"] *= 2
 
-    centros_unicos = sorted(resumo_turno["Centro Trabalho"].astype(str).unique().tolist())
+# ===== Sumário dos Centros =====
+@st.fragment
+def secao_sumario_centros(pipeline_dia):
+    resumo_turno, *_ = resultados_do_dia(pipeline_dia)
 
-    if centros_unicos:
-        # Criar abas para cada centro
-        tabs = st.tabs(centros_unicos)
+    st.title("📋 Sumário dos Centros")
 
-        for tab, centro in zip(tabs, centros_unicos):
-            with tab:
-                df_centro = resumo_turno[resumo_turno["Centro Trabalho"].astype(str).str.strip() == centro].copy()
+    granularidade = escolher_granularidade("granularidade_sumario") if pipeline_dia is not None else None
+    if granularidade is not None:
+        periodo = consolidado_do_periodo(pipeline_dia, granularidade, ("Centro Trabalho",))
+        if periodo.empty:
+            st.info("Nenhum dado disponível para o sumário dos centros.")
+        else:
+            mostrar_tabela(montar_sumario_periodo(periodo))
+    elif not resumo_turno.empty:
+        sumario_centros = pipeline_dia.executar("exibicao")["sumario_centros"]
 
-                if df_centro.empty:
-                    st.warning(f"Nenhum dado encontrado para o Centro {centro}.")
-                else:
-                    st.markdown(f"## 🏭 Centro: `{centro}`")
-                    total_produzido = int(df_centro["Produzido"].sum())
-                    tempo_total_h = float(df_centro["Tempo_liquido_h"].sum())
-                    avg_ef_geral = df_centro["Eficiencia_geral_%"].dropna().mean()
-                    avg_ef_ajustada = df_centro["Eficiencia_ajustada_%"].dropna().mean()
-                    prod_prevista_geral = int(df_centro["Prod_prevista_geral"].sum()) if "Prod_prevista_geral" in df_centro.columns else 0
-                    prod_prevista_ajustada = int(df_centro["Prod_prevista_ajustada"].sum()) if "Prod_prevista_ajustada" in df_centro.columns else 0
-                    
-                    # Verificar valores válidos antes de calcular a média
-                    vel_padrao_media = int(df_centro["Vel_padrao_media"].mean()) if not df_centro["Vel_padrao_media"].isna().all() else 0
-                    vel_real_media = int(df_centro["Vel_real"].mean()) if not df_centro["Vel_real"].isna().all() else 0
-
-                    # Exibir métricas gerais
-                    c1, c2, c3, c4, c5, c6, c7 = st.columns(7)
-                    c1.metric("📦 Produzido (total)", f"{total_produzido}".replace(",", "."))
-                    c2.metric("📦 Previsto (geral)", f"{prod_prevista_geral}".replace(",", "."))
-                    c3.metric("📦 Previsto (ajustado)", f"{prod_prevista_ajustada}".replace(",", "."))
-                    c4.metric("⚙️ Eficiência Geral", f"{int(round(avg_ef_geral))} %" if "Eficiencia_geral_%" in df_centro.columns and not pd.isna(avg_ef_geral) else "—")
-                    c5.metric("⚙️ Eficiência Ajustada", f"{int(round(avg_ef_ajustada))} %" if "Eficiencia_ajustada_%" in df_centro.columns and not pd.isna(avg_ef_ajustada) else "—")
-                    c6.metric("🚀 Velocidade Padrão Média", f"{vel_padrao_media}" if vel_padrao_media > 0 else "—")
-                    c7.metric("🚀 Velocidade Real Média", f"{vel_real_media}" if vel_real_media > 0 else "—")
-
-                    st.divider()
-
-                    # Detalhes por turno
-                    for turno in sorted(df_centro["Turno"].unique().tolist()):
-                        with st.expander(f"⏱️ Turno: {turno}", expanded=False):
-                            df_turno = df_centro[df_centro["Turno"] == turno].copy()
-                            cols_show = [
-                                "Centro Trabalho", "Produzido", "Prod_prevista_geral", "Prod_prevista_ajustada",
-                                "Eficiencia_geral_%", "Eficiencia_ajustada_%", "Paradas_min", "Vel_real"
-                            ]
-                            cols_show = [c for c in cols_show if c in df_turno.columns]
-                            if df_turno.empty or not cols_show:
-                                st.write("Sem dados para este turno.")
-                                continue
-
-                            # Exibir itens únicos produzidos neste turno
-                            itens_filtrados = itens_por_centro_turno[
-                                (itens_por_centro_turno["Centro Trabalho"] == centro) & 
-                                (itens_por_centro_turno["Turno"] == turno) &
-                                (itens_por_centro_turno["DataProd"] == df_turno["DataProd"].iloc[0])  # Adicione esta linha
-                            ]
-                            
-                            if not itens_filtrados.empty:
-                                st.markdown("**📦 Itens produzidos neste turno:**")
-                                lista_itens = itens_filtrados["Descrição Item"].iloc[0]
-                                if lista_itens:
-                                    # Remover duplicatas e ordenar
-                                    lista_unica = sorted(set(lista_itens))
-                                    
-                                    # Criar HTML com lista formatada adequadamente
-                                    html_lista = "<ul style='margin-top:0; padding-left:20px'>\n"
-                                    for item in lista_unica:
-                                        html_lista += f"<li style='margin-bottom:4px'>{item}</li>\n"
-                                    html_lista += "</ul>"
-                                    
-                                    # Exibir lista formatada
-                                    st.markdown(html_lista, unsafe_allow_html=True)
-                                else:
-                                    st.write("Nenhum item produzido neste turno.")
-                            else:
-                                st.write("Nenhum item produzido neste turno.")
-
-                            display = df_turno[cols_show].copy()
-                            # Formatações simples
-                            if "Produzido" in display.columns:
-                                display["Produzido"] = display["Produzido"].apply(lambda v: f"{int(round(v))}" if pd.notna(v) else "")
-                            if "Vel_real" in display.columns:
-                                display["Vel_real"] = display["Vel_real"].apply(lambda v: f"{int(round(v))}" if pd.notna(v) else "")                            
-
-                            if "Prod_prevista_geral" in display.columns:
-                                display["Prod_prevista_geral"] = display["Prod_prevista_geral"].apply(lambda v: f"{int(round(v))}" if pd.notna(v) else "")
-                            if "Prod_prevista_ajustada" in display.columns:
-                                display["Prod_prevista_ajustada"] = display["Prod_prevista_ajustada"].apply(lambda v: f"{int(round(v))}" if pd.notna(v) else "")
-                            if "Eficiencia_geral_%" in display.columns:
-                                display["Eficiencia_geral_%"] = display["Eficiencia_geral_%"].apply(lambda v: f"{int(round(v))}%" if pd.notna(v) else "")
-                            if "Eficiencia_ajustada_%" in display.columns:
-                                display["Eficiencia_ajustada_%"] = display["Eficiencia_ajustada_%"].apply(lambda v: f"{int(round(v))}%" if pd.notna(v) else "")
-                            if "Paradas_min" in display.columns:
-                                display["Paradas_min"] = display["Paradas_min"].apply(lambda v: f"{int(round(v))}" if pd.notna(v) else "")
-
-                            
-
-                            display = pretty_cols(display)  # Aplicar nomes de colunas formatados
-
-                            st.dataframe(display, use_container_width=True)
-
-                            # Paradas detalhadas (se houver)
-                            if "paradas_detalhe" in locals() and not paradas_detalhe.empty:
-                                par_turno = paradas_detalhe[
-                                    (paradas_detalhe["Centro Trabalho"].astype(str).str.strip() == centro) &
-                                    (paradas_detalhe["Turno"] == turno)
-                                ]
-                                if not par_turno.empty:
-                                    st.markdown("**📋 Paradas desse turno:**")
-                                    st.dataframe(
-                                        par_turno[["Descrição Parada", "Parada_fmt"]].rename(columns={"Parada_fmt": "Parada (HH:MM)"}),
-                                        use_container_width=True
-                                    )
+        mostrar_tabela(sumario_centros)
     else:
-        st.info("Nenhum centro disponível para exibição.")
-else:
-    st.info("Nenhum dado disponível para exibição.")
-
-st.title("🏭 Plot Área")
-
-
-# ===== Abas para Gráficos e Detalhes =====
-tab1, tab2 = st.tabs(["📊 Gráficos", "Em desenvolvimento"])
-
-# ===== Gráficos =====
-with tab1:
-    st.subheader("📊 Gráficos de Produção, Eficiência e Paradas")
-
-    if "resumo_turno" in locals() and not resumo_turno.empty:
-        # Gráfico: Produção por Turno
-        st.markdown("### 📦 Produção por Turno")
-        try:
-            prod_por_turno = resumo_turno.groupby("Turno").agg(
-                Produzido_total=("Produzido", "sum")
-            ).reset_index()
-
-            fig_prod_turno = px.bar(
-                pretty_cols(prod_por_turno),
-                x="Turno",
-                y="Produção Total",  # Nome renomeado
-                title="Produção Total por Turno",
-                labels={"Produção Total": "Produção Total (unidades)", "Turno": "Turno"},
-                text_auto=True
-            )
-            st.plotly_chart(fig_prod_turno, use_container_width=True, key="prod_turno")
-        except Exception as e:
-            st.error(f"Erro ao gerar gráfico de Produção por Turno: {e}")
-
-        # Gráfico: Eficiência Média por Turno
-        st.markdown("### 🏆 Eficiência Média por Turno")
-        try:
-            eficiencia_por_turno = resumo_turno.groupby("Turno").agg(
-                Eficiencia_media=("Eficiencia_%", "mean")
-            ).reset_index()
-
-            fig_ef_turno = px.bar(
-                eficiencia_por_turno,
-                x="Turno",
-                y="Eficiencia_media",
-                title="Eficiência Média por Turno",
-                labels={"Eficiencia_media": "Eficiência Média (%)", "Turno": "Turno"},
-                text_auto=True
-            )
-            st.plotly_chart(fig_ef_turno, use_container_width=True, key="ef_turno")
-        except Exception as e:
-            st.error(f"Erro ao gerar gráfico de Eficiência Média por Turno: {e}")
+        st.info("Nenhum dado disponível para o sumário dos centros.")
+
+
+# ===== Comparação de Períodos =====
+@st.fragment
+def secao_comparacao(pipeline, data_base):
+    st.title("🔀 Comparação de Períodos")
+
+    if pipeline is None or data_base is None:
+        st.info("Nenhum dado disponível para comparação.")
+        return
+    if not st.toggle("Comparar com outro período", value=False):
+        return
+
+    # Padrão: o dia selecionado contra o mesmo dia da semana anterior
+    c1, c2 = st.columns(2)
+    atual = c1.date_input("Período atual", value=(data_base, data_base), key="comparacao_atual")
+    referencia = c2.date_input("Período de referência", value=(data_base - timedelta(days=7),) * 2, key="comparacao_ref")
+    if len(atual) < 2 or len(referencia) < 2:
+        st.info("Selecione o início e o fim dos dois períodos.")
+        return
+
+    resumos = resumos_dos_periodos(pipeline, {
+        "atual": dias_do_periodo(*atual),
+        "referencia": dias_do_periodo(*referencia),
+    })
+    if resumos["atual"].empty and resumos["referencia"].empty:
+        st.info("Nenhum registro nos períodos selecionados.")
+        return
+    comparacao = comparar_resumos(resumos["atual"], resumos["referencia"])
+
+    mostrar_tabela(comparacao, hide_index=True)
+
+    metrica = st.radio("Diferença no gráfico", METRICAS_COMPARADAS, horizontal=True,
+                       format_func=COL_RENAMES.get)
+    import plotly.express as px
+    por_turno = comparacao[comparacao["Turno"] != "Todos"]
+    fig_delta = px.bar(
+        por_turno,
+        x="Centro Trabalho",
+        y=f"{metrica}_delta",
+        color="Turno",
+        barmode="group",
+        title="Diferença por Centro e Turno (atual − referência)",
+        labels={f"{metrica}_delta": COL_RENAMES[f"{metrica}_delta"], "Centro Trabalho": "Centro"},
+    )
+    st.plotly_chart(fig_delta, use_container_width=True, key="comparacao_delta")
 
-        # Gráfico: Produção por Centro e Turno
-        st.markdown("### 📦 Produção por Centro e Turno")
-        try:
-            fig_prod_centro_turno = px.bar(
-                resumo_turno,
-                x="Centro Trabalho",
-                y="Produzido",
-                color="Turno",
-                title="Produção por Centro e Turno",
-                labels={"Produzido": "Produção (unidades)", "Centro Trabalho": "Centro", "Turno": "Turno"},
-                barmode="stack"
-            )
-            st.plotly_chart(fig_prod_centro_turno, use_container_width=True, key="prod_centro_turno")
-        except Exception as e:
-            st.error(f"Erro ao gerar gráfico de Produção por Centro e Turno: {e}")
 
-        # Gráfico: Eficiência por Centro e Turno
-        st.markdown("### 🏆 Eficiência por Centro e Turno")
-        try:
-            fig_ef_centro_turno = px.bar(
-                resumo_turno,
-                x="Centro Trabalho",
-                y="Eficiencia_%",
-                color="Turno",
-                title="Eficiência por Centro e Turno",
-                labels={"Eficiencia_%": "Eficiência (%)", "Centro Trabalho": "Centro", "Turno": "Turno"},
-                barmode="stack"
-            )
-            st.plotly_chart(fig_ef_centro_turno, use_container_width=True, key="ef_centro_turno")
-        except Exception as e:
-            st.error(f"Erro ao gerar gráfico de Eficiência por Centro e Turno: {e}")
-
-        # Gráfico: Paradas por Turno
-        st.markdown("### ⏱️ Paradas por Turno")
-        try:
-            paradas_por_turno = resumo_turno.groupby("Turno").agg(
-                Paradas_total_h=("Paradas_h", "sum")
-            ).reset_index()
-
-            fig_paradas_turno = px.bar(
-                paradas_por_turno,
-                x="Turno",
-                y="Paradas_total_h",
-                title="Tempo Total de Paradas por Turno",
-                labels={"Paradas_total_h": "Paradas (horas)", "Turno": "Turno"},
-                text_auto=True
-            )
-            st.plotly_chart(fig_paradas_turno, use_container_width=True, key="paradas_turno")
-        except Exception as e:
-            st.error(f"Erro ao gerar gráfico de Paradas por Turno: {e}")
+# ===== Detalhes por Centro =====
+@st.fragment
+def secao_detalhes_centro(pipeline_dia):
+    resumo_turno, paradas_detalhe, itens_por_centro_turno = resultados_do_dia(pipeline_dia)
 
-        # Gráfico: Distribuição de Paradas por Tipo
-        st.markdown("### 📋 Distribuição de Paradas por Tipo")
-        if "paradas_detalhe" in locals() and not paradas_detalhe.empty:
-            try:
-                paradas_por_tipo = paradas_detalhe.groupby("Descrição Parada").agg(
-                    Paradas_total_h=("Parada_h", "sum")
-                ).reset_index()
+    st.subheader("🔍 Detalhes por Centro")
 
-                # Ordenar por tempo total de paradas
-                paradas_por_tipo = paradas_por_tipo.sort_values("Paradas_total_h", ascending=False)
-
-                # Gráfico de barras horizontais
-                fig_paradas_tipo = px.bar(
-                    paradas_por_tipo,
-                    x="Paradas_total_h",
-                    y="Descrição Parada",
-                    orientation="h",
-                    title="Distribuição de Paradas por Tipo",
-                    labels={"Paradas_total_h": "Paradas (horas)", "Descrição Parada": "Tipo de Parada"},
-                    text_auto=True
-                )
-                fig_paradas_tipo.update_layout(
-                    yaxis=dict(title="Tipo de Parada", automargin=True),
-                    xaxis=dict(title="Paradas (horas)"),
-                    margin=dict(l=0, r=0, t=40, b=0),
-                    height=600
-                )
-                st.plotly_chart(fig_paradas_tipo, use_container_width=True, key="paradas_tipo")
-            except Exception as e:
-                st.error(f"Erro ao gerar gráfico de Distribuição de Paradas por Tipo: {e}")
-        else:
-            st.info("Nenhum dado disponível para gerar gráfico de Distribuição de Paradas por Tipo.")
-    else:
-        st.info("Nenhum dado disponível para gráficos.")
+    if not resumo_turno.empty:
+        # Remover esta linha que está duplicando a multiplicação
+        # resumo_turno.loc[resumo_turno["Centro Trabalho"] == "CA12", "Vel_padrao_media"] *= 2
 
-with tab2:
-    st.subheader("📊 Gráficos Detalhados por Centro")
-
-    if "resumo_turno" in locals() and not resumo_turno.empty:
         centros_unicos = sorted(resumo_turno["Centro Trabalho"].astype(str).unique().tolist())
 
         if centros_unicos:
@@ -1179,212 +626,480 @@ with tab2:
                         st.warning(f"Nenhum dado encontrado para o Centro {centro}.")
                     else:
                         st.markdown(f"## 🏭 Centro: `{centro}`")
-                        # Gráfico: Produção ao longo do tempo
-                        st.markdown("### 📈 Produção ao longo do tempo")
-                        try:
-                            prod_tempo = df_centro.groupby("DataProd").agg(
-                                Produzido_total=("Produzido", "sum")
-                            ).reset_index()
-
-                            fig_prod_tempo = px.line(
-                                prod_tempo,
-                                x="DataProd",
-                                y="Produzido_total",
-                                title="Produção Total ao longo do tempo",
-                                labels={"Produzido_total": "Produção Total (unidades)", "DataProd": "Data"},
-                                markers=True
-                            )
-                            st.plotly_chart(fig_prod_tempo, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Erro ao gerar gráfico de Produção ao longo do tempo: {e}")
-
-                        # Gráfico: Eficiência ao longo do tempo
-                        st.markdown("### ⏱️ Eficiência ao longo do tempo")
-                        try:
-                            ef_tempo = df_centro.groupby("DataProd").agg(
-                                Eficiencia_media=("Eficiencia_%", "mean")
-                            ).reset_index()
-
-                            fig_ef_tempo = px.line(
-                                ef_tempo,
-                                x="DataProd",
-                                y="Eficiencia_media",
-                                title="Eficiência Média ao longo do tempo",
-                                labels={"Eficiencia_media": "Eficiência Média (%)", "DataProd": "Data"},
-                                markers=True
-                            )
-                            st.plotly_chart(fig_ef_tempo, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Erro ao gerar gráfico de Eficiência ao longo do tempo: {e}")
-
-                        # Gráfico: Produção e Eficiência em conjunto
-                        st.markdown("### 📊 Produção e Eficiência em conjunto")
-                        try:
-                            prod_ef_tempo = df_centro.groupby("DataProd").agg(
-                                Produzido_total=("Produzido", "sum"),
-                                Eficiencia_media=("Eficiencia_%", "mean")
-                            ).reset_index()
-
-                            fig_prod_ef_tempo = px.line(
-                                prod_ef_tempo,
-                                x="DataProd",
-                                y=["Produzido_total", "Eficiencia_media"],
-                                title="Produção e Eficiência ao longo do tempo",
-                                labels={"value": "Produção / Eficiência", "DataProd": "Data"},
-                                markers=True
-                            )
-                            fig_prod_ef_tempo.update_traces(
-                                hovertemplate=None,
-                                mode="lines+markers"
-                            )
-                            st.plotly_chart(fig_prod_ef_tempo, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Erro ao gerar gráfico de Produção e Eficiência em conjunto: {e}")
-
-                        # Gráfico: Paradas ao longo do tempo
-                        st.markdown("### ⏱️ Paradas ao longo do tempo")
-                        try:
-                            paradas_tempo = df_centro.groupby("DataProd").agg(
-                                Paradas_total_h=("Paradas_h", "sum")
-                            ).reset_index()
-
-                            fig_paradas_tempo = px.line(
-                                paradas_tempo,
-                                x="DataProd",
-                                y="Paradas_total_h",
-                                title="Tempo Total de Paradas ao longo do tempo",
-                                labels={"Paradas_total_h": "Paradas (horas)", "DataProd": "Data"},
-                                markers=True
-                            )
-                            st.plotly_chart(fig_paradas_tempo, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Erro ao gerar gráfico de Paradas ao longo do tempo: {e}")
-
-                        # Gráfico: Distribuição de Paradas por Tipo (detalhado)
-                        st.markdown("### 📋 Distribuição de Paradas por Tipo (detalhado)")
-                        if "paradas_detalhe" in locals() and not paradas_detalhe.empty:
-                            try:
-                                paradas_por_tipo_centro = paradas_detalhe[
-                                    paradas_detalhe["Centro Trabalho"].astype(str).str.strip() == centro
-                                ].groupby("Descrição Parada").agg(
-                                    Paradas_total_h=("Parada_h", "sum")
-                                ).reset_index()
+                        total_produzido = int(df_centro["Produzido"].sum())
+                        tempo_total_h = float(df_centro["Tempo_liquido_h"].sum())
+                        avg_ef_geral = df_centro["Eficiencia_geral_%"].dropna().mean()
+                        avg_ef_ajustada = df_centro["Eficiencia_ajustada_%"].dropna().mean()
+                        prod_prevista_geral = int(df_centro["Prod_prevista_geral"].sum()) if "Prod_prevista_geral" in df_centro.columns else 0
+                        prod_prevista_ajustada = int(df_centro["Prod_prevista_ajustada"].sum()) if "Prod_prevista_ajustada" in df_centro.columns else 0
+                    
+                        # Verificar valores válidos antes de calcular a média
+                        vel_padrao_media = int(df_centro["Vel_padrao"].mean()) if not df_centro["Vel_padrao"].isna().all() else 0
+                        vel_real_media = int(df_centro["Vel_real"].mean()) if not df_centro["Vel_real"].isna().all() else 0
+
+                        # Exibir métricas gerais
+                        c1, c2, c3, c4, c5, c6, c7 = st.columns(7)
+                        c1.metric("📦 Produzido (total)", f"{total_produzido}".replace(",", "."))
+                        c2.metric("📦 Previsto (geral)", f"{prod_prevista_geral}".replace(",", "."))
+                        c3.metric("📦 Previsto (ajustado)", f"{prod_prevista_ajustada}".replace(",", "."))
+                        c4.metric("⚙️ Eficiência Geral", f"{int(round(avg_ef_geral))} %" if "Eficiencia_geral_%" in df_centro.columns and not pd.isna(avg_ef_geral) else "—")
+                        c5.metric("⚙️ Eficiência Ajustada", f"{int(round(avg_ef_ajustada))} %" if "Eficiencia_ajustada_%" in df_centro.columns and not pd.isna(avg_ef_ajustada) else "—")
+                        c6.metric("🚀 Velocidade Padrão Média", f"{vel_padrao_media}" if vel_padrao_media > 0 else "—")
+                        c7.metric("🚀 Velocidade Real Média", f"{vel_real_media}" if vel_real_media > 0 else "—")
+
+                        # Itens que rodaram abaixo da velocidade padrão neste centro
+                        lentos = itens_lentos(itens_por_centro_turno, centro)
+                        with st.expander(f"🐢 Itens abaixo da velocidade padrão ({len(lentos)})", expanded=False):
+                            if lentos.empty:
+                                st.write("Nenhum item abaixo da velocidade padrão.")
+                            else:
+                                mostrar_tabela(lentos[["Turno"] + COLUNAS_ITENS_EXIBICAO], hide_index=True)
 
-                                # Ordenar por tempo total de paradas
-                                paradas_por_tipo_centro = paradas_por_tipo_centro.sort_values("Paradas_total_h", ascending=False)
-
-                                # Gráfico de barras horizontais
-                                fig_paradas_tipo_centro = px.bar(
-                                    paradas_por_tipo_centro,
-                                    x="Paradas_total_h",
-                                    y="Descrição Parada",
-                                    orientation="h",
-                                    title="Distribuição de Paradas por Tipo",
-                                    labels={"Paradas_total_h": "Paradas (horas)", "Descrição Parada": "Tipo de Parada"},
-                                    text_auto=True
-                                )
-                                fig_paradas_tipo_centro.update_layout(
-                                    yaxis=dict(title="Tipo de Parada", automargin=True),
-                                    xaxis=dict(title="Paradas (horas)"),
-                                    margin=dict(l=0, r=0, t=40, b=0),
-                                    height=600
-                                )
-                                st.plotly_chart(fig_paradas_tipo_centro, use_container_width=True)
-                            except Exception as e:
-                                st.error(f"Erro ao gerar gráfico de Distribuição de Paradas por Tipo (detalhado): {e}")
-                        else:
-                            st.info("Nenhum dado disponível para gerar gráfico de Distribuição de Paradas por Tipo (detalhado).")
-        else:
-            st.info("Nenhum dado disponível para gráficos detalhados por centro.")
-    else:
+                        st.divider()
 
-        st.info("Nenhum dado disponível para gráficos detalhados.")
+                        # Detalhes por turno
+                        for turno in sorted(df_centro["Turno"].unique().tolist()):
+                            with st.expander(f"⏱️ Turno: {turno}", expanded=False):
+                                df_turno = df_centro[df_centro["Turno"] == turno].copy()
+                                cols_show = [
+                                    "Centro Trabalho", "Produzido", "Prod_prevista_geral", "Prod_prevista_ajustada",
+                                    "Eficiencia_geral_%", "Eficiencia_ajustada_%", "Paradas_min", "Vel_real"
+                                ]
+                                cols_show = [c for c in cols_show if c in df_turno.columns]
+                                if df_turno.empty or not cols_show:
+                                    st.write("Sem dados para este turno.")
+                                    continue
+
+                                # Itens produzidos neste turno, com a velocidade efetiva de cada um
+                                itens_turno = itens_do_turno(itens_por_centro_turno, centro, turno, df_turno["DataProd"].iloc[0])
+                                if not itens_turno.empty:
+                                    st.markdown("**📦 Itens produzidos neste turno:**")
+                                    mostrar_tabela(itens_turno[COLUNAS_ITENS_EXIBICAO], hide_index=True)
+                                else:
+                                    st.write("Nenhum item produzido neste turno.")
 
-# 1. Calcular tempo de produção para cada registro
-df_producao = df[df["Tipo Registro"] == "Reporte de Produção"].copy()
-df_producao["Tempo_Horas"] = 0  # Valor padrão
+                                mostrar_tabela(df_turno[cols_show])
+
+                                # Paradas detalhadas (se houver)
+                                if not paradas_detalhe.empty:
+                                    par_turno = paradas_detalhe[
+                                        (paradas_detalhe["Centro Trabalho"].astype(str).str.strip() == centro) &
+                                        (paradas_detalhe["Turno"] == turno)
+                                    ]
+                                    if not par_turno.empty:
+                                        st.markdown("**📋 Paradas desse turno:**")
+                                        st.dataframe(
+                                            par_turno[["Descrição Parada", "Parada_fmt"]].rename(columns={"Parada_fmt": "Parada (HH:MM)"}),
+                                            use_container_width=True
+                                        )
+        else:
+            st.info("Nenhum centro disponível para exibição.")
+    else:
+        st.info("Nenhum dado disponível para exibição.")
+
+
+# ===== Onde o item rodou =====
+@st.fragment
+def secao_busca_item(pipeline_dia):
+    st.subheader("🔎 Onde o item rodou")
+
+    if pipeline_dia is None:
+        st.info("Nenhum dado disponível para a busca de itens.")
+        return
+    dimensao = pipeline_dia.executar("itens")
+    if dimensao.empty:
+        st.info("Nenhum item no arquivo.")
+        return
+    c1, c2 = st.columns([3, 1])
+    item = c1.selectbox("Item", dimensao, key="busca_item")
+    with c2:
+        granularidade = escolher_granularidade("granularidade_item")
+
+    # Busca binária no índice dos itens dos dias consolidados do período
+    data_base = pipeline_dia.parametros["data_base"]
+    if granularidade is None:
+        pipeline_dia.consolidar_dias([data_base])
+        dias = [data_base]
+    else:
+        pipeline_dia.consolidar_periodo(granularidade)
+        dias = consolidados.dias(pipeline_dia.versao, granularidade, data_base) or [data_base]
+    linhas = consolidados.localizar_item(pipeline_dia.versao, dimensao.get_loc(item), dias[0], dias[-1])
+    if linhas.empty:
+        st.info("O item não rodou no período selecionado.")
+    else:
+        mostrar_tabela(linhas[["DataProd", "Centro Trabalho", "Turno"] + COLUNAS_ITENS_EXIBICAO[1:]], hide_index=True)
 
-# Calcular tempo de produção em horas onde possível
-mask_tempos_validos = df_producao["DataHoraInicio"].notna() & df_producao["DataHoraFim"].notna()
-if mask_tempos_validos.any():
-    df_producao.loc[mask_tempos_validos, "Tempo_Horas"] = (
-        (df_producao.loc[mask_tempos_validos, "DataHoraFim"] - 
-         df_producao.loc[mask_tempos_validos, "DataHoraInicio"]).dt.total_seconds() / 3600
-    )
 
-# Limpar tempos inválidos (negativos ou muito grandes)
-df_producao.loc[df_producao["Tempo_Horas"] < 0, "Tempo_Horas"] = 0
-df_producao.loc[df_producao["Tempo_Horas"] > 24, "Tempo_Horas"] = 8  # Default para registros com tempos absurdos
+# ===== Plot Área =====
+@st.fragment
+def secao_plot_area(pipeline_dia):
+    # Única seção que sempre desenha gráficos: o plotly só é importado aqui
+    import plotly.express as px
 
-# 2. Criar a coluna Conc para cada registro
-df_producao["Conc"] = df_producao["Centro Trabalho"].astype(str).str.strip() + "-" + df_producao["Roteiro"].astype(str).str.strip()
+    resumo_turno, paradas_detalhe, _ = resultados_do_dia(pipeline_dia)
 
-# 3. Mesclar com as velocidades padrão
-df_producao = df_producao.merge(vel[["Conc", "Velocidade Padrão"]], on="Conc", how="left")
+    st.title("🏭 Plot Área")
 
-# 4. Agrupar por centro e calcular média ponderada
-tempo_total_por_centro = df_producao.groupby("Centro Trabalho")["Tempo_Horas"].sum().reset_index()
-velocidade_ponderada = (
-    df_producao.groupby("Centro Trabalho")
-    .apply(lambda x: (x["Velocidade Padrão"] * x["Tempo_Horas"]).sum() / x["Tempo_Horas"].sum() if x["Tempo_Horas"].sum() > 0 else 0)
-    .reset_index(name="Velocidade Padrão")
-)
+    # ===== Abas para Gráficos e Detalhes =====
+    tab1, tab2 = st.tabs(["📊 Gráficos", "Em desenvolvimento"])
 
-# 5. Tratar valores faltantes ou inválidos
-velocidade_ponderada.loc[velocidade_ponderada["Velocidade Padrão"].isna(), "Velocidade Padrão"] = 20000
-velocidade_ponderada.loc[velocidade_ponderada["Velocidade Padrão"] <= 0, "Velocidade Padrão"] = 20000
+    # ===== Gráficos =====
+    with tab1:
+        st.subheader("📊 Gráficos de Produção, Eficiência e Paradas")
 
-# 6. Mesclar com o DataFrame de produção
-prod = prod.merge(velocidade_ponderada, on="Centro Trabalho", how="left")
+        if not resumo_turno.empty:
+            # Gráfico: Produção por Turno
+            st.markdown("### 📦 Produção por Turno")
+            try:
+                prod_por_turno = resumo_turno.groupby("Turno").agg(
+                    Produzido_total=("Produzido", "sum")
+                ).reset_index()
 
-# Calcular velocidade ponderada pela frequência de uso do roteiro
-freq_roteiros = (
-    df[df["Tipo Registro"] == "Reporte de Produção"]
-    .groupby(["Centro Trabalho", "Turno", "DataProd", "Roteiro"])
-    .size()
-    .reset_index(name="Frequencia")
-)
+                fig_prod_turno = px.bar(
+                    pretty_cols(prod_por_turno),
+                    x="Turno",
+                    y="Produção Total",  # Nome renomeado
+                    title="Produção Total por Turno",
+                    labels={"Produção Total": "Produção Total (unidades)", "Turno": "Turno"},
+                    text_auto=True
+                )
+                st.plotly_chart(fig_prod_turno, use_container_width=True, key="prod_turno")
+            except Exception as e:
+                st.error(f"Erro ao gerar gráfico de Produção por Turno: {e}")
 
-# Criar coluna Conc
-freq_roteiros["Conc"] = freq_roteiros["Centro Trabalho"].astype(str).str.strip() + "-" + freq_roteiros["Roteiro"].astype(str).str.strip()
+            # Gráfico: Eficiência Média por Turno
+            st.markdown("### 🏆 Eficiência Média por Turno")
+            try:
+                eficiencia_por_turno = resumo_turno.groupby("Turno").agg(
+                    Eficiencia_media=("Eficiencia_%", "mean")
+                ).reset_index()
 
-# Mesclar com velocidades
-freq_roteiros = freq_roteiros.merge(vel[["Conc", "Velocidade Padrão"]], on="Conc", how="left")
+                fig_ef_turno = px.bar(
+                    eficiencia_por_turno,
+                    x="Turno",
+                    y="Eficiencia_media",
+                    title="Eficiência Média por Turno",
+                    labels={"Eficiencia_media": "Eficiência Média (%)", "Turno": "Turno"},
+                    text_auto=True
+                )
+                st.plotly_chart(fig_ef_turno, use_container_width=True, key="ef_turno")
+            except Exception as e:
+                st.error(f"Erro ao gerar gráfico de Eficiência Média por Turno: {e}")
 
-# Tratar valores inválidos
-freq_roteiros["Velocidade Padrão"] = pd.to_numeric(freq_roteiros["Velocidade Padrão"], errors="coerce").fillna(20000)
-freq_roteiros.loc[freq_roteiros["Velocidade Padrão"] <= 0, "Velocidade Padrão"] = 20000
+            # Gráfico: Produção por Centro e Turno
+            st.markdown("### 📦 Produção por Centro e Turno")
+            try:
+                fig_prod_centro_turno = px.bar(
+                    resumo_turno,
+                    x="Centro Trabalho",
+                    y="Produzido",
+                    color="Turno",
+                    title="Produção por Centro e Turno",
+                    labels={"Produzido": "Produção (unidades)", "Centro Trabalho": "Centro", "Turno": "Turno"},
+                    barmode="stack"
+                )
+                st.plotly_chart(fig_prod_centro_turno, use_container_width=True, key="prod_centro_turno")
+            except Exception as e:
+                st.error(f"Erro ao gerar gráfico de Produção por Centro e Turno: {e}")
 
-# Calcular velocidade ponderada por centro, turno e data
-velocidade_ponderada = (
-    freq_roteiros
-    .groupby(["Centro Trabalho", "Turno", "DataProd"])
-    .apply(lambda x: (x["Velocidade Padrão"] * x["Frequencia"]).sum() / x["Frequencia"].sum())
-    .reset_index(name="Vel_ponderada")
-)
+            # Gráfico: Eficiência por Centro e Turno
+            st.markdown("### 🏆 Eficiência por Centro e Turno")
+            try:
+                fig_ef_centro_turno = px.bar(
+                    resumo_turno,
+                    x="Centro Trabalho",
+                    y="Eficiencia_%",
+                    color="Turno",
+                    title="Eficiência por Centro e Turno",
+                    labels={"Eficiencia_%": "Eficiência (%)", "Centro Trabalho": "Centro", "Turno": "Turno"},
+                    barmode="stack"
+                )
+                st.plotly_chart(fig_ef_centro_turno, use_container_width=True, key="ef_centro_turno")
+            except Exception as e:
+                st.error(f"Erro ao gerar gráfico de Eficiência por Centro e Turno: {e}")
 
-# Mesclar com prod
-prod = prod.merge(velocidade_ponderada, on=["Centro Trabalho", "Turno", "DataProd"], how="left")
+            # Gráfico: Paradas por Turno
+            st.markdown("### ⏱️ Paradas por Turno")
+            try:
+                paradas_por_turno = resumo_turno.groupby("Turno").agg(
+                    Paradas_total_h=("Paradas_h", "sum")
+                ).reset_index()
 
-# Tratar valores ausentes na velocidade ponderada
-prod["Vel_ponderada"].fillna(prod["Velocidade Padrão"], inplace=True)
+                fig_paradas_turno = px.bar(
+                    paradas_por_turno,
+                    x="Turno",
+                    y="Paradas_total_h",
+                    title="Tempo Total de Paradas por Turno",
+                    labels={"Paradas_total_h": "Paradas (horas)", "Turno": "Turno"},
+                    text_auto=True
+                )
+                st.plotly_chart(fig_paradas_turno, use_container_width=True, key="paradas_turno")
+            except Exception as e:
+                st.error(f"Erro ao gerar gráfico de Paradas por Turno: {e}")
 
-# Código antigo (exemplo)
-# eficiencia = df_turno["Produzido"].iloc[0] / (df_turno["Velocidade Padrão"].iloc[0] * df_turno["Horas"].iloc[0]) * 100
+            # Gráfico: Distribuição de Paradas por Tipo
+            # Pareto de paradas por tipo num intervalo de dias, somando os vetores diários
+            # dos consolidados: mover o intervalo não volta aos eventos de parada
+            st.markdown("### 📋 Pareto de Paradas por Tipo")
+            try:
+                dias_arquivo = pipeline_dia.dias_do_arquivo()
+                data_base = min(max(pipeline_dia.parametros["data_base"], dias_arquivo[0]), dias_arquivo[-1])
+                if len(dias_arquivo) > 1:
+                    inicio, fim = st.slider(
+                        "Intervalo de dias", min_value=dias_arquivo[0], max_value=dias_arquivo[-1],
+                        value=(max(dias_arquivo[0], data_base - timedelta(days=6)), data_base),
+                        format="DD/MM/YYYY", key="pareto_intervalo"
+                    )
+                else:
+                    inicio = fim = dias_arquivo[0]
+                c1, c2 = st.columns(2)
+                centros_pareto = ["Todos"] + sorted(resumo_turno["Centro Trabalho"].astype(str).unique().tolist())
+                centro_pareto = c1.selectbox("Centro", centros_pareto, key="pareto_centro")
+                top_pareto = c2.number_input("Maiores tipos", min_value=1, max_value=50, value=10, key="pareto_top")
+
+                pipeline_dia.consolidar_dias([d for d in dias_arquivo if inicio <= d <= fim])
+                pareto = consolidados.pareto_paradas(
+                    pipeline_dia.versao, inicio, fim, None if centro_pareto == "Todos" else centro_pareto, int(top_pareto)
+                )
+                if pareto.empty:
+                    st.info("Nenhuma parada registrada no intervalo selecionado.")
+                else:
+                    fig_pareto = px.bar(
+                        pareto,
+                        x="Descrição Parada",
+                        y="Parada_h",
+                        title=f"Pareto de Paradas — {centro_pareto} ({inicio:%d/%m} a {fim:%d/%m})",
+                        labels={"Parada_h": "Paradas (horas)", "Descrição Parada": "Tipo de Parada"},
+                        text_auto=".1f"
+                    )
+                    fig_pareto.add_scatter(
+                        x=pareto["Descrição Parada"], y=pareto["Acumulado_%"], name="Acumulado (%)",
+                        mode="lines+markers", yaxis="y2"
+                    )
+                    fig_pareto.update_layout(
+                        yaxis2=dict(title="Acumulado (%)", overlaying="y", side="right", range=[0, 105]),
+                        margin=dict(l=0, r=0, t=40, b=0),
+                        height=500,
+                        showlegend=False
+                    )
+                    st.plotly_chart(fig_pareto, use_container_width=True, key="paradas_pareto")
+            except Exception as e:
+                st.error(f"Erro ao gerar o Pareto de Paradas por Tipo: {e}")
+        else:
+            st.info("Nenhum dado disponível para gráficos.")
 
-# Substitua por:
-eficiencia = df_turno["Produzido"].iloc[0] / (df_turno["Vel_ponderada"].iloc[0] * df_turno["Horas"].iloc[0]) * 100
+    with tab2:
+        st.subheader("📊 Gráficos Detalhados por Centro")
 
+        if not resumo_turno.empty:
+            centros_unicos = sorted(resumo_turno["Centro Trabalho"].astype(str).unique().tolist())
 
+            if centros_unicos:
+                # Criar abas para cada centro
+                tabs = st.tabs(centros_unicos)
 
+                for tab, centro in zip(tabs, centros_unicos):
+                    with tab:
+                        df_centro = resumo_turno[resumo_turno["Centro Trabalho"].astype(str).str.strip() == centro].copy()
 
+                        if df_centro.empty:
+                            st.warning(f"Nenhum dado encontrado para o Centro {centro}.")
+                        else:
+                            st.markdown(f"## 🏭 Centro: `{centro}`")
+                            # Gráfico: Produção ao longo do tempo
+                            st.markdown("### 📈 Produção ao longo do tempo")
+                            try:
+                                prod_tempo = df_centro.groupby("DataProd").agg(
+                                    Produzido_total=("Produzido", "sum")
+                                ).reset_index()
 
+                                fig_prod_tempo = px.line(
+                                    prod_tempo,
+                                    x="DataProd",
+                                    y="Produzido_total",
+                                    title="Produção Total ao longo do tempo",
+                                    labels={"Produzido_total": "Produção Total (unidades)", "DataProd": "Data"},
+                                    markers=True
+                                )
+                                st.plotly_chart(fig_prod_tempo, use_container_width=True)
+                            except Exception as e:
+                                st.error(f"Erro ao gerar gráfico de Produção ao longo do tempo: {e}")
 
+                            # Gráfico: Eficiência ao longo do tempo
+                            st.markdown("### ⏱️ Eficiência ao longo do tempo")
+                            try:
+                                ef_tempo = df_centro.groupby("DataProd").agg(
+                                    Eficiencia_media=("Eficiencia_%", "mean")
+                                ).reset_index()
 
+                                fig_ef_tempo = px.line(
+                                    ef_tempo,
+                                    x="DataProd",
+                                    y="Eficiencia_media",
+                                    title="Eficiência Média ao longo do tempo",
+                                    labels={"Eficiencia_media": "Eficiência Média (%)", "DataProd": "Data"},
+                                    markers=True
+                                )
+                                st.plotly_chart(fig_ef_tempo, use_container_width=True)
+                            except Exception as e:
+                                st.error(f"Erro ao gerar gráfico de Eficiência ao longo do tempo: {e}")
 
+                            # Gráfico: Produção e Eficiência em conjunto
+                            st.markdown("### 📊 Produção e Eficiência em conjunto")
+                            try:
+                                prod_ef_tempo = df_centro.groupby("DataProd").agg(
+                                    Produzido_total=("Produzido", "sum"),
+                                    Eficiencia_media=("Eficiencia_%", "mean")
+                                ).reset_index()
 
+                                fig_prod_ef_tempo = px.line(
+                                    prod_ef_tempo,
+                                    x="DataProd",
+                                    y=["Produzido_total", "Eficiencia_media"],
+                                    title="Produção e Eficiência ao longo do tempo",
+                                    labels={"value": "Produção / Eficiência", "DataProd": "Data"},
+                                    markers=True
+                                )
+                                fig_prod_ef_tempo.update_traces(
+                                    hovertemplate=None,
+                                    mode="lines+markers"
+                                )
+                                st.plotly_chart(fig_prod_ef_tempo, use_container_width=True)
+                            except Exception as e:
+                                st.error(f"Erro ao gerar gráfico de Produção e Eficiência em conjunto: {e}")
 
+                            # Gráfico: Paradas ao longo do tempo
+                            st.markdown("### ⏱️ Paradas ao longo do tempo")
+                            try:
+                                paradas_tempo = df_centro.groupby("DataProd").agg(
+                                    Paradas_total_h=("Paradas_h", "sum")
+                                ).reset_index()
 
+                                fig_paradas_tempo = px.line(
+                                    paradas_tempo,
+                                    x="DataProd",
+                                    y="Paradas_total_h",
+                                    title="Tempo Total de Paradas ao longo do tempo",
+                                    labels={"Paradas_total_h": "Paradas (horas)", "DataProd": "Data"},
+                                    markers=True
+                                )
+                                st.plotly_chart(fig_paradas_tempo, use_container_width=True)
+                            except Exception as e:
+                                st.error(f"Erro ao gerar gráfico de Paradas ao longo do tempo: {e}")
+
+                            # Gráfico: Distribuição de Paradas por Tipo (detalhado)
+                            st.markdown("### 📋 Distribuição de Paradas por Tipo (detalhado)")
+                            if not paradas_detalhe.empty:
+                                try:
+                                    paradas_por_tipo_centro = paradas_detalhe[
+                                        paradas_detalhe["Centro Trabalho"].astype(str).str.strip() == centro
+                                    ].groupby("Descrição Parada").agg(
+                                        Paradas_total_h=("Parada_h", "sum")
+                                    ).reset_index()
+
+                                    # Ordenar por tempo total de paradas
+                                    paradas_por_tipo_centro = paradas_por_tipo_centro.sort_values("Paradas_total_h", ascending=False)
+
+                                    # Gráfico de barras horizontais
+                                    fig_paradas_tipo_centro = px.bar(
+                                        paradas_por_tipo_centro,
+                                        x="Paradas_total_h",
+                                        y="Descrição Parada",
+                                        orientation="h",
+                                        title="Distribuição de Paradas por Tipo",
+                                        labels={"Paradas_total_h": "Paradas (horas)", "Descrição Parada": "Tipo de Parada"},
+                                        text_auto=True
+                                    )
+                                    fig_paradas_tipo_centro.update_layout(
+                                        yaxis=dict(title="Tipo de Parada", automargin=True),
+                                        xaxis=dict(title="Paradas (horas)"),
+                                        margin=dict(l=0, r=0, t=40, b=0),
+                                        height=600
+                                    )
+                                    st.plotly_chart(fig_paradas_tipo_centro, use_container_width=True)
+                                except Exception as e:
+                                    st.error(f"Erro ao gerar gráfico de Distribuição de Paradas por Tipo (detalhado): {e}")
+                            else:
+                                st.info("Nenhum dado disponível para gerar gráfico de Distribuição de Paradas por Tipo (detalhado).")
+            else:
+                st.info("Nenhum dado disponível para gráficos detalhados por centro.")
+        else:
 
+            st.info("Nenhum dado disponível para gráficos detalhados.")
+
+@st.fragment
+def secao_exportacao(pipeline, data_base):
+    """Botões do xlsx dos dias escolhidos e do PDF do dia; os arquivos só são gerados no clique."""
+    if pipeline is None or data_base is None:
+        return
+    with st.expander("📥 Baixar relatório"):
+        st.download_button(
+            "Baixar PDF do dia",
+            data=partial(pipeline.com_data(data_base).executar, "pdf"),
+            file_name=f"relatorio_producao_{data_base:%Y%m%d}.pdf",
+            mime="application/pdf",
+        )
+        periodo = st.date_input("Dias do relatório", value=(data_base, data_base), key="exportacao_periodo")
+        if not periodo:
+            return
+        inicio, fim = periodo[0], periodo[-1]
+        dias = dias_do_periodo(inicio, fim)
+        if len(dias) > DIAS_MAXIMOS:
+            st.warning(f"Escolha no máximo {DIAS_MAXIMOS} dias para o relatório.")
+            return
+        st.download_button(
+            "Baixar relatório (.xlsx)",
+            data=partial(exportar_dias, pipeline, dias),
+            file_name=f"relatorio_producao_{inicio:%Y%m%d}_{fim:%Y%m%d}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
 
 
+# ----------------- Seções -----------------
+secao_rankings(pipeline_dia)
+secao_resumo_geral(pipeline_dia)
+secao_sumario_centros(pipeline_dia)
+secao_comparacao(pipeline if not df.empty else None, data_base)
+secao_detalhes_centro(pipeline_dia)
+secao_busca_item(pipeline_dia)
+secao_plot_area(pipeline_dia)
+with st.sidebar:
+    secao_exportacao(pipeline if not df.empty else None, data_base)
+marcar_inicio("Seções")
+
+# Tempos até cada marco desta execução; as importações só pesam na primeira do processo
+tempos_inicio = " · ".join(f"{nome}: {ms:.0f} ms" for nome, ms in marcos_inicio.items())
+st.sidebar.caption(f"⏱️ {tempos_inicio}")
+# Contadores do cache de resultados desde o início do processo (todas as sessões)
+estatisticas_cache = cache_resultados.estatisticas()
+resumo_cache = (f"{estatisticas_cache['acertos']} acertos · {estatisticas_cache['faltas']} faltas · "
+                f"{estatisticas_cache['descartes']} descartes · {estatisticas_cache['resultados']} resultados, "
+                f"{estatisticas_cache['ocupado_mb']:.0f} MB"
+                + (f" de {estatisticas_cache['limite_mb']:.0f} MB" if estatisticas_cache["limite_mb"] else ""))
+st.sidebar.caption(f"🗃️ Cache: {resumo_cache}")
+
+# ----------------- Perfil -----------------
+if captura_perfil is not None:
+    captura_perfil.contexto = {
+        "Versão dos dados": pipeline.versao,
+        "Data produtiva": data_base,
+        "Origem": "parâmetro ?perfil=1" if st.query_params.get("perfil") == "1" else "interruptor da barra lateral",
+        "Marcos da execução": tempos_inicio,
+        "Cache de resultados": resumo_cache,
+    }
+    guardar_perfil(captura_perfil)
+    st.session_state.pop("perfil_captura", None)
+
+st.sidebar.toggle("🔬 Perfilar a próxima execução", key="perfil_proxima",
+                  help="Mede tempo e memória da próxima execução completa do relatório (etapas, chamadas st.* e seções).")
+if st.session_state.get("perfil_armado"):
+    st.sidebar.caption("A próxima interação que recarregar o relatório será perfilada.")
+perfil_resultado = st.session_state.get("perfil_resultado")
+if perfil_resultado is not None:
+    with st.sidebar.expander("🔬 Último perfil"):
+        st.caption(f"{perfil_resultado['momento']:%d/%m/%Y %H:%M:%S} — {perfil_resultado['duracao_s']:.2f} s")
+        nome_perfil = f"perfil_{perfil_resultado['momento']:%Y%m%d_%H%M%S}"
+        st.download_button("Baixar relatório (.txt)", perfil_resultado["relatorio"], file_name=f"{nome_perfil}.txt",
+                           mime="text/plain", on_click="ignore")
+        st.download_button("Baixar pilhas (.folded)", perfil_resultado["pilhas"], file_name=f"{nome_perfil}.folded",
+                           mime="text/plain", on_click="ignore")
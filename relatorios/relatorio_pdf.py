@@ -0,0 +1,192 @@
+"""
+Relatório diário em PDF (fpdf): pódios de eficiência e produção, métricas do Resumo
+Geral, Sumário dos Centros e Pareto das paradas do dia, a partir do resumo_turno, do
+paradas_detalhe e do sumario_centros calculados pela pipeline.
+
+É a etapa "pdf" da Pipeline, então fica memorizada no cache de resultados por versão
+dos dados e dia: baixar de novo o PDF de um dia não gera o arquivo outra vez. A página
+só gera o PDF quando o botão de download é clicado, na própria requisição do clique:
+o primeiro clique de um dia espera o PDF e as métricas do dia que ainda não estiverem
+no cache.
+
+As fontes padrão do PDF só têm os caracteres latin-1: acentos saem, emojis são omitidos.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+from fpdf import FPDF
+
+from exibicao import ranking, resumo_geral
+from processamento import t
+
+LARGURA = 190  # A4 retrato com margens de 10 mm
+CORES_PODIO = [(255, 215, 0), (192, 192, 192), (205, 127, 50)]
+CORES_PIORES = [(178, 34, 34), (255, 69, 0), (255, 140, 0)]
+COR_BARRA = (31, 119, 180)
+TOPO_PARETO = 10
+COLUNAS_SUMARIO = [
+    # (coluna, título, largura, formato)
+    ("Centro", "Centro", 18, "{}"),
+    ("Classificação", "Classificação", 24, "{}"),
+    ("Produzido_total", "Produzido", 22, "inteiro"),
+    ("Paradas_total_h", "Paradas (h)", 18, "{:.2f}"),
+    ("Ef_media", "Ef. média", 18, "{:.2f} %"),
+    ("Ef_ajustada_media", "Ef. ajustada", 20, "{:.2f} %"),
+    ("Maiores Paradas", "Maiores paradas", 70, "{}"),
+]
+
+
+def _texto(valor):
+    # Só latin-1 nas fontes padrão: emojis e outros símbolos são omitidos
+    return str(valor).encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+def _inteiro(valor):
+    return "-" if pd.isna(valor) else f"{int(round(float(valor))):,}".replace(",", ".")
+
+
+def _formatar(valor, formato):
+    if formato == "inteiro":
+        return _inteiro(valor)
+    if pd.isna(valor):
+        return "-"
+    return formato.format(valor)
+
+
+def pareto_do_dia(paradas_detalhe, top=TOPO_PARETO):
+    """Minutos de parada por tipo (todos os centros), do maior ao menor, com participação acumulada."""
+    if paradas_detalhe.empty:
+        return pd.DataFrame(columns=["Descrição Parada", "Parada_min", "Parada_h", "Acumulado_%"])
+    pareto = (paradas_detalhe.groupby("Descrição Parada", as_index=False)["Parada_min"].sum()
+              .sort_values("Parada_min", ascending=False, kind="stable"))
+    pareto = pareto[pareto["Parada_min"] > 0]
+    pareto["Parada_h"] = pareto["Parada_min"] / 60.0
+    pareto["Acumulado_%"] = pareto["Parada_min"].cumsum() / pareto["Parada_min"].sum() * 100
+    return pareto.head(top).reset_index(drop=True)
+
+
+class _Documento(FPDF):
+    def __init__(self, titulo):
+        super().__init__("P", "mm", "A4")
+        self.titulo = titulo
+        self.set_auto_page_break(True, margin=12)
+        self.set_margins(10, 10, 10)
+
+    def header(self):
+        self.set_font("Arial", "B", 14)
+        self.cell(0, 8, _texto(self.titulo), 0, 1, "L")
+        self.set_draw_color(200, 200, 200)
+        self.line(10, self.get_y(), 200, self.get_y())
+        self.ln(3)
+
+    def footer(self):
+        self.set_y(-10)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 5, f"Página {self.page_no()}", 0, 0, "R")
+
+    def secao(self, titulo):
+        if self.get_y() > 250:
+            self.add_page()
+        self.ln(2)
+        self.set_font("Arial", "B", 12)
+        self.cell(0, 7, _texto(titulo), 0, 1, "L")
+        self.set_font("Arial", "", 9)
+
+    def cortar(self, texto, largura):
+        """Texto que cabe na largura com a fonte atual, com "..." quando foi cortado."""
+        if self.get_string_width(texto) <= largura:
+            return texto
+        while texto and self.get_string_width(texto + "...") > largura:
+            texto = texto[:-1]
+        return texto + "..."
+
+    def podio(self, linhas, cores, rotulo):
+        largura = LARGURA / 3
+        y = self.get_y()
+        for i, linha in linhas.iterrows():
+            x = 10 + i * largura
+            self.set_draw_color(*cores[i])
+            self.set_line_width(0.6)
+            self.rect(x + 1, y, largura - 2, 14)
+            self.set_xy(x + 3, y + 1.5)
+            self.set_font("Arial", "B", 9)
+            posicao = f"{i + 1}º {rotulo}" if rotulo else f"{i + 1}º"
+            self.cell(largura - 6, 5, _texto(f"{posicao} - {linha['Centro Trabalho']} ({linha['Turno']})"), 0, 2)
+            self.set_font("Arial", "", 9)
+            self.cell(largura - 6, 5, _texto(f"Produzido: {_inteiro(linha['Produzido'])} | "
+                                             f"Eficiência: {_inteiro(linha['Eficiencia_%'])}%"), 0, 0)
+        self.set_line_width(0.2)
+        self.set_xy(10, y + 17)
+
+
+def gerar_pdf(dia, resumo_turno, paradas_detalhe, sumario_centros):
+    """PDF do dia produtivo como bytes."""
+    inicio = datetime.combine(pd.Timestamp(dia).date(), t("06:00"))
+    documento = _Documento(f"Relatório de Produção - {inicio:%d/%m/%Y} "
+                           f"({inicio:%d/%m %H:%M} a {inicio + timedelta(days=1):%d/%m %H:%M})")
+    documento.add_page()
+
+    if resumo_turno.empty:
+        documento.set_font("Arial", "", 10)
+        documento.cell(0, 8, "Nenhum registro neste dia produtivo.", 0, 1)
+        return documento.output(dest="S").encode("latin-1")
+
+    # Pódios
+    for coluna, nome in (("Eficiencia_%", "Eficiência"), ("Produzido", "Produção")):
+        documento.secao(f"Ranking Geral - {nome}")
+        documento.podio(ranking(resumo_turno, coluna), CORES_PODIO, "")
+        documento.podio(ranking(resumo_turno, coluna, piores=True), CORES_PIORES, "pior")
+
+    # Resumo Geral
+    documento.secao("Resumo Geral")
+    total = resumo_geral(resumo_turno)
+    metricas = [
+        ("Produção Total", _inteiro(total["Produzido"])),
+        ("Produção Prevista", _inteiro(total["Prod_prevista"])),
+        ("Produção Prevista Ajustada", _inteiro(total["Prod_prevista_ajustada"])),
+        ("Eficiência Média", f"{total['Ef_media']:.2f} %"),
+        ("Eficiência Ajustada", f"{total['Ef_ajustada_media']:.2f} %"),
+        ("Tempo Total de Paradas (h)", f"{total['Paradas_h']:.2f}"),
+    ]
+    largura = LARGURA / 3
+    for i, (rotulo, valor) in enumerate(metricas):
+        documento.set_font("Arial", "", 8)
+        x, y = 10 + (i % 3) * largura, documento.get_y()
+        documento.cell(largura, 4, _texto(rotulo), 0, 2)
+        documento.set_font("Arial", "B", 12)
+        documento.cell(largura, 7, _texto(valor), 0, 0)
+        documento.set_xy(x + largura, y) if i % 3 < 2 else documento.set_xy(10, y + 13)
+
+    # Sumário dos Centros
+    documento.secao("Sumário dos Centros")
+    documento.set_font("Arial", "B", 8)
+    documento.set_fill_color(235, 235, 235)
+    for _, titulo, largura_coluna, _ in COLUNAS_SUMARIO:
+        documento.cell(largura_coluna, 6, _texto(titulo), 1, 0, "C", 1)
+    documento.ln()
+    documento.set_font("Arial", "", 7)
+    for _, linha in sumario_centros.iterrows():
+        for coluna, _, largura_coluna, formato in COLUNAS_SUMARIO:
+            texto = documento.cortar(_texto(_formatar(linha.get(coluna), formato)), largura_coluna - 2)
+            documento.cell(largura_coluna, 5, texto, 1, 0, "L" if formato == "{}" else "R")
+        documento.ln()
+
+    # Pareto das paradas
+    documento.secao(f"Pareto de Paradas por Tipo (maiores {TOPO_PARETO})")
+    pareto = pareto_do_dia(paradas_detalhe)
+    if pareto.empty:
+        documento.cell(0, 6, "Nenhuma parada registrada.", 0, 1)
+    else:
+        maior = pareto["Parada_h"].max()
+        largura_rotulo, largura_barra = 55, 100
+        for _, linha in pareto.iterrows():
+            y = documento.get_y()
+            documento.set_font("Arial", "", 8)
+            documento.cell(largura_rotulo, 6, documento.cortar(_texto(linha["Descrição Parada"]), largura_rotulo - 2), 0, 0)
+            documento.set_fill_color(*COR_BARRA)
+            comprimento = largura_barra * (linha["Parada_h"] / maior if maior else 0)
+            documento.rect(10 + largura_rotulo, y + 1, max(comprimento, 0.5), 4, "F")
+            documento.set_x(10 + largura_rotulo + largura_barra + 2)
+            documento.cell(35, 6, f"{linha['Parada_h']:.2f} h  ({linha['Acumulado_%']:.0f}% acum.)", 0, 1)
+
+    return documento.output(dest="S").encode("latin-1")
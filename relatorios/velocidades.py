@@ -0,0 +1,106 @@
+"""
+Velocidades padrão com vigência: cada Conc pode ter várias versões na planilha de
+velocidades, cada uma valendo a partir da data da coluna "Vigente desde" (às 06:00,
+início do dia produtivo). Assim um dia antigo continua calculado com a velocidade que
+valia nele, mesmo depois de a planilha ganhar velocidades novas.
+
+Regras de vigência:
+- linha sem data (ou planilha sem a coluna) vale desde sempre;
+- a versão mais antiga de cada Conc vale também para antes da sua data, porque antes
+  dela não havia outra;
+- com duas linhas do mesmo Conc e da mesma data, vale a primeira.
+
+Sem a coluna, toda Conc tem uma só versão e o resultado é o da planilha como foto única.
+
+A velocidade de cada evento sai de uma junção as-of ordenada em (Conc, início do
+evento), de uma vez para todos os eventos. O índice ordenado é montado uma vez por
+conteúdo da tabela de velocidades (hash) e reaproveitado por todos os dias calculados
+com ela.
+"""
+import hashlib
+import threading
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+COLUNA_VIGENCIA = "Vigente desde"
+INICIO_VIGENCIA = time(6, 0)
+# Quantos índices (conjuntos de versões) ficam em memória
+INDICES_GUARDADOS = 8
+
+_indices = {}
+_lock = threading.Lock()
+
+
+class IndiceVelocidades:
+    def __init__(self, vel):
+        conc = vel["Conc"].astype(str).str.strip()
+        if COLUNA_VIGENCIA in vel.columns:
+            vigencia = pd.to_datetime(vel[COLUNA_VIGENCIA], errors="coerce").dt.normalize()
+            vigencia = vigencia + pd.Timedelta(hours=INICIO_VIGENCIA.hour, minutes=INICIO_VIGENCIA.minute)
+        else:
+            vigencia = pd.Series(pd.NaT, index=vel.index, dtype="datetime64[ns]")
+        # Sem data e versão mais antiga de cada Conc: valem desde sempre
+        vigencia = vigencia.fillna(pd.Timestamp.min)
+        vigencia = vigencia.mask(vigencia == vigencia.groupby(conc).transform("min"), pd.Timestamp.min)
+
+        # Todas as linhas, na ordem da planilha (a média por centro conta cada uma)
+        self.tabela = pd.DataFrame({"Conc": conc, "Velocidade Padrão": vel["Velocidade Padrão"], "Vigencia": vigencia})
+        # Uma linha por (Conc, vigência), ordenada pela vigência para a junção as-of
+        self._versoes = (
+            self.tabela.drop_duplicates(["Conc", "Vigencia"])
+            .assign(**{"Velocidade Padrão": lambda v: pd.to_numeric(v["Velocidade Padrão"], errors="coerce")})
+            .sort_values("Vigencia", kind="stable", ignore_index=True)
+        )
+
+    @property
+    def versoes(self):
+        """Quantidade de versões distintas (Conc, vigência)."""
+        return len(self._versoes)
+
+    def vigentes_em(self, momento):
+        """Linhas da tabela de velocidades em vigor no momento: para cada Conc, as da versão mais recente."""
+        tabela = self.tabela
+        elegiveis = tabela["Vigencia"] <= pd.Timestamp(momento)
+        ultima = tabela["Vigencia"].where(elegiveis).groupby(tabela["Conc"]).transform("max")
+        return tabela.loc[elegiveis & (tabela["Vigencia"] == ultima), ["Conc", "Velocidade Padrão"]]
+
+    def por_evento(self, conc, momentos):
+        """
+        Velocidade padrão de cada evento (NaN para Conc sem velocidade): a da versão
+        mais recente do seu Conc com vigência até o momento. Eventos sem momento usam a
+        versão mais recente.
+        """
+        eventos = pd.DataFrame({
+            "Conc": conc.astype(str).str.strip().to_numpy(),
+            "Momento": pd.Series(momentos).fillna(pd.Timestamp.max).to_numpy(dtype="datetime64[ns]"),
+            "_posicao": np.arange(len(conc)),
+        }).sort_values("Momento", kind="stable")
+        resolvidos = pd.merge_asof(eventos, self._versoes[["Conc", "Vigencia", "Velocidade Padrão"]],
+                                   left_on="Momento", right_on="Vigencia", by="Conc", direction="backward")
+        velocidades = np.empty(len(conc))
+        velocidades[resolvidos["_posicao"].to_numpy()] = resolvidos["Velocidade Padrão"].to_numpy(dtype=float)
+        return pd.Series(velocidades, index=conc.index)
+
+
+def inicio_do_dia(dia):
+    """Momento em que começa o dia produtivo: é nele que vale a versão do dia."""
+    return datetime.combine(pd.Timestamp(dia).date(), INICIO_VIGENCIA)
+
+
+def indice_velocidades(vel):
+    """Índice da tabela de velocidades; montado só na primeira vez que vê cada conteúdo."""
+    colunas = [c for c in ("Conc", "Velocidade Padrão", COLUNA_VIGENCIA) if c in vel.columns]
+    impressao = hashlib.md5(
+        repr(colunas).encode() + pd.util.hash_pandas_object(vel[colunas], index=False).to_numpy().tobytes()
+    ).hexdigest()
+    with _lock:
+        indice = _indices.get(impressao)
+    if indice is None:
+        indice = IndiceVelocidades(vel)
+        with _lock:
+            _indices[impressao] = indice
+            while len(_indices) > INDICES_GUARDADOS:
+                _indices.pop(next(iter(_indices)))
+    return indice
@@ -0,0 +1,91 @@
+"""
+Testes do relatório com conjuntos de dados sintéticos fixos (tests/dados_sinteticos.py).
+
+Os módulos de relatorios/ importam uns aos outros pelo nome, como quando rodam no
+Streamlit, então a pasta entra no sys.path.
+
+    python -m pytest tests                      # saídas golden e orçamentos de memória com 100 mil linhas
+    python -m pytest tests --lentos             # inclui os orçamentos com 1 milhão de linhas
+    python -m pytest tests --tempos             # inclui os orçamentos de tempo
+    python -m pytest tests --atualizar-golden   # regrava tests/golden/ com as saídas atuais
+
+Os orçamentos de tempo podem ser multiplicados em máquinas mais lentas com a variável
+de ambiente ORCAMENTO_FATOR_TEMPO (ex.: 2).
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+PASTA_TESTES = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(PASTA_TESTES), "relatorios"))
+sys.path.insert(0, PASTA_TESTES)
+
+# Cópias das planilhas dos testes fora da pasta do app
+os.environ.setdefault("RELATORIO_PLANILHAS", os.path.join(tempfile.mkdtemp(prefix="relatorio-testes-"), "planilhas"))
+
+# Regras fixas dos testes: mudar static/regras.json não mexe nas saídas golden
+CAMINHO_REGRAS_TESTE = os.path.join(PASTA_TESTES, "regras.json")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--lentos", action="store_true", help="roda também os testes marcados como lentos")
+    parser.addoption("--tempos", action="store_true", help="roda também os orçamentos de tempo")
+    parser.addoption("--atualizar-golden", action="store_true", help="regrava as saídas golden em vez de comparar")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "lento: teste demorado (1 milhão de linhas), só roda com --lentos")
+    config.addinivalue_line("markers", "tempo: orçamento de tempo, que depende da máquina, só roda com --tempos")
+
+
+def pytest_collection_modifyitems(config, items):
+    for marca, opcao in (("lento", "--lentos"), ("tempo", "--tempos")):
+        if config.getoption(opcao):
+            continue
+        pular = pytest.mark.skip(reason=f"teste {marca}: use {opcao}")
+        for item in items:
+            if marca in item.keywords:
+                item.add_marker(pular)
+
+
+@pytest.fixture(scope="session")
+def regras():
+    from regras import carregar_regras
+    return carregar_regras(CAMINHO_REGRAS_TESTE)
+
+
+@pytest.fixture(scope="session")
+def planilhas_sinteticas(tmp_path_factory):
+    """Caminhos das planilhas de registros (2000 linhas em 3 dias) e de velocidades, como as do upload."""
+    from dados_sinteticos import gerar_registros, gerar_velocidades
+
+    pasta = tmp_path_factory.mktemp("planilhas_sinteticas")
+    registros, velocidades = pasta / "registros.xlsx", pasta / "velocidades.xlsx"
+    gerar_registros(2000, semente=7, dias=3).to_excel(registros, index=False)
+    gerar_velocidades().to_excel(velocidades, index=False)
+    return str(registros), str(velocidades)
+
+
+@pytest.fixture(scope="session")
+def nova_pipeline(planilhas_sinteticas):
+    """
+    Fábrica de Pipelines sobre as planilhas sintéticas (ou sobre `fonte`: outro arquivo
+    de registros ou uma Selecao do acervo), com as regras dos testes e um cache próprio.
+    """
+    from cache_resultados import CacheResultados
+    from pipeline import Pipeline
+
+    registros, velocidades = planilhas_sinteticas
+
+    def nova(fonte=None, limite_mb=None, consolidados=None):
+        return Pipeline(CacheResultados(max_workers=1, limite_mb=limite_mb), registros if fonte is None else fonte,
+                        velocidades, consolidados=consolidados, arquivo_regras=CAMINHO_REGRAS_TESTE)
+
+    return nova
+
+
+@pytest.fixture
+def atualizar_golden(request):
+    return request.config.getoption("--atualizar-golden")
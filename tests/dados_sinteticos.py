@@ -0,0 +1,106 @@
+"""
+Conjuntos de dados sintéticos e fixos para os testes: registros brutos no formato da
+planilha exportada (datas e horas como texto "dd/mm/aaaa" e "HH:MM:SS") e a tabela de
+velocidades correspondente. A mesma semente gera sempre os mesmos registros.
+"""
+import numpy as np
+import pandas as pd
+
+INICIO = pd.Timestamp("2025-09-01 00:00")
+
+# Centros com os roteiros que aparecem nos registros ("" = sem roteiro, para as regras)
+ROTEIROS = {
+    "CA01": ["0020075T02", ""],
+    "CA04": ["0020090T00", ""],
+    "CA05": ["0020061T01", ""],
+    "CA06": ["0020043T02", "0020053T00"],
+    "CA09": ["0020017T00", ""],
+    "CA12": ["0020080T00"],
+    "CA15": [""],
+    "CA16": ["0020095T00", ""],
+    "GR01": ["A"],
+    "CB02": ["B"],
+}
+OPERACOES = {
+    "CA04": ["Pre Vincagem", "Aplic Ink-Jet / Pré-Vincagem"],
+    "CA16": ["Pre Vincagem", "Outra"],
+    "CA15": ["Aplic Ink-Jet / Colagem"],
+    "CA09": ["Colagem", "Corte"],
+}
+PARADAS = ["REFEIÇÕES", "ACERTO", "TESTE", "MANUTENÇÃO", "FALTA MATERIAL", "PRODUÇÃO INTERROMPIDA"]
+VELOCIDADES = {
+    "CA01-0020075T02": 10500.0,
+    "CA04-0020090T00": 90000.0,
+    "CA05-0020061T01": 60000.0,
+    "CA06-0020043T02": 18000.0,
+    "CA06-0020053T00": 6000.0,
+    "CA09-0020017T00": 15000.0,
+    "CA12-0020080T00": 10000.0,
+    "CA16-0020095T00": 100000.0,
+}
+
+
+# Textos de hora ("HH:MM:SS") e de parada útil ("0,05") por índice, para montar as
+# colunas de texto por consulta em vez de formatar linha a linha
+_HORAS = np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(24 * 60 * 60)], dtype=object)
+_PARADAS_UTEIS = np.array([str(round(c / 100, 2)).replace(".", ",") for c in range(151)], dtype=object)
+
+
+def _escolher(rng, opcoes_por_chave, chaves):
+    """Uma opção sorteada por linha, da lista de opções da chave da linha."""
+    saida = np.empty(len(chaves), dtype=object)
+    for chave, opcoes in opcoes_por_chave.items():
+        linhas = np.flatnonzero(chaves == chave)
+        saida[linhas] = np.asarray(opcoes, dtype=object)[rng.integers(len(opcoes), size=len(linhas))]
+    return saida
+
+
+def _textos(momentos):
+    """(data "dd/mm/aaaa", hora "HH:MM:SS") de cada momento."""
+    dias = momentos.normalize()
+    codigos, unicos = pd.factorize(dias)
+    datas = np.asarray(unicos.strftime("%d/%m/%Y"), dtype=object)[codigos]
+    segundos = ((momentos - dias) // pd.Timedelta(seconds=1)).to_numpy()
+    return datas, _HORAS[segundos]
+
+
+def gerar_registros(n, semente=0, dias=None):
+    """
+    n registros brutos distribuídos por `dias` dias a partir de 01/09/2025 (por padrão
+    cerca de 150 registros por dia, a densidade dos arquivos reais).
+    """
+    dias = max(1, n // 150) if dias is None else dias
+    rng = np.random.default_rng(semente)
+    centros = np.asarray(list(ROTEIROS), dtype=object)[rng.integers(len(ROTEIROS), size=n)]
+    inicio = INICIO + pd.to_timedelta(rng.integers(0, 24 * 60 * 60 * dias, size=n), unit="s")
+    fim = inicio + pd.to_timedelta(rng.integers(60, 120 * 60, size=n), unit="s")
+    producao = rng.random(n) < 0.6
+
+    roteiros = _escolher(rng, ROTEIROS, centros)
+    roteiros[roteiros == ""] = None
+    operacoes = _escolher(rng, {c: OPERACOES.get(c, ["Op"]) for c in ROTEIROS}, centros)
+    itens = np.array([f"ITEM {i:03d}" for i in range(30)], dtype=object)[rng.integers(30, size=n)]
+    paradas = np.asarray(PARADAS, dtype=object)[rng.integers(len(PARADAS), size=n)]
+    parada_util = _PARADAS_UTEIS[rng.integers(len(_PARADAS_UTEIS), size=n)]
+    data_inicio, hora_inicio = _textos(inicio)
+    data_fim, hora_fim = _textos(fim)
+
+    return pd.DataFrame({
+        "Data Início": data_inicio,
+        "Hora Início": hora_inicio,
+        "Data Término": data_fim,
+        "Hora Fim": hora_fim,
+        "Centro Trabalho": centros,
+        "Roteiro": roteiros,
+        "Tipo Registro": np.where(producao, "Reporte de Produção", "Reporte de Parada").astype(object),
+        "Descrição Operação": operacoes,
+        "Descrição Item": np.where(producao, itens, None),
+        "Qtd Aprovada": np.where(producao, rng.integers(100, 30000, size=n), 0),
+        "Descrição Parada": np.where(producao, None, paradas),
+        "Parada Real Útil": np.where(producao, "0", parada_util),
+    })
+
+
+def gerar_velocidades():
+    """Tabela de velocidades no formato da planilha static/Velocidade.xlsx."""
+    return pd.DataFrame({"Conc": list(VELOCIDADES), "Vel Padrão/Ideal": list(VELOCIDADES.values())})
@@ -0,0 +1,110 @@
+"""
+Acervo particionado: a pipeline sobre um período do acervo tem de dar exatamente os
+resultados da pipeline sobre o Excel de origem, um upload novo só substitui os dias
+que traz e espera a trava da partição que outro processo estiver regravando.
+"""
+import shutil
+import threading
+
+import pandas as pd
+
+from dados_sinteticos import gerar_registros
+
+
+def test_pipeline_do_acervo_igual_a_do_excel(nova_pipeline, tmp_path):
+    from acervo import Acervo
+
+    do_excel = nova_pipeline()
+    acervo = Acervo(str(tmp_path))
+    acervo.gravar(do_excel.executar("normalizados"))
+    do_acervo = nova_pipeline(acervo.selecao())
+
+    assert do_acervo.dias_do_arquivo() == do_excel.dias_do_arquivo()
+    for dia in do_excel.dias_do_arquivo():
+        esperado = do_excel.com_data(dia).executar("metricas")
+        obtido = do_acervo.com_data(dia).executar("metricas")
+        for tabela in ("resumo_turno", "paradas_detalhe"):
+            pd.testing.assert_frame_equal(obtido[tabela], esperado[tabela], check_exact=True)
+
+
+def test_leitura_por_periodo_centro_e_colunas(planilhas_sinteticas, tmp_path):
+    from acervo import Acervo, dias_produtivos
+    from pipeline import ler_planilha, impressao_arquivo
+    from processamento import normalizar_registros
+
+    caminho, _ = planilhas_sinteticas
+    normalizados = normalizar_registros(ler_planilha(caminho, impressao_arquivo(caminho)))
+    acervo = Acervo(str(tmp_path))
+    acervo.gravar(normalizados)
+    dia = acervo.dias()[1]
+
+    lidos = acervo.ler(dia, dia, ["CA01"], ["Conc", "Qtd Aprovada"])
+    no_dia = normalizados[(dias_produtivos(normalizados["DataHoraInicio"]).dt.date == dia)
+                          & (normalizados["Centro Trabalho"] == "CA01")]
+    assert list(lidos.columns) == ["Conc", "Qtd Aprovada"]
+    pd.testing.assert_frame_equal(lidos, no_dia[["Conc", "Qtd Aprovada"]].reset_index(drop=True))
+    assert acervo.ler(dia, dia, ["XX99"]).empty
+
+
+def test_upload_substitui_so_os_dias_que_traz(tmp_path):
+    from acervo import Acervo, dias_produtivos
+    from processamento import normalizar_registros
+
+    acervo = Acervo(str(tmp_path))
+    antigos = normalizar_registros(gerar_registros(2000, semente=7, dias=3))
+    acervo.gravar(antigos)
+    primeiro, *demais = acervo.dias()
+
+    # Um reenvio só com o primeiro dia, com menos registros
+    do_primeiro = antigos[dias_produtivos(antigos["DataHoraInicio"]).dt.date == primeiro]
+    acervo.gravar(do_primeiro.iloc[::2])
+    assert acervo.dias() == [primeiro, *demais]
+    assert len(acervo.ler(primeiro, primeiro)) == len(do_primeiro.iloc[::2])
+    assert len(acervo.ler(demais[0], demais[-1])) == len(antigos) - len(do_primeiro)
+
+
+def test_centro_que_sai_do_reenvio_sai_do_acervo(tmp_path):
+    from acervo import Acervo, dias_produtivos
+    from processamento import normalizar_registros
+
+    acervo = Acervo(str(tmp_path))
+    antigos = normalizar_registros(gerar_registros(2000, semente=7, dias=3))
+    acervo.gravar(antigos)
+    dia = acervo.dias()[1]
+
+    # Exportação corrigida: os registros do CA01 do dia eram do CA04
+    corrigidos = antigos.copy()
+    do_dia = dias_produtivos(corrigidos["DataHoraInicio"]).dt.date == dia
+    corrigidos.loc[do_dia & (corrigidos["Centro Trabalho"] == "CA01"), "Centro Trabalho"] = "CA04"
+    acervo.gravar(corrigidos)
+
+    assert len(acervo.ler(dia, dia)) == do_dia.sum()
+    assert acervo.ler(dia, dia, ["CA01"]).empty
+    assert len(acervo.ler(dia, dia, ["CA04"])) == (do_dia & corrigidos["Centro Trabalho"].eq("CA04")).sum()
+    assert len(acervo.ler()) == len(antigos)
+
+
+def test_gravacao_espera_a_trava_da_particao(tmp_path):
+    from acervo import Acervo, dias_produtivos, trava_arquivo
+    from processamento import normalizar_registros
+
+    registros = normalizar_registros(gerar_registros(2000, semente=7, dias=3))
+    registros = registros[registros["Centro Trabalho"] == "CA01"]
+    dias = dias_produtivos(registros["DataHoraInicio"]).dt.date
+    primeiro, segundo = sorted(dias.dropna().unique())[-2:]
+    # O que outro processo grava na partição enquanto tem a trava: só o segundo dia
+    outro = Acervo(str(tmp_path / "outro"))
+    (mes, centro), = outro.gravar(registros[dias == segundo])
+
+    acervo = Acervo(str(tmp_path / "acervo"))
+    caminho = acervo._caminho(mes, centro)
+    with trava_arquivo(caminho):
+        gravacao = threading.Thread(target=acervo.gravar, args=(registros[dias == primeiro],))
+        gravacao.start()
+        gravacao.join(0.5)
+        assert gravacao.is_alive()
+        shutil.copy(outro._caminho(mes, centro), caminho)
+    gravacao.join(10)
+
+    assert acervo.dias() == [primeiro, segundo]
+    assert len(acervo.ler(segundo, segundo)) == (dias == segundo).sum()
@@ -0,0 +1,49 @@
+"""
+Backends de agregação: o primitivo `agrupar` de cada backend tem de devolver exatamente o
+frame do groupby do pandas, inclusive com chaves nulas, valores nulos e inteiros.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+AGREGACOES = {
+    "Soma": ("Valor", "sum"),
+    "Media": ("Valor", "mean"),
+    "Qtd": ("Inteiro", "sum"),
+    "Linhas": ("Valor", "size"),
+}
+
+
+def _frame(n=50_000):
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        "Centro Trabalho": np.asarray(["CA01", "CA04", "CA05", "CA12"], dtype=object)[rng.integers(4, size=n)],
+        "Turno": np.asarray(["Turno 1", "Turno 2", "Turno 3"], dtype=object)[rng.integers(3, size=n)],
+        "DataProd": pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(30, size=n), unit="D"),
+        "Valor": rng.random(n) * 1000 / 7,
+        "Inteiro": rng.integers(0, 30000, size=n),
+    })
+    df.loc[::97, "Valor"] = np.nan
+    df.loc[::389, "Turno"] = None
+    return df
+
+
+@pytest.mark.parametrize("nome", ["pandas", "duckdb"])
+def test_agrupar_igual_ao_groupby(nome):
+    if nome == "duckdb":
+        pytest.importorskip("duckdb")
+    from agregacao import obter_backend
+
+    df = _frame()
+    chaves = ["Centro Trabalho", "Turno", "DataProd"]
+    esperado = df.groupby(chaves, as_index=False).agg(**AGREGACOES)
+    pd.testing.assert_frame_equal(obter_backend(nome).agrupar(df, chaves, AGREGACOES), esperado, check_exact=True)
+    vazio = df.iloc[:0]
+    pd.testing.assert_frame_equal(obter_backend(nome).agrupar(vazio, chaves, AGREGACOES),
+                                  vazio.groupby(chaves, as_index=False).agg(**AGREGACOES))
+
+
+def test_backend_desconhecido():
+    from agregacao import obter_backend
+    with pytest.raises(ValueError, match="desconhecido"):
+        obter_backend("spark")
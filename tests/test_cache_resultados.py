@@ -0,0 +1,88 @@
+"""
+Cache de resultados com teto de memória: passando do teto saem os resultados usados há
+mais tempo, os contadores registram acertos, faltas e descartes, uma pipeline com
+resultados descartados recalcula os mesmos valores e duas sessões que pedem a mesma
+chave ao mesmo tempo fazem um só cálculo.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_descarta_o_usado_ha_mais_tempo():
+    from cache_resultados import CacheResultados, tamanho_estimado
+
+    frame = pd.DataFrame({"x": np.zeros(100_000)})  # ~0,8 MB
+    cache = CacheResultados(max_workers=1, limite_mb=2 * tamanho_estimado(frame) / 1024 / 1024)
+    cache.obter_ou_calcular("a", lambda: frame)
+    cache.obter_ou_calcular("b", lambda: frame.copy())
+    cache.obter_ou_calcular("a", lambda: None)  # acerto: "a" passa a ser o mais recente
+    cache.obter_ou_calcular("c", lambda: frame.copy())
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") is frame and cache.obter("c") is not None
+    estatisticas = cache.estatisticas()
+    assert (estatisticas["acertos"], estatisticas["faltas"], estatisticas["descartes"]) == (1, 3, 1)
+    assert estatisticas["resultados"] == 2
+
+
+def test_pedidos_simultaneos_calculam_uma_vez():
+    from cache_resultados import CacheResultados
+
+    cache = CacheResultados(max_workers=1)
+    comecou, liberar = threading.Event(), threading.Event()
+    chamadas = []
+
+    def calcular():
+        chamadas.append(threading.current_thread().name)
+        comecou.set()
+        liberar.wait(5)
+        return object()
+
+    resultados = {}
+
+    def pedir(nome):
+        resultados[nome] = cache.obter_ou_calcular("chave", calcular)
+
+    primeira = threading.Thread(target=pedir, args=("primeira",))
+    primeira.start()
+    assert comecou.wait(5)
+    # A segunda pede enquanto a primeira ainda calcula
+    segunda = threading.Thread(target=pedir, args=("segunda",))
+    segunda.start()
+    segunda.join(0.2)
+    assert segunda.is_alive()
+    liberar.set()
+    primeira.join(5)
+    segunda.join(5)
+
+    assert len(chamadas) == 1
+    assert resultados["primeira"] is resultados["segunda"]
+    estatisticas = cache.estatisticas()
+    assert (estatisticas["acertos"], estatisticas["faltas"]) == (1, 1)
+
+
+def test_falha_no_calculo_nao_fica_pendente():
+    from cache_resultados import CacheResultados
+
+    cache = CacheResultados(max_workers=1)
+
+    def falhar():
+        raise RuntimeError("planilha inválida")
+
+    with pytest.raises(RuntimeError):
+        cache.obter_ou_calcular("chave", falhar)
+    assert cache.obter_ou_calcular("chave", lambda: 1) == 1
+
+
+def test_pipeline_com_teto_pequeno_da_os_mesmos_resultados(nova_pipeline):
+    sem_teto, com_teto = nova_pipeline(limite_mb=0), nova_pipeline(limite_mb=0.5)
+    for dia in sem_teto.dias_do_arquivo() * 2:
+        esperado = sem_teto.com_data(dia).executar("metricas")
+        obtido = com_teto.com_data(dia).executar("metricas")
+        pd.testing.assert_frame_equal(obtido["resumo_turno"], esperado["resumo_turno"], check_exact=True)
+    assert com_teto.cache.estatisticas()["descartes"] > 0
+    assert com_teto.cache.estatisticas()["ocupado_mb"] <= 0.5 or com_teto.cache.estatisticas()["resultados"] == 1
+    assert sem_teto.cache.estatisticas()["descartes"] == 0
@@ -0,0 +1,99 @@
+"""
+Consolidados semanais e mensais: cada versão dos dados (arquivo ou seleção do acervo)
+tem os seus dias, os totais de um período são a soma dos dias dele mesmo depois de um
+dia ser recalculado várias vezes, atualizar um dia só refaz os totais da semana e do
+mês dele, e só consolidar_dias escreve nos consolidados.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def _resumo(dia, produzido, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "Centro Trabalho": ["CA01", "CA01", "CA04"],
+        "Turno": ["Turno 1", "Turno 2", "Turno 1"],
+        "DataProd": pd.Timestamp(dia),
+        "Produzido": produzido,
+        "Prod_prevista": rng.random(3) * 1000 / 7,
+        "Prod_prevista_ajustada": rng.random(3) * 1000 / 3,
+        "Tempo_liquido_h": rng.random(3) / 7,
+        "Paradas_h": rng.random(3) / 3,
+    })
+
+
+def test_versoes_nao_se_misturam():
+    from consolidados import Consolidados
+
+    consolidados = Consolidados()
+    dia = date(2025, 9, 2)
+    consolidados.atualizar_dia("arquivo", dia, _resumo(dia, [100.0, 200.0, 300.0]))
+    # Seleção do acervo só com CA01: o mesmo dia, outros resultados
+    consolidados.atualizar_dia("selecao", dia, _resumo(dia, [100.0, 200.0, 300.0]).iloc[:2])
+
+    arquivo = consolidados.tabela("arquivo", "mes", dia)
+    selecao = consolidados.tabela("selecao", "mes", dia)
+    assert arquivo["Produzido"].sum() == 600
+    assert selecao["Centro Trabalho"].tolist() == ["CA01"] and selecao["Produzido"].sum() == 300
+    assert consolidados.dias("outra") == [] and consolidados.tabela("outra", "mes", dia).empty
+
+
+def test_dia_recalculado_nao_acumula_erro():
+    from consolidados import Consolidados
+
+    dias = [date(2025, 9, d) for d in range(1, 8)]
+    recalculado, direto = Consolidados(), Consolidados()
+    for semente in range(50):
+        for dia in dias:
+            recalculado.atualizar_dia("v", dia, _resumo(dia, [1 / 3, 2 / 7, 0.1], semente))
+    for dia in dias:
+        direto.atualizar_dia("v", dia, _resumo(dia, [1 / 3, 2 / 7, 0.1], 49))
+
+    por = ("Periodo", "Centro Trabalho", "Turno")
+    pd.testing.assert_frame_equal(recalculado.tabela("v", "semana", None, por), direto.tabela("v", "semana", None, por),
+                                  check_exact=True)
+    # Centro que sumiu no recálculo de um dia sai dos totais só daquele dia
+    recalculado.atualizar_dia("v", dias[0], _resumo(dias[0], [1.0, 1.0, 1.0]).iloc[:2])
+    direto.atualizar_dia("v", dias[0], _resumo(dias[0], [1.0, 1.0, 1.0]).iloc[:2])
+    pd.testing.assert_frame_equal(recalculado.tabela("v", "semana", None, por), direto.tabela("v", "semana", None, por),
+                                  check_exact=True)
+
+
+def test_atualizar_dia_refaz_so_o_seu_periodo():
+    from consolidados import Consolidados
+
+    consolidados = Consolidados()
+    dias = [date(2025, 9, d) for d in range(1, 15)]  # duas semanas de segunda a domingo
+    for dia in dias:
+        consolidados.atualizar_dia("v", dia, _resumo(dia, [1.0, 2.0, 3.0]))
+    semanas = dict(consolidados._versoes["v"]["totais"]["semana"])
+    assert len(semanas) == 2
+
+    consolidados.atualizar_dia("v", dias[-1], _resumo(dias[-1], [10.0, 20.0, 30.0]))
+    depois = consolidados._versoes["v"]["totais"]["semana"]
+    primeira, segunda = sorted(semanas)
+    assert depois[primeira] is semanas[primeira] and depois[segunda] is not semanas[segunda]
+    assert consolidados.tabela("v", "semana", dias[-1])["Produzido"].sum() == 6 * 6 + 60
+    assert consolidados.tabela("v", "mes", dias[0])["Produzido"].sum() == 13 * 6 + 60
+
+
+def test_so_consolidar_dias_escreve(nova_pipeline):
+    from consolidados import Consolidados
+    from processamento import agregar_resumo
+
+    consolidados = Consolidados()
+    pipeline = nova_pipeline(consolidados=consolidados)
+    dias = pipeline.dias_do_arquivo()
+
+    for dia in dias:
+        pipeline.com_data(dia).executar("metricas")
+    assert consolidados.dias(pipeline.versao) == []
+
+    pipeline.com_data(dias[0]).consolidar_periodo("mes")
+    assert consolidados.dias(pipeline.versao) == [d for d in dias if d.month == dias[0].month]
+    esperado = agregar_resumo(pd.concat([pipeline.com_data(d).executar("metricas")["resumo_turno"]
+                                         for d in consolidados.dias(pipeline.versao)]), ["Centro Trabalho"])
+    obtido = consolidados.tabela(pipeline.versao, "mes", dias[0])
+    pd.testing.assert_frame_equal(obtido[esperado.columns], esperado, check_dtype=False, rtol=1e-12)
@@ -0,0 +1,58 @@
+"""
+Exportação xlsx: uma aba por tabela, com as linhas de todos os dias pedidos tiradas
+dos resultados da Pipeline, dias sem registros não quebram a exportação e os dias
+calculados só para ela não entram no cache compartilhado.
+"""
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+
+def test_exportacao_tem_as_tabelas_de_todos_os_dias(nova_pipeline):
+    from exportacao import ABAS, exportar_dias, tabelas_do_dia
+
+    pipeline = nova_pipeline()
+    dias = pipeline.dias_do_arquivo()
+
+    # Um dia depois do arquivo, sem registros
+    arquivo = exportar_dias(pipeline, dias + [dias[-1] + timedelta(days=1)])
+    planilhas = pd.read_excel(arquivo, sheet_name=None)
+
+    assert list(planilhas) == [titulo for titulo, _ in ABAS]
+    esperadas = [tabelas_do_dia(pipeline.com_data(dia)) for dia in dias]
+    for titulo, tabela in ABAS:
+        assert len(planilhas[titulo]) == sum(len(t[tabela]) for t in esperadas), titulo
+    resumo = planilhas["Resumo por turno"]
+    assert {"Centro", "Turno", "Produzido", "Eficiência (%)"} <= set(resumo.columns)
+    assert resumo["Produzido"].sum() == sum(t["resumo_turno"]["Produzido"].sum() for t in esperadas)
+    assert "Item_id" not in planilhas["Itens"].columns
+
+
+def test_exportacao_nao_guarda_dias_no_cache_compartilhado(nova_pipeline, monkeypatch):
+    from exportacao import DIAS_MAXIMOS, exportar_dias
+
+    pipeline = nova_pipeline()
+    cache = pipeline.cache
+    dias = pipeline.dias_do_arquivo()
+    # Como na página: o arquivo inteiro e o dia aberto já estão no cache
+    aberto = pipeline.com_data(dias[0]).executar("exibicao")
+    guardados = cache.estatisticas()["resultados"]
+
+    planilhas = pd.read_excel(exportar_dias(pipeline, dias), sheet_name=None)
+    assert cache.estatisticas()["resultados"] == guardados
+    assert pipeline.com_data(dias[1]).em_cache("metricas") is None
+    assert pipeline.com_data(dias[0]).executar("exibicao") is aberto
+    assert set(planilhas["Sumário dos centros"]["DataProd"].dt.date) == set(dias)
+
+    # Sem nada no cache compartilhado, as etapas do arquivo inteiro rodam uma vez só
+    import pipeline as modulo_pipeline
+    chamadas = []
+    atribuir_roteiros = modulo_pipeline.atribuir_roteiros
+    monkeypatch.setattr(modulo_pipeline, "atribuir_roteiros", lambda *a: chamadas.append(1) or atribuir_roteiros(*a))
+    frio = nova_pipeline(limite_mb=0.001)
+    exportar_dias(frio, dias)
+    assert len(chamadas) == 1
+
+    with pytest.raises(ValueError):
+        exportar_dias(pipeline, [dias[0] + timedelta(days=i) for i in range(DIAS_MAXIMOS + 1)])
@@ -0,0 +1,91 @@
+"""
+Saídas golden: resumo_turno, paradas_detalhe e sumario_centros de todos os dias de um
+arquivo sintético fixo, calculados pela Pipeline a partir de planilhas como as do upload,
+têm de ser idênticas às gravadas em tests/golden/.
+
+A comparação é pelo texto CSV de cada célula (floats com todos os dígitos), então
+qualquer diferença numérica falha. Mudanças intencionais de resultado regravam os
+arquivos com --atualizar-golden, e o diff deles entra na revisão.
+
+Cada backend de agregação (módulo agregacao) é validado contra os mesmos arquivos; o
+duckdb é pulado quando não está instalado.
+"""
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import PASTA_TESTES
+
+PASTA_GOLDEN = os.path.join(PASTA_TESTES, "golden")
+TABELAS = ("resumo_turno", "paradas_detalhe", "sumario_centros")
+
+
+@pytest.fixture(scope="module", params=["pandas", "duckdb"])
+def backend(request):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("RELATORIO_BACKEND", request.param)
+        yield request.param
+
+
+@pytest.fixture(scope="module")
+def saidas(backend, nova_pipeline):
+    """Tabelas de todos os dias produtivos do arquivo, empilhadas com a coluna DataProd."""
+    pipeline = nova_pipeline()
+    partes = {nome: [] for nome in TABELAS}
+    for dia in pipeline.dias_do_arquivo():
+        pipeline_dia = pipeline.com_data(dia)
+        metricas = pipeline_dia.executar("metricas")
+        sumario = pipeline_dia.executar("exibicao")["sumario_centros"]
+        partes["resumo_turno"].append(metricas["resumo_turno"])
+        partes["paradas_detalhe"].append(metricas["paradas_detalhe"])
+        partes["sumario_centros"].append(sumario.assign(DataProd=pd.Timestamp(dia)))
+    return {nome: pd.concat(frames, ignore_index=True) for nome, frames in partes.items()}
+
+
+def _csv(df):
+    return df.to_csv(index=False, lineterminator="\n")
+
+
+@pytest.mark.parametrize("tabela", TABELAS)
+def test_saida_igual_ao_golden(backend, saidas, tabela, atualizar_golden):
+    caminho = os.path.join(PASTA_GOLDEN, f"{tabela}.csv")
+    atual = _csv(saidas[tabela])
+    if atualizar_golden:
+        if backend != "pandas":
+            pytest.skip("o golden é gravado pela implementação de referência (pandas)")
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            f.write(atual)
+        pytest.skip(f"{tabela}.csv regravado")
+    with open(caminho, encoding="utf-8", newline="") as f:
+        esperado = f.read()
+    if atual != esperado:
+        # Célula a célula, como texto, para o erro apontar a coluna e a linha
+        pd.testing.assert_frame_equal(
+            pd.read_csv(io.StringIO(atual), dtype=str, keep_default_na=False),
+            pd.read_csv(io.StringIO(esperado), dtype=str, keep_default_na=False),
+        )
+        assert atual == esperado
+
+
+def test_golden_cobre_varios_dias(saidas):
+    # O arquivo sintético atravessa dias produtivos (06→06) e todos os três turnos
+    resumo = saidas["resumo_turno"]
+    assert resumo["DataProd"].nunique() >= 3
+    assert set(resumo["Turno"]) >= {"Turno 1", "Turno 2", "Turno 3"}
+    assert not saidas["paradas_detalhe"].empty
+
+
+def test_dias_do_arquivo_sem_a_etapa_de_turnos(nova_pipeline):
+    # A lista de dias (seletor de intervalo do Pareto, pré-cálculo) não pode forçar as
+    # etapas por linha do arquivo inteiro
+    from processamento import indexar_dias
+
+    pipeline = nova_pipeline()
+
+    dias = pipeline.dias_do_arquivo()
+    assert pipeline.em_cache("turnos") is None
+    assert dias == [pd.Timestamp(d).date() for d in indexar_dias(pipeline.executar("turnos"))["DataProd"]]
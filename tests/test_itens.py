@@ -0,0 +1,101 @@
+"""
+Agregados por item: quantidade e minutos de produção de cada item por centro, turno e
+dia conferem com a soma direta dos reportes, os IDs são os da dimensão do arquivo,
+itens_lentos respeita o limite da razão entre velocidade efetiva e padrão e a busca de
+um item no índice dos dias consolidados acha as mesmas linhas que uma varredura.
+"""
+import pandas as pd
+import pytest
+
+
+def test_agregar_itens_de_um_dia_montado_a_mao():
+    from itens import agregar_itens
+
+    dia = pd.Timestamp("2025-09-02")
+    producao = pd.DataFrame({
+        "Descrição Item": ["ITEM B", "ITEM A", " ITEM B ", "ITEM A", None],
+        "Centro Trabalho": ["CA01", "CA01", "CA01", "CA04", "CA01"],
+        "Turno": ["Turno 1", "Turno 1", "Turno 1", "Turno 2", "Turno 1"],
+        "DataProd": [dia] * 5,
+        "Qtd Aprovada": [1000, 300, 500, "200", 999],
+    })
+    vel_evento = pd.Series([2000.0, 1000.0, 4000.0, 500.0, 1000.0])
+    tempo_h = pd.Series([0.5, 0.25, 0.25, 1.0, 1.0])
+
+    itens = agregar_itens(producao, vel_evento, tempo_h)
+
+    # ITEM A (ID 0) em CA01 e CA04, ITEM B (ID 1) em CA01; item vazio fica de fora
+    assert itens["Item_id"].tolist() == [0, 0, 1]
+    assert itens["Descrição Item"].tolist() == ["ITEM A", "ITEM A", "ITEM B"]
+    assert itens["Centro Trabalho"].tolist() == ["CA01", "CA04", "CA01"]
+    assert itens["Qtd"].tolist() == [300, 200, 1500]
+    assert itens["Minutos_producao"].tolist() == [15.0, 60.0, 45.0]
+    item_b = itens.iloc[2]
+    # Padrão ponderada pelo tempo: (2000 * 0,5 + 4000 * 0,25) / 0,75
+    assert item_b["Vel_padrao"] == pytest.approx(2000 / 0.75)
+    assert item_b["Vel_efetiva"] == pytest.approx(1500 / 0.75)
+    assert item_b["Razao_vel_%"] == pytest.approx(75.0)
+
+
+def test_itens_do_dia_somam_os_reportes(nova_pipeline):
+    from itens import dimensao_itens
+
+    pipeline = nova_pipeline()
+    pipeline_dia = pipeline.com_data(pipeline.dias_do_arquivo()[1])
+    itens = pipeline_dia.executar("metricas")["itens_por_centro_turno"]
+
+    producao = pipeline_dia.executar("dia")
+    producao = producao[producao["Tipo Registro"] == "Reporte de Produção"]
+    esperado = {}
+    for _, linha in producao.iterrows():
+        chave = (linha["Descrição Item"].strip(), linha["Centro Trabalho"], linha["Turno"])
+        minutos = (linha["DataHoraFim"] - linha["DataHoraInicio"]).total_seconds() / 60
+        qtd, total_min = esperado.get(chave, (0, 0.0))
+        esperado[chave] = (qtd + float(linha["Qtd Aprovada"]), total_min + max(minutos, 0))
+
+    obtido = {(i, c, t): (q, m) for i, c, t, q, m in
+              itens[["Descrição Item", "Centro Trabalho", "Turno", "Qtd", "Minutos_producao"]].itertuples(index=False)}
+    assert obtido.keys() == esperado.keys()
+    for chave, (qtd, minutos) in esperado.items():
+        assert obtido[chave][0] == qtd
+        assert obtido[chave][1] == pytest.approx(minutos)
+
+    dimensao = dimensao_itens(pipeline.executar("normalizados"))
+    assert (dimensao[itens["Item_id"]] == itens["Descrição Item"]).all()
+    assert itens["Item_id"].is_monotonic_increasing
+
+
+def test_itens_lentos_abaixo_do_limite():
+    from itens import itens_lentos
+
+    itens = pd.DataFrame({
+        "Descrição Item": ["A", "B", "C", "D", "E"],
+        "Centro Trabalho": ["CA01", "CA01", "CA01", "CA01", "CA04"],
+        "Razao_vel_%": [99.9, 50.0, 100.0, 150.0, 10.0],
+    })
+    assert itens_lentos(itens, "CA01")["Descrição Item"].tolist() == ["B", "A"]
+    assert itens_lentos(itens, "CA01", limite_pct=60)["Descrição Item"].tolist() == ["B"]
+    assert itens_lentos(itens, "CA01", limite_pct=200)["Descrição Item"].tolist() == ["B", "A", "C", "D"]
+    assert itens_lentos(itens, "CA09").empty
+
+
+def test_localizar_item_nos_dias_consolidados(nova_pipeline):
+    from consolidados import Consolidados
+
+    consolidados = Consolidados()
+    pipeline = nova_pipeline(consolidados=consolidados)
+    dias = pipeline.dias_do_arquivo()
+    pipeline.consolidar_dias(dias)
+    todos = pd.concat([pipeline.com_data(d).executar("metricas")["itens_por_centro_turno"] for d in dias],
+                      ignore_index=True)
+
+    colunas = ["DataProd", "Centro Trabalho", "Turno", "Qtd"]
+    for item_id in [0, 7, len(pipeline.executar("itens")) - 1]:
+        esperado = todos[todos["Item_id"] == item_id].sort_values(colunas[:3])[colunas].reset_index(drop=True)
+        obtido = consolidados.localizar_item(pipeline.versao, item_id)
+        assert obtido["DataProd"].is_monotonic_increasing
+        pd.testing.assert_frame_equal(obtido.sort_values(colunas[:3])[colunas].reset_index(drop=True), esperado)
+        no_segundo = consolidados.localizar_item(pipeline.versao, item_id, dias[1], dias[1])
+        assert len(no_segundo) == (esperado["DataProd"] == pd.Timestamp(dias[1])).sum()
+    assert consolidados.localizar_item(pipeline.versao, 10_000).empty
+    assert consolidados.localizar_item("outra", 0).empty
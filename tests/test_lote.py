@@ -0,0 +1,105 @@
+"""
+Lote agendado: uma exportação nova na pasta vigiada gera o relatório de cada dia
+fechado (xlsx, PDF e agregados no acervo) com os resultados da pipeline sobre o arquivo,
+uma segunda execução não refaz nada, um relatório que falta é refeito do acervo e um
+upload pela página em andamento numa partição faz o lote esperar por ele.
+"""
+import os
+import shutil
+import threading
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+from conftest import CAMINHO_REGRAS_TESTE
+from dados_sinteticos import gerar_registros
+
+pytest.importorskip("fpdf")
+
+
+def test_lote_gera_os_dias_fechados(tmp_path, planilhas_sinteticas, nova_pipeline):
+    from acervo import Acervo
+    from lote import caminhos_do_dia, executar_lote
+
+    registros, velocidades = planilhas_sinteticas
+    entrada, saida = tmp_path / "entrada", tmp_path / "saida"
+    entrada.mkdir()
+    exportacao = entrada / "exportacao.xlsx"
+    shutil.copy(registros, exportacao)
+    os.utime(exportacao, (0, 0))
+    esperado = nova_pipeline(str(exportacao))
+    dias = esperado.dias_do_arquivo()
+    acervo = Acervo(str(tmp_path / "acervo"))
+
+    def lote(agora):
+        return executar_lote(str(entrada), str(saida), acervo, velocidades,
+                             CAMINHO_REGRAS_TESTE, trabalhadores=2, agora=agora)
+
+    # Às 07:00 do dia seguinte ao penúltimo: o último dia ainda está aberto
+    gerados = lote(datetime.combine(dias[-1], time(7, 0)))
+    assert gerados == dias[:-1]
+    for dia in gerados:
+        assert all(os.path.exists(caminho) for caminho in caminhos_do_dia(str(saida), dia))
+        pd.testing.assert_frame_equal(acervo.ler_agregados("resumo_turno", dia, dia),
+                                      esperado.com_data(dia).executar("metricas")["resumo_turno"],
+                                      check_dtype=False, check_index_type=False)
+    assert len(pd.read_excel(caminhos_do_dia(str(saida), dias[0])[0], sheet_name=None)) == 4
+
+    # Um dia depois: só o último dia, agora fechado, vem do acervo
+    assert lote(datetime.combine(dias[-1] + timedelta(days=1), time(7, 0))) == dias[-1:]
+    assert lote(datetime.combine(dias[-1] + timedelta(days=1), time(8, 0))) == []
+
+    os.remove(caminhos_do_dia(str(saida), dias[1])[1])
+    assert lote(datetime.combine(dias[-1] + timedelta(days=1), time(9, 0))) == [dias[1]]
+
+
+def test_lote_espera_upload_em_andamento(tmp_path, monkeypatch, planilhas_sinteticas):
+    import acervo as modulo_acervo
+    from acervo import Acervo, dias_produtivos
+    from lote import executar_lote
+    from processamento import normalizar_registros
+
+    registros, velocidades = planilhas_sinteticas
+    entrada = tmp_path / "entrada"
+    entrada.mkdir()
+    exportacao = entrada / "exportacao.xlsx"
+    shutil.copy(registros, exportacao)
+    os.utime(exportacao, (0, 0))
+    acervo = Acervo(str(tmp_path / "acervo"))
+
+    # Upload pela página de um dia que a exportação não traz, na partição 2025-09/CA01
+    da_pagina = normalizar_registros(gerar_registros(1000, semente=11, dias=5))
+    dias_pagina = dias_produtivos(da_pagina["DataHoraInicio"]).dt.date
+    da_pagina = da_pagina[(dias_pagina == dias_pagina.max()) & (da_pagina["Centro Trabalho"] == "CA01")]
+    dia_pagina = dias_pagina.max()
+
+    gravando, liberar = threading.Event(), threading.Event()
+    gravar_arquivo = modulo_acervo._gravar_arquivo
+
+    def gravar_devagar(tabela, caminho):
+        if threading.current_thread().name == "pagina":
+            gravando.set()
+            liberar.wait(10)
+        gravar_arquivo(tabela, caminho)
+
+    monkeypatch.setattr(modulo_acervo, "_gravar_arquivo", gravar_devagar)
+    pagina = threading.Thread(target=Acervo(acervo.pasta).gravar, args=(da_pagina,), name="pagina")
+    pagina.start()
+    assert gravando.wait(10)
+
+    gerados = []
+    lote = threading.Thread(target=lambda: gerados.extend(executar_lote(
+        str(entrada), str(tmp_path / "saida"), acervo, velocidades, CAMINHO_REGRAS_TESTE,
+        trabalhadores=2, agora=datetime.combine(dia_pagina, time(7, 0)))))
+    lote.start()
+    lote.join(1)
+    assert lote.is_alive()  # esperando a trava de 2025-09/CA01
+    liberar.set()
+    pagina.join(10)
+    lote.join(120)
+
+    assert gerados and max(gerados) < dia_pagina
+    assert dia_pagina in acervo.dias(["CA01"])
+    assert len(acervo.ler(dia_pagina, dia_pagina, ["CA01"])) == len(da_pagina)
+    assert set(gerados) <= set(acervo.dias(["CA01"]))
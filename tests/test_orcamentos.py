@@ -0,0 +1,136 @@
+"""
+Orçamentos de tempo e memória por etapa da pipeline com 100 mil e 1 milhão de registros.
+
+As etapas rodam como na Pipeline, mas a partir de DataFrames já em memória (a leitura
+do Excel fica de fora: com 1 milhão de linhas ela domina tudo e não é código nosso).
+Cada etapa é medida duas vezes: o tempo sem o tracemalloc ligado e o pico de memória
+com ele, porque o rastreamento deixa as alocações mais lentas.
+
+Os limites ficam folgados (cerca de 3x o tempo e 1,5x a memória medidos ao criá-los)
+para não oscilar entre máquinas; uma regressão de verdade (um laço por linha a mais,
+uma cópia do arquivo inteiro) passa deles com sobra. Depois de uma otimização, reduza
+o orçamento da etapa para travar o ganho.
+
+O tempo depende da máquina e da carga dela, então os orçamentos de tempo só rodam com
+--tempos; os de memória rodam sempre.
+"""
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from dados_sinteticos import gerar_registros, gerar_velocidades
+
+FATOR_TEMPO = float(os.environ.get("ORCAMENTO_FATOR_TEMPO", "1"))
+
+# linhas -> etapa -> (segundos, MB de pico)
+ORCAMENTOS = {
+    100_000: {
+        "normalizados": (1.5, 50),
+        "roteiros": (0.5, 40),
+        "itens": (0.15, 5),
+        "turnos": (15.0, 90),
+        "dia": (0.05, 5),
+        "agregados": (0.2, 1),
+        "metricas": (0.1, 1),
+        "exibicao": (0.1, 1),
+    },
+    1_000_000: {
+        "normalizados": (5.0, 450),
+        "roteiros": (4.0, 400),
+        "itens": (1.0, 50),
+        "turnos": (130.0, 930),
+        "dia": (0.05, 40),
+        "agregados": (0.2, 1),
+        "metricas": (0.1, 1),
+        "exibicao": (0.1, 1),
+    },
+}
+
+
+def _etapas(registros, regras):
+    """(nome, função) das etapas na ordem da Pipeline; cada uma lê as saídas anteriores."""
+    from processamento import (
+        normalizar_registros, normalizar_velocidades, atribuir_roteiros, completar_registros,
+        fatiar_dias, indexar_dias, agregar_dia, calcular_metricas,
+    )
+    from exibicao import montar_sumario_centros
+    from itens import dimensao_itens
+
+    velocidades = gerar_velocidades()
+    saidas = {}
+
+    def dia():
+        # Um dia do meio do arquivo, como o que o usuário abre
+        dias = indexar_dias(saidas["turnos"])["DataProd"]
+        return fatiar_dias(saidas["turnos"], dias.iloc[len(dias) // 2])
+
+    return saidas, [
+        ("normalizados", lambda: normalizar_registros(registros)),
+        ("roteiros", lambda: atribuir_roteiros(saidas["normalizados"], normalizar_velocidades(velocidades), regras)),
+        ("itens", lambda: dimensao_itens(saidas["normalizados"])),
+        ("turnos", lambda: completar_registros(saidas["roteiros"][0])),
+        ("dia", dia),
+        ("agregados", lambda: agregar_dia(saidas["dia"], saidas["roteiros"][1], saidas["itens"], regras)),
+        ("metricas", lambda: calcular_metricas(saidas["agregados"], regras)),
+        ("exibicao", lambda: montar_sumario_centros(saidas["metricas"]["resumo_turno"],
+                                                    saidas["metricas"]["paradas_detalhe"])),
+    ]
+
+
+def _medir(linhas, regras):
+    """etapa -> (segundos, MB de pico) de uma execução completa das etapas."""
+    registros = gerar_registros(linhas, semente=1)
+    medidas = {}
+
+    saidas, etapas = _etapas(registros, regras)
+    for nome, calcular in etapas:
+        inicio = time.perf_counter()
+        saidas[nome] = calcular()
+        medidas[nome] = [time.perf_counter() - inicio]
+
+    saidas, etapas = _etapas(registros, regras)
+    tracemalloc.start()
+    try:
+        for nome, calcular in etapas:
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+            saidas[nome] = calcular()
+            medidas[nome].append((tracemalloc.get_traced_memory()[1] - antes) / 2**20)
+    finally:
+        tracemalloc.stop()
+    return medidas
+
+
+@pytest.fixture(scope="module")
+def medidas(regras):
+    cache = {}
+
+    def medir(linhas):
+        if linhas not in cache:
+            cache[linhas] = _medir(linhas, regras)
+        return cache[linhas]
+    return medir
+
+
+PARAMETROS = [
+    pytest.param(linhas, etapa, id=f"{linhas}-{etapa}", marks=[pytest.mark.lento] if linhas >= 1_000_000 else [])
+    for linhas, etapas in ORCAMENTOS.items()
+    for etapa in etapas
+]
+
+
+@pytest.mark.tempo
+@pytest.mark.parametrize("linhas,etapa", PARAMETROS)
+def test_etapa_dentro_do_orcamento_de_tempo(medidas, linhas, etapa):
+    segundos, _ = medidas(linhas)[etapa]
+    limite_s, _ = ORCAMENTOS[linhas][etapa]
+    assert segundos <= limite_s * FATOR_TEMPO, f"{etapa} com {linhas} linhas: {segundos:.3f} s (orçamento {limite_s} s)"
+
+
+@pytest.mark.parametrize("linhas,etapa", PARAMETROS)
+def test_etapa_dentro_do_orcamento_de_memoria(medidas, linhas, etapa):
+    _, megabytes = medidas(linhas)[etapa]
+    _, limite_mb = ORCAMENTOS[linhas][etapa]
+    assert megabytes <= limite_mb, f"{etapa} com {linhas} linhas: pico de {megabytes:.1f} MB (orçamento {limite_mb} MB)"
@@ -0,0 +1,62 @@
+"""
+Execução por partições: o frame completado por centro num pool de processos tem de ser
+idêntico ao da execução serial (valores, tipos, índice e ordem das linhas), e os dias
+consolidados ou exportados com cada dia num processo dão as mesmas métricas da Pipeline.
+"""
+import pandas as pd
+import pytest
+
+from dados_sinteticos import gerar_registros, gerar_velocidades
+
+
+def test_completar_por_centro_igual_ao_serial(regras):
+    from processamento import normalizar_registros, normalizar_velocidades, atribuir_roteiros, completar_registros
+    from particoes import completar_por_centro
+
+    base, _, _ = atribuir_roteiros(normalizar_registros(gerar_registros(20_000, semente=3)),
+                                   normalizar_velocidades(gerar_velocidades()), regras)
+    serial = completar_registros(base)
+    paralelo = completar_por_centro(base, processos=2, linhas_minimas=0)
+    pd.testing.assert_frame_equal(paralelo, serial)
+
+
+def test_arquivo_pequeno_fica_em_serie(regras, monkeypatch):
+    import particoes
+    from processamento import normalizar_registros, atribuir_roteiros, normalizar_velocidades
+
+    base, _, _ = atribuir_roteiros(normalizar_registros(gerar_registros(500, semente=3)),
+                                   normalizar_velocidades(gerar_velocidades()), regras)
+    monkeypatch.setattr(particoes, "_obter_pool",
+                        lambda processos: pytest.fail("arquivo abaixo de LINHAS_MINIMAS não deveria usar o pool"))
+    particoes.completar_por_centro(base, processos=4)
+
+
+@pytest.mark.parametrize("turnos_em_cache", [False, True])
+def test_dias_em_processos_iguais_aos_da_pipeline(nova_pipeline, monkeypatch, turnos_em_cache):
+    import particoes
+    from consolidados import Consolidados
+    from exportacao import exportar_dias
+
+    def pipeline():
+        return nova_pipeline(consolidados=Consolidados())
+
+    serial = pipeline()
+    dias = serial.dias_do_arquivo()
+    esperado = {dia: serial.com_data(dia).executar("metricas") for dia in dias}
+    esperado_xlsx = pd.read_excel(exportar_dias(serial, dias), sheet_name=None)
+
+    monkeypatch.setenv("RELATORIO_PROCESSOS", "2")
+    monkeypatch.setattr(particoes, "LINHAS_MINIMAS", 0)
+    em_processos = pipeline()
+    if turnos_em_cache:
+        em_processos.executar("turnos")
+    assert [dia for dia, _ in em_processos.metricas_em_processos(dias)] == dias
+    em_processos.consolidar_dias(dias)
+    for dia in dias:
+        obtido = em_processos.com_data(dia).em_cache("metricas")
+        for tabela in ("resumo_turno", "paradas_detalhe", "itens_por_centro_turno"):
+            pd.testing.assert_frame_equal(obtido[tabela], esperado[dia][tabela], check_exact=True)
+
+    exportado = pd.read_excel(exportar_dias(pipeline(), dias), sheet_name=None)
+    for aba, tabela in esperado_xlsx.items():
+        pd.testing.assert_frame_equal(exportado[aba], tabela)
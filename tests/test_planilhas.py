@@ -0,0 +1,41 @@
+"""
+Cópia em disco das planilhas lidas: a segunda leitura vem da cópia em Arrow IPC, numa
+pasta só do usuário, com cada célula do tipo que o read_excel deu, inclusive nas
+colunas de texto com números e datas no meio.
+"""
+import os
+import stat
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+
+def test_copia_devolve_a_leitura_do_excel(tmp_path, monkeypatch):
+    import pipeline
+    from pipeline import impressao_arquivo, ler_planilha
+
+    monkeypatch.setattr(pipeline, "PASTA_PLANILHAS", str(tmp_path / "planilhas"))
+    planilha = pd.DataFrame({
+        "Código": ["A1", 1050, 3.5, None, datetime(2025, 9, 1, 7, 30)],
+        "Texto": ["a", None, "b", "c", "d"],
+        "Hora": [time(6, 0), time(7, 15), None, time(23, 59), time(0, 0)],
+        "Qtd": [1, 2, 3, 4, 5],
+        "Valor": [0.5, np.nan, 1 / 3, 2.0, 3.0],
+    })
+    caminho = str(tmp_path / "planilha.xlsx")
+    planilha.to_excel(caminho, index=False)
+
+    lida = ler_planilha(caminho, impressao_arquivo(caminho))
+    copias = os.listdir(tmp_path / "planilhas")
+    assert len(copias) == 1 and copias[0].endswith(".arrow")
+    assert stat.S_IMODE(os.stat(tmp_path / "planilhas").st_mode) == 0o700
+
+    def sem_excel(*args, **kwargs):
+        raise AssertionError("a segunda leitura tem de vir da cópia")
+
+    monkeypatch.setattr(pd, "read_excel", sem_excel)
+    da_copia = ler_planilha(caminho, impressao_arquivo(caminho))
+    pd.testing.assert_frame_equal(da_copia, lida, check_exact=True)
+    for coluna in lida.columns[lida.dtypes == object]:
+        assert list(map(type, da_copia[coluna])) == list(map(type, lida[coluna]))
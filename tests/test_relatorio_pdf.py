@@ -0,0 +1,28 @@
+"""
+Relatório em PDF: a etapa "pdf" da Pipeline gera um PDF válido por dia, memorizado no
+cache, e um dia sem registros também sai.
+"""
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+
+def test_pdf_do_dia_memorizado(nova_pipeline):
+    from relatorio_pdf import pareto_do_dia
+
+    pipeline = nova_pipeline()
+    dias = pipeline.dias_do_arquivo()
+
+    do_dia = pipeline.com_data(dias[1])
+    pdf = do_dia.executar("pdf")
+    assert pdf.startswith(b"%PDF")
+    assert do_dia.executar("pdf") is pdf
+
+    pareto = pareto_do_dia(do_dia.executar("metricas")["paradas_detalhe"])
+    assert pareto["Parada_min"].is_monotonic_decreasing
+    assert pareto["Acumulado_%"].iloc[-1] <= 100 + 1e-9
+
+    vazio = pipeline.com_data(dias[-1] + timedelta(days=1)).executar("pdf")
+    assert vazio.startswith(b"%PDF")
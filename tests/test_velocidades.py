@@ -0,0 +1,68 @@
+"""
+Velocidades com vigência: cada evento usa a versão do seu Conc em vigor no início dele,
+e acrescentar uma versão nova não muda os dias anteriores a ela.
+"""
+import pandas as pd
+
+from dados_sinteticos import gerar_registros, gerar_velocidades
+
+
+def _tabela(linhas):
+    from processamento import normalizar_velocidades
+    return normalizar_velocidades(pd.DataFrame(linhas, columns=["Conc", "Vel Padrão/Ideal", "Vigente desde"]))
+
+
+def test_velocidade_por_evento_segue_a_vigencia():
+    from velocidades import IndiceVelocidades
+
+    indice = IndiceVelocidades(_tabela([
+        ("CA01-X", 100.0, "01/09/2025"),
+        ("CA01-X", 200.0, "10/09/2025"),
+        ("CA01-X", 999.0, "10/09/2025"),  # mesma data: vale a primeira
+        ("CA04-Y", 50.0, None),
+    ]))
+    eventos = pd.DataFrame({
+        "Conc": ["CA01-X", "CA01-X", "CA01-X", "CA01-X", "CA04-Y", "CA09-Z", "CA01-X"],
+        "Inicio": pd.to_datetime(["2025-08-20 10:00", "2025-09-10 05:59", "2025-09-10 06:00",
+                                  "2025-12-01 00:00", "2020-01-01 00:00", "2025-09-10 10:00", None]),
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+    velocidades = indice.por_evento(eventos["Conc"], eventos["Inicio"])
+    # Antes da primeira versão vale a primeira; a nova vale a partir das 06:00 da sua data
+    assert velocidades.index.tolist() == eventos.index.tolist()
+    assert velocidades.tolist()[:5] == [100.0, 100.0, 200.0, 200.0, 50.0]
+    assert pd.isna(velocidades[15]) and velocidades[16] == 200.0
+    vigentes = indice.vigentes_em(pd.Timestamp("2025-09-05 06:00"))
+    assert vigentes.values.tolist() == [["CA01-X", 100.0], ["CA04-Y", 50.0]]
+
+
+def test_versao_nova_nao_muda_dias_anteriores(regras):
+    from processamento import (normalizar_registros, normalizar_velocidades, atribuir_roteiros, completar_registros,
+                               indexar_dias, fatiar_dias, agregar_dia, calcular_metricas)
+    from velocidades import indice_velocidades
+
+    registros = normalizar_registros(gerar_registros(3000, semente=2, dias=4))
+    velocidades = gerar_velocidades()
+    dias = None
+
+    def resumos(vel):
+        nonlocal dias
+        base, vel, _ = atribuir_roteiros(registros, normalizar_velocidades(vel), regras)
+        completos = completar_registros(base)
+        dias = indexar_dias(completos)["DataProd"].tolist()
+        return [calcular_metricas(agregar_dia(fatiar_dias(completos, d), vel, regras=regras), regras)["resumo_turno"]
+                for d in dias]
+
+    antes = resumos(velocidades)
+    # A partir do último dia, todas as velocidades dobram
+    ultimo = dias[-1].strftime("%d/%m/%Y")
+    nova = velocidades.assign(**{"Vigente desde": None})
+    dobrada = velocidades.assign(**{"Vel Padrão/Ideal": velocidades["Vel Padrão/Ideal"] * 2, "Vigente desde": ultimo})
+    depois = resumos(pd.concat([nova, dobrada], ignore_index=True))
+
+    for a, d in zip(antes[:-1], depois[:-1]):
+        pd.testing.assert_frame_equal(a, d, check_exact=True)
+    assert (depois[-1]["Prod_prevista"] > antes[-1]["Prod_prevista"]).any()
+
+    # Mesmo conteúdo, mesmo índice
+    vel = normalizar_velocidades(velocidades)
+    assert indice_velocidades(vel) is indice_velocidades(vel.copy())